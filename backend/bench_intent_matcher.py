@@ -0,0 +1,112 @@
+# backend/bench_intent_matcher.py
+"""
+Micro-benchmark for the voice intent matcher.
+
+Checks that the compiled matcher picks the same rule (and the same slot
+groups) as trying every pattern with re.search in table order, then times
+both over a mixed corpus. Run from the backend directory:
+
+    python bench_intent_matcher.py [iterations]
+"""
+import random
+import re
+import sys
+import timeit
+
+from modules.grammar import grammar_engine
+from routes.voice_router import parse_voice_command
+
+intent_matcher = grammar_engine.grammar.matcher
+
+CORPUS = [
+    "add a task to buy milk",
+    "create new task called finish the report",
+    "new task to do laundry tomorrow",
+    "add remind me to call mom",
+    "delete the last task",
+    "show me my tasks",
+    "what tasks do I have",
+    "what's eating my cpu",
+    "which processes are using the most memory",
+    "show top processes",
+    "what is the cpu usage",
+    "memory usage please",
+    "disk usage percent",
+    "system status",
+    "open chrome",
+    "please launch firefox for me",
+    "start visual studio code",
+    "open microsoft excel",
+    "launch the file explorer",
+    "open task manager",
+    "start minecraft",
+    "set a reminder to stretch at 5pm",
+    "create an alarm for 7 am",
+    "remind me to drink water",
+    "list my reminders",
+    "show alarms",
+    "hello there",
+    "tell me a joke about computers",
+    "what's the weather like today",
+    "how are you doing",
+    "explain how a neural network learns",
+    "i started reading a book about ram and cpu design yesterday",
+]
+
+FILLER = ["the", "my", "please", "a", "for", "me", "now", "quickly", "to", "and", "of", "can", "you"]
+
+
+def reference_match(text):
+    """The old parser loop: every pattern, in order, with re.search"""
+    for rule in intent_matcher.rules:
+        match = re.search(rule.pattern, text)
+        if match:
+            return rule.intent, rule.action, match.groups() if rule.uses_groups else None
+    return None
+
+
+def compiled_match(text):
+    matched = intent_matcher.match(text)
+    if not matched:
+        return None
+    rule, match = matched
+    return rule.intent, rule.action, match.groups() if rule.uses_groups else None
+
+
+def random_corpus(size, seed=0):
+    """Utterances stitched from table keywords and filler words"""
+    rng = random.Random(seed)
+    keywords = sorted({keyword for rule in intent_matcher.rules for req in rule.requirements for keyword in req})
+    words = keywords + FILLER
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(1, 8))) for _ in range(size)]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    corpus = [text.lower().strip() for text in CORPUS]
+
+    checked = corpus + random_corpus(20000)
+    mismatches = [text for text in checked if reference_match(text) != compiled_match(text)]
+    if mismatches:
+        for text in mismatches[:10]:
+            print(f"MISMATCH {text!r}: {reference_match(text)} != {compiled_match(text)}")
+        sys.exit(1)
+    print(f"Equivalent on {len(checked)} utterances")
+
+    def run(matcher):
+        for text in corpus:
+            matcher(text)
+
+    for name, matcher in [("re.search loop", reference_match), ("compiled matcher", compiled_match)]:
+        seconds = timeit.timeit(lambda: run(matcher), number=iterations)
+        per_call = seconds / (iterations * len(corpus)) * 1e6
+        print(f"{name:18s} {per_call:8.2f} us/utterance")
+
+    # Train the fallback classifier outside the timed loop
+    parse_voice_command("hello there")
+    seconds = timeit.timeit(lambda: [parse_voice_command(text) for text in CORPUS], number=iterations)
+    print(f"{'parse_voice_command':18s} {seconds / (iterations * len(CORPUS)) * 1e6:8.2f} us/utterance")
+
+
+if __name__ == "__main__":
+    main()
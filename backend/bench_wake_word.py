@@ -0,0 +1,108 @@
+# backend/bench_wake_word.py
+"""
+Benchmark for the on-device wake word detector.
+
+Runs recorded WAV fixtures through the same path as the microphone
+(AudioCapture segmentation, then WakeWordDetector) and reports the
+detection latency per utterance, the false-accept rate on speech that
+is not the wake word and the false-reject rate on speech that is.
+Fixtures are 16-bit PCM WAV files laid out as:
+
+    FIXTURES/templates/*.wav   the wake word on its own (enrollment recordings)
+    FIXTURES/positive/*.wav    recordings that contain the wake word
+    FIXTURES/negative/*.wav    speech and noise without it
+
+Run from the backend directory:
+
+    python bench_wake_word.py FIXTURES [threshold]
+"""
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+from modules.audio_capture import AudioCapture, WavFileSource
+from modules.wake_word import WakeWordDetector
+
+
+def utterances(path):
+    """The utterances the live capture would cut out of this recording (the whole file if none)"""
+    source = WavFileSource(path)
+    capture = AudioCapture(lambda: WavFileSource(path))
+    found = []
+    while True:
+        utterance = capture.next_utterance(timeout=None, max_age=None)
+        if utterance is None:
+            break
+        found.append(utterance.samples)
+    return (found or [source.samples]), source.sample_rate, len(source.samples) / source.sample_rate
+
+
+def score_files(detector, directory):
+    """[(file, best distance over its utterances, audio seconds)] and per-utterance latencies in ms"""
+    scores, latencies = [], []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        segments, sample_rate, seconds = utterances(path)
+        best = float("inf")
+        for samples in segments:
+            started = time.perf_counter()
+            distance, _ = detector.score(samples, sample_rate)
+            latencies.append((time.perf_counter() - started) * 1000)
+            best = min(best, distance)
+        scores.append((os.path.basename(path), best, seconds))
+    return scores, latencies
+
+
+def rates(positive, negative, threshold):
+    rejected = sum(distance > threshold for _, distance, _ in positive)
+    accepted = sum(distance <= threshold for _, distance, _ in negative)
+    return rejected / max(len(positive), 1), accepted / max(len(negative), 1), accepted
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    fixtures = sys.argv[1]
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    detector = WakeWordDetector(directory=os.path.join(fixtures, "templates"), threshold=threshold)
+    if not detector.ready:
+        print(f"No templates in {os.path.join(fixtures, 'templates')}")
+        sys.exit(1)
+    info = detector.info()
+    print(f"{info['templates']} templates, threshold {info['threshold']}"
+          f" ({'calibrated' if info['calibrated'] else 'fixed'})")
+
+    positive, positive_ms = score_files(detector, os.path.join(fixtures, "positive"))
+    negative, negative_ms = score_files(detector, os.path.join(fixtures, "negative"))
+    latencies = np.array(positive_ms + negative_ms)
+    if len(latencies):
+        print(f"latency     {len(latencies)} utterances: mean {latencies.mean():.1f} ms,"
+              f" p50 {np.percentile(latencies, 50):.1f} ms, p95 {np.percentile(latencies, 95):.1f} ms,"
+              f" max {latencies.max():.1f} ms")
+
+    frr, far, accepted = rates(positive, negative, detector.threshold)
+    hours = sum(seconds for _, _, seconds in negative) / 3600
+    print(f"positive    {len(positive)} files, false rejects {frr:.1%}")
+    print(f"negative    {len(negative)} files, false accepts {far:.1%}"
+          + (f" ({accepted / hours:.1f} per hour of audio)" if hours else ""))
+    for name, distance, _ in positive:
+        if distance > detector.threshold:
+            print(f"  missed   {name}  {distance:.2f}")
+    for name, distance, _ in negative:
+        if distance <= detector.threshold:
+            print(f"  accepted {name}  {distance:.2f}")
+
+    # The same scores at other thresholds, to pick one for NEUROTRAIN_WAKE_THRESHOLD
+    print("\nthreshold  false rejects  false accepts")
+    for factor in (0.7, 0.8, 0.9, 1.0, 1.1, 1.25, 1.5):
+        candidate = detector.threshold * factor
+        frr, far, _ = rates(positive, negative, candidate)
+        print(f"{candidate:9.2f}  {frr:13.1%}  {far:13.1%}")
+
+
+if __name__ == "__main__":
+    main()
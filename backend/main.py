@@ -12,10 +12,10 @@ from fastapi import FastAPI , HTTPException
 from fastapi.middleware.cors import CORSMiddleware  
 from pydantic import BaseModel
 from modules.ai_chat import chat_with_ai
-from routes import tasks,system,scheduler,voice_router  # import the tasks router 
+from routes import tasks,system,scheduler,voice_router,events  # import the tasks router 
 from modules import voice_interface
 from modules.simple_parser import parse_command
-from modules.voice_io import get_voice_analytics
+from modules.voice_io import get_voice_analytics, prerender_phrases, enroll_wake_word
 from modules.memory.memory_chat_history import ( 
     get_user_preferences,
     save_user_habit,
@@ -24,10 +24,63 @@ from modules.memory.memory_chat_history import (
     save_user_preference
     )
 from modules.ai_memory_wrapper import chat_with_memory
+from modules.events import event_bus
+from modules.reminder_engine import reminder_engine
+from modules.metrics_sampler import metrics_sampler
+from modules.metrics_rollup import metrics_rollup
+from modules.app_launcher import app_resolver
+from modules.grammar import grammar_engine
+from modules.intent_classifier import intent_classifier
+from modules.actions import action_registry
+from modules.http_client import OutboundClient
+from modules.tts_worker import tts_worker, PRIORITY_NORMAL
+from modules.audio_capture import audio_capture
+from modules.wake_word import wake_detector
+from contextlib import asynccontextmanager
 import uuid 
 
+
+# Reminder delivery: log it, push it to connected clients, read it out loud
+def log_reminder(reminder: dict):
+    print(f"⏰ Reminder due: {reminder['message']} ({reminder['time']})")
+
+def push_reminder(reminder: dict):
+    event_bus.publish("schedule", "fired", reminder)
+
+def speak_reminder(reminder: dict):
+    from modules.voice_io import speak
+    speak(f"Reminder: {reminder['message']}")
+
+
+#App Lifespan (start/stop background services)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for callback in (log_reminder, push_reminder, speak_reminder):
+        reminder_engine.add_callback(callback)
+    await reminder_engine.start(scheduler.load_schedule())
+    app_resolver.refresh()
+    grammar_engine.reload()
+    intent_classifier.train()
+    prerender_phrases()
+    metrics_rollup.open()
+    metrics_sampler.add_listener(metrics_rollup.add)
+    metrics_sampler.start()
+    # One pooled client for every outbound call, shared with the remote action transport
+    app.state.http_client = OutboundClient(action_registry.base_url)
+    await app.state.http_client.start()
+    action_registry.http = app.state.http_client
+    yield
+    await app.state.http_client.close()
+    tts_worker.stop()
+    audio_capture.stop()
+    metrics_sampler.stop()
+    grammar_engine.save_profile()
+    metrics_rollup.close()
+    await reminder_engine.stop()
+
+
 #FastAPI App Setup
-app=FastAPI()
+app=FastAPI(lifespan=lifespan)
 
 
 #CORS Middleware
@@ -44,6 +97,7 @@ app.include_router(tasks.router , prefix="/api",tags=["tasks"])
 app.include_router(system.router,prefix="/api/system",tags=["system"])
 app.include_router(scheduler.router,prefix="/api",tags=["scheduler"])
 app.include_router(voice_router.router, prefix="/api/voice", tags=["voice"])
+app.include_router(events.router, prefix="/api", tags=["events"])
 
 #Define the Expected Input 
 class ChatRequest(BaseModel):  
@@ -131,6 +185,12 @@ async def chat(message: ChatRequest):
         print(f"ERROR: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def chat_action(text: str, user_id: str = "default_user"):
+    return await chat(ChatRequest(text=text, user_id=user_id))
+
+# Voice commands that fall through to chat are answered in-process
+action_registry.register("chat", chat_action)
+
 
 # Add voice control endpoints
 @app.post("/api/voice/start-listening")
@@ -145,10 +205,13 @@ def stop_voice_listening():
 
 @app.post("/api/voice/command")
 def process_voice_command(command: dict):
-    from modules.voice_io import parse_voice_command, execute_voice_command
+    from modules.voice_io import handle_voice_command
     
-    parsed_command = parse_voice_command(command.get("text", ""))
-    response = execute_voice_command(parsed_command)
+    parsed_command, response = handle_voice_command(
+        command.get("text", ""),
+        session_id=command.get("session_id"),
+        idempotency_key=command.get("idempotency_key")
+    )
     
     return {
         "original_command": command.get("text"),
@@ -159,8 +222,40 @@ def process_voice_command(command: dict):
 @app.post("/api/voice/speak")
 def text_to_speech(text: dict):
     from modules.voice_io import speak
-    speak(text.get("text", ""))
-    return {"message": "Text spoken"}
+    # Queued on the TTS worker; returns before the audio has played
+    handle = speak(
+        text.get("text", ""),
+        priority=text.get("priority", PRIORITY_NORMAL),
+        interrupt=text.get("interrupt", False)
+    )
+    return {"message": "Text queued", "utterance": handle.to_dict()}
+
+@app.post("/api/voice/speak/stop")
+def stop_speaking():
+    """Cut off the current utterance and drop the queue"""
+    tts_worker.interrupt()
+    return {"message": "Speech stopped"}
+
+@app.get("/api/voice/speak/status")
+def speech_status():
+    return tts_worker.info()
+
+@app.get("/api/voice/wake-word")
+def wake_word_status():
+    return wake_detector.info()
+
+@app.post("/api/voice/wake-word/enroll")
+def enroll_wake_word_template():
+    """Record the wake word once more: say it right after calling this (3-5 recordings work best)"""
+    if enroll_wake_word() is None:
+        raise HTTPException(status_code=408, detail="No speech heard")
+    return {"message": "Wake word recorded", **wake_detector.info()}
+
+@app.delete("/api/voice/wake-word")
+def clear_wake_word():
+    """Forget the recordings; wake word checks go back to cloud recognition"""
+    wake_detector.clear()
+    return {"message": "Wake word recordings removed", **wake_detector.info()}
 
 # Add this endpoint to your main.py
 @app.get("/api/voice/analytics")
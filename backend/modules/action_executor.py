@@ -1,13 +1,10 @@
 # backend/modules/action_executor.py
-import requests
 from typing import Dict, Any
 import logging
+from modules.actions import action_registry, ActionError, ActionTimeout
 
 logger = logging.getLogger(__name__)
 
-# Your backend base URL
-BACKEND_BASE = "http://127.0.0.1:8000/api"
-
 def execute_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Execute an action based on the parsed command
@@ -20,18 +17,13 @@ def execute_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
     
     try:
         if action == "task_add" and "title" in params:
-            # Call tasks endpoint to add a task
-            response = requests.post(
-                f"{BACKEND_BASE}/tasks",
-                json={"title": params["title"]},
-                timeout=5
-            )
+            response = action_registry.call_sync("tasks.add", title=params["title"])
             
-            if response.status_code == 200:
+            if response.ok:
                 return {
                     "success": True,
                     "message": f"Task '{params['title']}' added successfully",
-                    "data": response.json()
+                    "data": response.data
                 }
             else:
                 return {
@@ -41,11 +33,10 @@ def execute_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
                 }
                 
         elif action == "task_list":
-            # Call tasks endpoint to get all tasks
-            response = requests.get(f"{BACKEND_BASE}/tasks", timeout=5)
+            response = action_registry.call_sync("tasks.list")
             
-            if response.status_code == 200:
-                tasks = response.json().get("tasks", [])
+            if response.ok:
+                tasks = response.data.get("tasks", [])
                 return {
                     "success": True,
                     "message": f"Found {len(tasks)} tasks",
@@ -68,11 +59,10 @@ def execute_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
             }
             
         elif action == "system_stats":
-            # Call system stats endpoint
-            response = requests.get(f"{BACKEND_BASE}/system/stats", timeout=5)
+            response = action_registry.call_sync("system.stats")
             
-            if response.status_code == 200:
-                stats = response.json()
+            if response.ok:
+                stats = response.data
                 return {
                     "success": True,
                     "message": "System stats retrieved",
@@ -86,18 +76,13 @@ def execute_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
                 }
                 
         elif action == "open_app" and "app" in params:
-            # Call open app endpoint
-            response = requests.post(
-                f"{BACKEND_BASE}/system/open",
-                json={"app_name": params["app"]},
-                timeout=5
-            )
+            response = action_registry.call_sync("system.open", app_name=params["app"])
             
-            if response.status_code == 200:
+            if response.ok:
                 return {
                     "success": True,
                     "message": f"Opening {params['app']}",
-                    "data": response.json()
+                    "data": response.data
                 }
             else:
                 return {
@@ -107,23 +92,18 @@ def execute_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
                 }
                 
         elif action == "schedule":
-            # Call schedule endpoint
             reminder_data = {
                 "time": params.get("time", "now"),
                 "message": params.get("message", "Reminder")
             }
             
-            response = requests.post(
-                f"{BACKEND_BASE}/schedule",
-                json=reminder_data,
-                timeout=5
-            )
+            response = action_registry.call_sync("schedule.add", **reminder_data)
             
-            if response.status_code == 200:
+            if response.ok:
                 return {
                     "success": True,
                     "message": f"Reminder set for {params.get('message')}",
-                    "data": response.json()
+                    "data": response.data
                 }
             else:
                 return {
@@ -133,19 +113,14 @@ def execute_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
                 }
                 
         elif action == "chat":
-            # Call chat endpoint
-            response = requests.post(
-                "http://127.0.0.1:8000/chat",
-                json={"text": params.get("message", "")},
-                timeout=10
-            )
+            response = action_registry.call_sync("chat", text=params.get("message", ""))
             
-            if response.status_code == 200:
-                chat_response = response.json().get("response", "I didn't understand that")
+            if response.ok:
+                chat_response = response.data.get("reply", "I didn't understand that")
                 return {
                     "success": True,
                     "message": "Chat response",
-                    "data": response.json(),
+                    "data": response.data,
                     "tts_response": chat_response
                 }
             else:
@@ -162,13 +137,13 @@ def execute_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
                 "data": None
             }
             
-    except requests.exceptions.Timeout:
+    except ActionTimeout:
         return {
             "success": False,
             "message": "Request timeout - service not responding",
             "data": None
         }
-    except requests.RequestException as e:
+    except ActionError as e:
         return {
             "success": False,
             "message": f"Network error: {e}",
@@ -0,0 +1,159 @@
+# backend/modules/actions.py
+import asyncio
+import inspect
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+import httpx
+from fastapi import HTTPException
+from pydantic import ValidationError
+from modules.http_client import OutboundClient
+
+logger = logging.getLogger(__name__)
+
+# Where each action lives on the HTTP API: (method, path, "json" body or "query" params)
+ACTION_ROUTES: Dict[str, Tuple[str, str, str]] = {
+    "tasks.add": ("POST", "/api/tasks", "json"),
+    "tasks.list": ("GET", "/api/tasks", "query"),
+    "system.stats": ("GET", "/api/system/stats", "query"),
+    "system.processes": ("GET", "/api/system/processes", "query"),
+    "system.open": ("POST", "/api/system/open", "json"),
+    "schedule.add": ("POST", "/api/schedule", "json"),
+    "schedule.upcoming": ("GET", "/api/schedule/upcoming", "query"),
+    "chat": ("POST", "/chat", "json"),
+}
+
+
+class ActionError(Exception):
+    """An action could not be delivered (remote backend down, unknown action)"""
+
+
+class ActionTimeout(ActionError):
+    """The remote backend did not answer in time"""
+
+
+class ActionResult:
+    """Outcome of an action: the status code and JSON body its endpoint would return"""
+
+    def __init__(self, status_code: int, data: Any = None):
+        self.status_code = status_code
+        self.data = data
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+
+class ActionRegistry:
+    """
+    Runs the backend's actions (add a task, read stats, open an app, chat...)
+    for the voice executors.
+
+    The task, schedule, system and chat services register their handlers
+    here when they are imported, and actions are called on them directly:
+    no loopback HTTP request, no JSON round trip, and no worker blocked
+    waiting on itself. With transport "http" (or for an action no handler
+    was registered for in this process) the action is sent to the backend
+    at `base_url` instead, for deployments that run voice separately,
+    through the shared OutboundClient (the app lifespan injects its own).
+    """
+
+    def __init__(self, transport: str = "local", base_url: str = "http://127.0.0.1:8000",
+                 http: Optional[OutboundClient] = None):
+        self.transport = transport
+        self.base_url = base_url.rstrip("/")
+        self._http = http
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def http(self) -> OutboundClient:
+        """Client for the remote transport (a default one is made on first use)"""
+        with self._lock:
+            if self._http is None:
+                self._http = OutboundClient(self.base_url)
+            return self._http
+
+    @http.setter
+    def http(self, client: OutboundClient):
+        with self._lock:
+            self._http = client
+
+    def register(self, name: str, handler: Callable[..., Any]):
+        """Serve `name` in-process with `handler(**params)` (sync or async)"""
+        with self._lock:
+            self._handlers[name] = handler
+
+    def handler(self, name: str) -> Optional[Callable[..., Any]]:
+        if self.transport != "local":
+            return None
+        return self._handlers.get(name)
+
+    async def call(self, name: str, **params) -> ActionResult:
+        """Run an action from async code; blocking handlers run in a worker thread"""
+        handler = self.handler(name)
+        if handler is None:
+            return await self._remote(name, params)
+        try:
+            if inspect.iscoroutinefunction(handler):
+                return ActionResult(200, await handler(**params))
+            return ActionResult(200, await asyncio.to_thread(handler, **params))
+        except Exception as e:
+            return self._failure(name, e)
+
+    def call_sync(self, name: str, **params) -> ActionResult:
+        """Run an action from synchronous code (a worker or listener thread)"""
+        handler = self.handler(name)
+        if handler is None:
+            return self.http.run_sync(self._remote(name, params))
+        try:
+            if inspect.iscoroutinefunction(handler):
+                # Checked before the coroutine exists, so none is left un-awaited
+                if _running_loop() is not None:
+                    raise RuntimeError(f"call_sync({name!r}) from a running event loop: use call()")
+                return ActionResult(200, asyncio.run(handler(**params)))
+            return ActionResult(200, handler(**params))
+        except Exception as e:
+            return self._failure(name, e)
+
+    def _failure(self, name: str, error: Exception) -> ActionResult:
+        """The status the endpoint would have answered with"""
+        if isinstance(error, HTTPException):
+            return ActionResult(error.status_code, {"detail": error.detail})
+        if isinstance(error, ValidationError):
+            return ActionResult(422, {"detail": str(error)})
+        logger.error(f"Action {name} failed: {error}")
+        return ActionResult(500, {"detail": str(error)})
+
+    async def _remote(self, name: str, params: Dict[str, Any]) -> ActionResult:
+        """Remote transport: call the action's endpoint on `base_url`"""
+        if name not in ACTION_ROUTES:
+            raise ActionError(f"Unknown action: {name}")
+        method, path, style = ACTION_ROUTES[name]
+        payload = {"json": params} if style == "json" else {"params": params}
+        try:
+            response = await self.http.request(method, path, **payload)
+        except httpx.TimeoutException as e:
+            raise ActionTimeout(f"{name} timed out") from e
+        except httpx.HTTPError as e:
+            raise ActionError(f"{name}: {e}") from e
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return ActionResult(response.status_code, data)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# Global instance; NEUROTRAIN_ACTION_TRANSPORT=http sends every action to NEUROTRAIN_BACKEND_URL
+action_registry = ActionRegistry(
+    transport=os.environ.get("NEUROTRAIN_ACTION_TRANSPORT", "local"),
+    base_url=os.environ.get("NEUROTRAIN_BACKEND_URL", "http://127.0.0.1:8000")
+)
@@ -0,0 +1,197 @@
+# backend/modules/app_catalog.py
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Every app the assistant knows: spoken names and candidate executables
+# (tried in order). Apps with no commands can be named but not launched.
+APP_CATALOG: Dict[str, Dict[str, List[str]]] = {
+    # Web browsers
+    "chrome": {"names": ["chrome", "google chrome"], "commands": ["google-chrome", "chrome", "google-chrome-stable"]},
+    "firefox": {"names": ["firefox", "mozilla firefox"], "commands": ["firefox"]},
+    "browser": {"names": ["browser", "web browser", "internet"], "commands": ["chrome.exe", "google-chrome", "firefox"]},
+    "edge": {"names": ["edge", "microsoft edge"], "commands": ["msedge.exe", "microsoft-edge"]},
+    "safari": {"names": ["safari"], "commands": ["safari"]},
+    "opera": {"names": ["opera"], "commands": ["opera.exe", "opera"]},
+    "brave": {"names": ["brave", "brave browser"], "commands": ["brave.exe", "brave-browser"]},
+
+    # Office and productivity
+    "notepad": {"names": ["notepad", "text editor", "gedit"], "commands": ["notepad.exe", "gedit", "textedit"]},
+    "word": {"names": ["word", "microsoft word"], "commands": ["winword.exe", "lowriter"]},
+    "excel": {"names": ["excel", "microsoft excel", "spreadsheet"], "commands": ["excel.exe", "localc"]},
+    "powerpoint": {"names": ["powerpoint", "microsoft powerpoint"], "commands": ["powerpnt.exe", "loimpress"]},
+    "outlook": {"names": ["outlook", "email", "mail"], "commands": ["outlook.exe", "thunderbird"]},
+    "calendar": {"names": ["calendar"], "commands": ["gnome-calendar"]},
+    "notes": {"names": ["notes", "stickies", "sticky notes"], "commands": ["stikynot.exe", "xpad"]},
+
+    # Development tools
+    "vscode": {"names": ["vscode", "vs code", "visual studio code", "code"], "commands": ["code", "visual-studio-code"]},
+    "visual_studio": {"names": ["visual studio"], "commands": ["devenv.exe"]},
+    "pycharm": {"names": ["pycharm"], "commands": ["pycharm64.exe", "pycharm", "pycharm-community"]},
+    "intellij": {"names": ["intellij", "idea", "intellij idea"], "commands": ["idea64.exe", "idea", "intellij-idea-community"]},
+    "eclipse": {"names": ["eclipse"], "commands": ["eclipse.exe", "eclipse"]},
+    "sublime": {"names": ["sublime", "sublime text"], "commands": ["sublime_text.exe", "subl"]},
+    "atom": {"names": ["atom"], "commands": ["atom"]},
+    "terminal": {"names": ["terminal", "command prompt", "cmd", "console"], "commands": ["cmd.exe", "gnome-terminal", "terminal"]},
+    "powershell": {"names": ["powershell"], "commands": ["powershell.exe", "pwsh"]},
+
+    # Media and entertainment
+    "calculator": {"names": ["calculator", "calc"], "commands": ["calc.exe", "gnome-calculator"]},
+    "spotify": {"names": ["spotify"], "commands": ["spotify.exe", "spotify"]},
+    "vlc": {"names": ["vlc", "media player", "vlc media player"], "commands": ["vlc.exe", "vlc"]},
+    "windows_media_player": {"names": ["windows media player"], "commands": ["wmplayer.exe"]},
+    "itunes": {"names": ["itunes"], "commands": ["itunes.exe"]},
+    "netflix": {"names": ["netflix"], "commands": []},
+    "youtube": {"names": ["youtube"], "commands": []},
+
+    # Communication apps
+    "slack": {"names": ["slack"], "commands": ["slack.exe", "slack"]},
+    "discord": {"names": ["discord"], "commands": ["discord.exe", "discord"]},
+    "teams": {"names": ["teams", "microsoft teams"], "commands": ["ms-teams.exe", "teams"]},
+    "zoom": {"names": ["zoom"], "commands": ["zoom.exe", "zoom"]},
+    "skype": {"names": ["skype"], "commands": ["skype.exe", "skypeforlinux"]},
+    "whatsapp": {"names": ["whatsapp"], "commands": ["whatsapp.exe"]},
+
+    # Graphics and design
+    "photoshop": {"names": ["photoshop"], "commands": ["photoshop.exe"]},
+    "illustrator": {"names": ["illustrator"], "commands": ["illustrator.exe"]},
+    "paint": {"names": ["paint", "ms paint"], "commands": ["mspaint.exe", "pinta"]},
+    "gimp": {"names": ["gimp"], "commands": ["gimp"]},
+    "inkscape": {"names": ["inkscape"], "commands": ["inkscape"]},
+
+    # File management
+    "explorer": {"names": ["explorer", "file explorer", "files", "file manager"], "commands": ["explorer.exe", "nautilus", "dolphin"]},
+    "finder": {"names": ["finder"], "commands": ["finder"]},
+
+    # System utilities
+    "task_manager": {"names": ["task manager", "system monitor"], "commands": ["taskmgr.exe", "gnome-system-monitor"]},
+    "control_panel": {"names": ["control panel"], "commands": ["control.exe"]},
+    "settings": {"names": ["settings"], "commands": ["gnome-control-center"]},
+
+    # Games
+    "steam": {"names": ["steam"], "commands": ["steam.exe", "steam"]},
+    "epic_games": {"names": ["epic games", "epic games launcher"], "commands": ["epicgameslauncher.exe"]},
+    "minecraft": {"names": ["minecraft"], "commands": ["minecraftlauncher.exe", "minecraft-launcher"]},
+}
+
+# Verbs an app name follows ("how do i open a file in python": the name has to come right after)
+LAUNCH_PATTERN = re.compile(
+    r"\b(?:open|launch|start|run|fire up|bring up|pull up|boot up|load up|switch to|go to|get me)\b"
+)
+
+# Words around an app name that never belong to it ("could you open the ... please")
+FILLER_PATTERN = re.compile(
+    r"\b(?:open|launch|start|run|fire up|bring up|pull up|boot up|load up|switch to|go to|get me|"
+    r"could you|can you|please|for me|i want|i need|the|a|an|my|app|application|program|now|up)\b"
+)
+
+
+def _squash(name: str) -> str:
+    """Letters and digits only: "Fire Fox" and "v s code" become "firefox" and "vscode\""""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def _trigrams(squashed: str) -> set:
+    padded = f" {squashed} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AppCatalog:
+    """
+    Resolves spoken app names to catalog IDs.
+
+    Every name of every app is split into character trigrams once, into an
+    inverted index (trigram -> names containing it). A query only touches
+    the posting lists of its own trigrams and scores the names they share
+    with the Dice coefficient, so misheard names ("fire fox", "v s code",
+    "note pad") still resolve, with a similarity score. Resolved queries
+    are memoised, so repeated phrases cost a dict lookup.
+    """
+
+    def __init__(self, catalog: Dict[str, Dict[str, List[str]]], threshold: float = 0.6,
+                 max_window: int = 3, cache_size: int = 4096):
+        self.catalog = catalog
+        self.threshold = threshold
+        self.max_window = max_window
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Optional[Tuple[str, float]]]" = OrderedDict()
+
+        # (app id, trigram count) per indexed name, and trigram -> name positions
+        self._names: List[Tuple[str, int]] = []
+        self._index: Dict[str, List[int]] = {}
+        self._exact: Dict[str, str] = {}
+        for app_id, entry in catalog.items():
+            for name in [app_id.replace("_", " ")] + entry["names"]:
+                squashed = _squash(name)
+                if not squashed or squashed in self._exact:
+                    continue
+                self._exact[squashed] = app_id
+                grams = _trigrams(squashed)
+                for gram in grams:
+                    self._index.setdefault(gram, []).append(len(self._names))
+                self._names.append((app_id, len(grams)))
+
+    def app_commands(self) -> Dict[str, List[str]]:
+        """The launcher's view of the catalog: app id -> candidate executables"""
+        return {app_id: entry["commands"] for app_id, entry in self.catalog.items()}
+
+    def match(self, name: str) -> Optional[Tuple[str, float]]:
+        """Best (app id, similarity) for a spoken name, or None below the threshold"""
+        squashed = _squash(name)
+        if not squashed:
+            return None
+        if squashed in self._exact:
+            return self._exact[squashed], 1.0
+
+        grams = _trigrams(squashed)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for position in self._index.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        best, best_score = None, 0.0
+        for position, common in shared.items():
+            app_id, size = self._names[position]
+            score = 2 * common / (len(grams) + size)
+            if score > best_score:
+                best, best_score = app_id, score
+        if best is None or best_score < self.threshold:
+            return None
+        return best, round(best_score, 3)
+
+    def resolve(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the app named in an utterance: right after its first launch
+        verb (or at the start, for a bare name), filler removed. Runs of up
+        to `max_window` words from there are matched and the best one wins;
+        a fuzzy (misheard) match only counts when it is all that was said,
+        so "run some code" or "open a file in python" open nothing.
+        """
+        with self._lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                return self._cache[text]
+
+        lowered = text.lower()
+        verb = LAUNCH_PATTERN.search(lowered)
+        words = FILLER_PATTERN.sub(" ", lowered[verb.end():] if verb else lowered).split()
+        best = None
+        for size in range(1, min(self.max_window, len(words)) + 1):
+            found = self.match(" ".join(words[:size]))
+            if not found or (found[1] < 1.0 and size < len(words)):
+                continue
+            # Prefer higher scores, then longer spans ("visual studio code" over "code")
+            if best is None or (found[1], size) > (best[1], best[2]):
+                best = (found[0], found[1], size)
+        result = (best[0], best[1]) if best else None
+
+        with self._lock:
+            self._cache[text] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+
+# Global instance shared by the launcher and the command grammar
+app_catalog = AppCatalog(APP_CATALOG)
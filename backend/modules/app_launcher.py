@@ -0,0 +1,221 @@
+# backend/modules/app_launcher.py
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import psutil
+from modules.app_catalog import app_catalog
+
+logger = logging.getLogger(__name__)
+
+# Candidate executables for each app, tried in order (from the shared catalog)
+APP_COMMANDS: Dict[str, List[str]] = app_catalog.app_commands()
+
+
+class AppResolver:
+    """
+    Maps app names to the executable that will actually run.
+
+    Candidates are resolved against PATH once and cached; the cache is
+    rebuilt only when PATH (or PATHEXT on Windows) changes. Launching then
+    execs the resolved binary directly instead of trying each candidate
+    with a failing fork/exec, and unknown or uninstalled apps can be
+    rejected before anything is spawned.
+    """
+
+    def __init__(self, app_commands: Dict[str, List[str]]):
+        self.app_commands = app_commands
+        self._lock = threading.Lock()
+        self._environment: Optional[tuple] = None
+        self._resolved: Dict[str, str] = {}
+
+    def _current_environment(self) -> tuple:
+        return (os.environ.get("PATH", ""), os.environ.get("PATHEXT", ""))
+
+    def refresh(self, force: bool = False):
+        """Re-resolve every app if PATH changed since the last resolution"""
+        environment = self._current_environment()
+        if not force and environment == self._environment:
+            return
+        with self._lock:
+            if not force and environment == self._environment:
+                return
+            resolved = {}
+            for app_name, candidates in self.app_commands.items():
+                for command in candidates:
+                    executable = shutil.which(command)
+                    if executable:
+                        resolved[app_name] = executable
+                        break
+            self._resolved = resolved
+            self._environment = environment
+
+    def is_supported(self, app_name: str) -> bool:
+        return app_name in self.app_commands
+
+    def resolve(self, app_name: str) -> Optional[str]:
+        """Full path of the app's executable, or None if it isn't installed"""
+        self.refresh()
+        return self._resolved.get(app_name)
+
+    def available(self) -> Dict[str, str]:
+        """Installed apps and the executable each one launches"""
+        self.refresh()
+        return dict(self._resolved)
+
+
+class AppLauncher:
+    """
+    Launches apps without blocking and keeps track of what it started.
+
+    Every child is reaped by a small waiter thread (no zombies) that also
+    records its exit status, so the registry knows which launches are still
+    running. The waiter marks a launch that dies within `startup_check`
+    seconds with a non-zero code as failed; launch() itself never waits.
+    With dedupe on, an app that is already running is brought to the front
+    instead of being started again. A running instance is recognized by its
+    executable (symlinks resolved), by a script run through an interpreter,
+    by process name, or as a process left behind by a launcher script we
+    started (same session).
+    """
+
+    def __init__(self, resolver: AppResolver, startup_check: float = 0.3, max_records: int = 100):
+        self.resolver = resolver
+        self.startup_check = startup_check
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        self._records: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+
+    def launch(self, app_name: str, dedupe: bool = True) -> Dict[str, Any]:
+        """Start (or focus) an installed app; returns the launch record and outcome"""
+        executable = self.resolver.resolve(app_name)
+        if executable is None:
+            return {"status": "not_installed", "success": False}
+
+        if dedupe:
+            pid = self._find_running(app_name, executable)
+            if pid is not None:
+                return {"status": "already_running", "success": True, "pid": pid, "focused": focus_window(pid)}
+
+        process = subprocess.Popen(
+            [executable],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            # Detach so the app outlives the server and doesn't get our Ctrl+C
+            **_detach_kwargs()
+        )
+        record = {
+            "pid": process.pid,
+            "app_name": app_name,
+            "executable": executable,
+            "started_at": datetime.now().isoformat(),
+            "status": "running",
+            "returncode": None,
+            "ended_at": None
+        }
+        with self._lock:
+            self._records[process.pid] = record
+            self._prune()
+            launched = dict(record)
+        threading.Thread(
+            target=self._reap, args=(process, record, time.monotonic()),
+            name=f"reap-{app_name}-{process.pid}", daemon=True
+        ).start()
+        return {"status": "launched", "success": True, "pid": process.pid, "record": launched}
+
+    def _reap(self, process: subprocess.Popen, record: Dict[str, Any], started: float):
+        returncode = process.wait()
+        # Apps that fail right away (bad install, missing display, ...)
+        failed = returncode != 0 and time.monotonic() - started < self.startup_check
+        with self._lock:
+            record["status"] = "failed" if failed else "exited"
+            record["returncode"] = returncode
+            record["ended_at"] = datetime.now().isoformat()
+        if failed:
+            logger.warning(f"{record['app_name']} exited with code {returncode} right after launch")
+
+    def _prune(self):
+        """Forget the oldest finished launches beyond max_records"""
+        finished = [pid for pid, r in self._records.items() if r["status"] != "running"]
+        for pid in finished[:max(len(self._records) - self.max_records, 0)]:
+            del self._records[pid]
+
+    def _find_running(self, app_name: str, executable: str) -> Optional[int]:
+        """PID of a live instance: one we launched, or one started some other way"""
+        with self._lock:
+            for pid, record in reversed(self._records.items()):
+                if record["app_name"] == app_name and record["status"] == "running":
+                    return pid
+            # A launcher script may start the app and exit; what it started stays in its session
+            sessions = {pid for pid, record in self._records.items()
+                        if record["app_name"] == app_name and record["status"] == "exited"}
+
+        path = os.path.realpath(executable)
+        target = os.path.splitext(os.path.basename(executable))[0].lower()
+        for proc in psutil.process_iter(["name", "exe", "cmdline", "status"]):
+            if proc.info.get("status") == psutil.STATUS_ZOMBIE:
+                continue
+            if sessions and _session_id(proc.pid) in sessions:
+                return proc.pid
+            exe = proc.info.get("exe")
+            if exe and os.path.realpath(exe) == path:
+                return proc.pid
+            # A script shows up as its interpreter, with the script as the first argument
+            arguments = (proc.info.get("cmdline") or [])[1:2]
+            if any(os.path.isabs(arg) and os.path.realpath(arg) == path for arg in arguments):
+                return proc.pid
+            name = (proc.info.get("name") or "").lower()
+            if os.path.splitext(name)[0] == target:
+                return proc.pid
+        return None
+
+    def records(self) -> List[Dict[str, Any]]:
+        """All tracked launches, newest first"""
+        with self._lock:
+            return [dict(r) for r in reversed(self._records.values())]
+
+
+def _session_id(pid: int) -> Optional[int]:
+    try:
+        return os.getsid(pid)
+    except (AttributeError, OSError):  # no sessions on Windows; or the process is gone
+        return None
+
+
+def _detach_kwargs() -> Dict[str, Any]:
+    if platform.system() == "Windows":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS}
+    return {"start_new_session": True}
+
+
+def focus_window(pid: int) -> bool:
+    """Best-effort: bring the window of `pid` to the front"""
+    system = platform.system()
+    if system == "Windows":
+        command = ["powershell", "-NoProfile", "-Command",
+                   f"(New-Object -ComObject WScript.Shell).AppActivate({pid})"]
+    elif system == "Darwin":
+        command = ["osascript", "-e",
+                   f'tell application "System Events" to set frontmost of (first process whose unix id is {pid}) to true']
+    elif shutil.which("xdotool"):
+        command = ["xdotool", "search", "--pid", str(pid), "windowactivate"]
+    else:
+        return False
+
+    try:
+        return subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              timeout=3).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+# Global instances shared by the system routes and the voice parser
+app_resolver = AppResolver(APP_COMMANDS)
+app_launcher = AppLauncher(app_resolver)
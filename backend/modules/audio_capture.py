@@ -0,0 +1,398 @@
+# backend/modules/audio_capture.py
+import logging
+import queue
+import threading
+import time
+import wave
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+
+class ArraySource:
+    """
+    Audio from a NumPy array (int16 samples, mono), framed like a
+    microphone. With realtime=True frames arrive at the pace of the audio.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS,
+                 realtime: bool = False):
+        self.samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.realtime = realtime
+        self._position = 0
+
+    def read(self) -> Optional[np.ndarray]:
+        """The next frame, or None at the end of the audio"""
+        if self._position >= len(self.samples):
+            return None
+        frame = self.samples[self._position:self._position + self.frame_size]
+        self._position += self.frame_size
+        if len(frame) < self.frame_size:
+            frame = np.pad(frame, (0, self.frame_size - len(frame)))
+        if self.realtime:
+            time.sleep(self.frame_size / self.sample_rate)
+        return frame
+
+    def close(self):
+        pass
+
+
+class WavFileSource(ArraySource):
+    """Audio from a 16-bit PCM WAV file (stereo is mixed down to mono)"""
+
+    def __init__(self, path: str, frame_ms: int = FRAME_MS, realtime: bool = False):
+        with wave.open(path, "rb") as audio:
+            if audio.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{path}: expected 16-bit PCM, got {8 * audio.getsampwidth()}-bit")
+            samples = np.frombuffer(audio.readframes(audio.getnframes()), dtype=np.int16)
+            channels = audio.getnchannels()
+            sample_rate = audio.getframerate()
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        super().__init__(samples, sample_rate, frame_ms, realtime)
+
+
+class MicrophoneSource:
+    """The default microphone, opened once and read frame by frame"""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS, device_index: Optional[int] = None):
+        import speech_recognition as sr
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self._microphone = sr.Microphone(device_index=device_index, sample_rate=sample_rate,
+                                         chunk_size=self.frame_size)
+        self._stream = self._microphone.__enter__().stream
+
+    def read(self) -> Optional[np.ndarray]:
+        return np.frombuffer(self._stream.read(self.frame_size), dtype=np.int16)
+
+    def close(self):
+        self._microphone.__exit__(None, None, None)
+
+
+class AudioRing:
+    """The last `capacity` samples of the stream, addressed by absolute sample position"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self.total = 0  # samples written since the start of the stream
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.total - self.capacity)
+
+    def write(self, samples: np.ndarray):
+        samples = samples[-self.capacity:]
+        start = self.total % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[:len(samples) - first] = samples[first:]
+        self.total += len(samples)
+
+    def slice(self, start: int, end: int) -> np.ndarray:
+        """Samples [start, end) of the stream (clipped to what is still held)"""
+        start, end = max(start, self.oldest), min(end, self.total)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        indices = np.arange(start, end) % self.capacity
+        return self._buffer[indices]
+
+
+def frame_features(frame: np.ndarray) -> Tuple[float, float]:
+    """(energy in dBFS, zero-crossing rate) of one frame of int16 samples"""
+    x = frame.astype(np.float32) / 32768.0
+    energy_db = 10.0 * np.log10(np.mean(x * x) + 1e-10)
+    signs = np.signbit(x)
+    zcr = np.count_nonzero(signs[1:] != signs[:-1]) / max(len(x) - 1, 1)
+    return float(energy_db), float(zcr)
+
+
+class EnergyVAD:
+    """
+    Voice activity from frame energy and zero-crossing rate, against a
+    noise floor that keeps adapting.
+
+    A frame is speech when it is `threshold_db` above the noise floor, or
+    at least half that and with a zero-crossing rate typical of unvoiced
+    sounds ("s", "f"), which are quiet but noisy. The floor follows the
+    quietest of the last `window_frames` frames (minimum statistics): the
+    pauses between words keep it at the room's level while someone talks,
+    and a fan switching on raises it within a few seconds instead of being
+    heard as one long utterance. While an utterance is in progress the
+    floor rises only at `speech_adapt_rate`, so a long stretch of speech
+    with no pauses is not absorbed into it.
+    """
+
+    def __init__(self, threshold_db: float = 12.0, zcr_range: Tuple[float, float] = (0.25, 0.6),
+                 window_frames: int = 66, adapt_rate: float = 0.1, speech_adapt_rate: float = 0.02,
+                 fall_rate: float = 0.3, warmup_frames: int = 10, initial_floor_db: float = -60.0):
+        self.threshold_db = threshold_db
+        self.zcr_range = zcr_range
+        self.adapt_rate = adapt_rate
+        self.speech_adapt_rate = speech_adapt_rate
+        self.fall_rate = fall_rate
+        self.warmup_frames = warmup_frames
+        self.noise_floor_db = initial_floor_db
+        self._recent: deque = deque(maxlen=window_frames)
+        self._frames = 0
+
+    def is_speech(self, frame: np.ndarray, in_utterance: bool = False) -> bool:
+        energy_db, zcr = frame_features(frame)
+        self._frames += 1
+        self._recent.append(energy_db)
+        if self._frames <= self.warmup_frames:
+            # The first frames calibrate the floor (what adjust_for_ambient_noise did on every call)
+            self.noise_floor_db += (energy_db - self.noise_floor_db) / self._frames
+            return False
+
+        above = energy_db - self.noise_floor_db
+        low, high = self.zcr_range
+        speech = above > self.threshold_db or (above > self.threshold_db / 2 and low <= zcr <= high)
+        quietest = min(self._recent)
+        if quietest < self.noise_floor_db:
+            rate = self.fall_rate
+        else:
+            rate = self.speech_adapt_rate if in_utterance else self.adapt_rate
+        self.noise_floor_db += rate * (quietest - self.noise_floor_db)
+        return speech
+
+
+class Segmenter:
+    """
+    Turns per-frame speech decisions into utterances: speech starts after
+    `start_frames` speech frames in a row (plus `pre_roll` samples before
+    them) and ends after `hangover` samples of silence or at `max_length`.
+    """
+
+    def __init__(self, frame_size: int, sample_rate: int, start_frames: int = 3, pre_roll_ms: int = 300,
+                 hangover_ms: int = 600, min_speech_ms: int = 250, max_length_s: float = 15.0):
+        self.frame_size = frame_size
+        self.start_frames = start_frames
+        self.pre_roll = sample_rate * pre_roll_ms // 1000
+        self.hangover_frames = max(1, hangover_ms * sample_rate // 1000 // frame_size)
+        self.min_speech = sample_rate * min_speech_ms // 1000
+        self.max_length = int(sample_rate * max_length_s)
+        self.active = False
+        self.start = 0
+        self._run = 0
+        self._silence = 0
+
+    def push(self, is_speech: bool, end: int, cut: bool = False) -> Optional[Tuple[int, int]]:
+        """Feed the decision for the frame ending at sample `end`; returns a finished (start, end) span"""
+        if not self.active:
+            self._run = self._run + 1 if is_speech else 0
+            if self._run >= self.start_frames:
+                self.active = True
+                self.start = max(0, end - self._run * self.frame_size - self.pre_roll)
+                self._silence = 0
+            return None
+
+        self._silence = 0 if is_speech else self._silence + 1
+        if self._silence < self.hangover_frames and end - self.start < self.max_length and not cut:
+            return None
+        self.active = False
+        self._run = 0
+        # Keep a little of the trailing silence so the last word isn't clipped
+        span_end = end - max(0, self._silence - 2) * self.frame_size
+        if span_end - self.start - self.pre_roll < self.min_speech:
+            return None
+        return self.start, span_end
+
+    def flush(self, end: int) -> Optional[Tuple[int, int]]:
+        """End of the stream: finish an utterance still in progress"""
+        return self.push(False, end, cut=True) if self.active else None
+
+
+class Utterance:
+    """A segmented stretch of speech"""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int, start: int, end: int):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.start = start  # sample positions in the stream
+        self.end = end
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def to_bytes(self) -> bytes:
+        """16-bit little-endian PCM, as speech_recognition's AudioData expects"""
+        return self.samples.astype("<i2").tobytes()
+
+
+class AudioCapture:
+    """
+    One audio stream kept open for the life of the process.
+
+    A capture thread reads fixed-size frames into a ring buffer and runs
+    each through the VAD and segmenter; finished utterances are cut from
+    the ring (with a little audio from before speech started) and queued.
+    Nothing is lost between listen() calls and nobody waits for noise
+    calibration. The source is any object with read()/close() and
+    sample_rate/frame_size (microphone, WAV file or array).
+    """
+
+    def __init__(self, source_factory: Callable[[], object] = MicrophoneSource, ring_seconds: float = 30.0,
+                 vad: Optional[EnergyVAD] = None, max_queued: int = 20, **segmenter_options):
+        self.source_factory = source_factory
+        self.ring_seconds = ring_seconds
+        self.vad = vad or EnergyVAD()
+        self.segmenter_options = segmenter_options
+        self.sample_rate = SAMPLE_RATE
+        self.ring: Optional[AudioRing] = None
+        self.segmenter: Optional[Segmenter] = None
+        self._utterances: "queue.Queue[Optional[Utterance]]" = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._exhausted = False   # a finite source (file, array) has been read to the end
+        self._cut = False
+        self._claim = threading.Lock()
+        self._owner: Optional[int] = None   # thread that has the utterances to itself
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def position(self) -> int:
+        """Samples captured so far"""
+        return self.ring.total if self.ring else 0
+
+    def start(self):
+        """Open the source (if not open yet) and start capturing"""
+        with self._lock:
+            if self._running:
+                return
+            source = self.source_factory()
+            self.sample_rate = source.sample_rate
+            self.ring = AudioRing(int(self.ring_seconds * source.sample_rate))
+            self.segmenter = Segmenter(source.frame_size, source.sample_rate, **self.segmenter_options)
+            self._running, self._exhausted = True, False
+            self._thread = threading.Thread(target=self._run, args=(source,), name="audio-capture", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, source):
+        try:
+            while self._running:
+                frame = source.read()
+                if frame is None:
+                    self._exhausted = True
+                    span = self.segmenter.flush(self.ring.total)
+                    if span is not None:
+                        self._emit(Utterance(self.ring.slice(*span), source.sample_rate, *span))
+                    break
+                self.ring.write(frame)
+                speech = self.vad.is_speech(frame, in_utterance=self.segmenter.active)
+                span = self.segmenter.push(speech, self.ring.total, cut=self._cut)
+                self._cut = False
+                if span is not None:
+                    self._emit(Utterance(self.ring.slice(*span), source.sample_rate, *span))
+        except Exception as e:
+            logger.error(f"Audio capture stopped: {e}")
+        finally:
+            source.close()
+            self._running = False
+            self._emit(None)  # wake up a waiting listener
+
+    def _emit(self, utterance: Optional[Utterance]):
+        try:
+            self._utterances.put_nowait(utterance)
+        except queue.Full:
+            # Nobody is listening; the oldest speech is the least interesting
+            try:
+                self._utterances.get_nowait()
+            except queue.Empty:
+                pass
+            self._utterances.put_nowait(utterance)
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Only the calling thread gets utterances until the block ends (e.g.
+        enrollment while a listening loop runs); other listeners wait.
+        """
+        with self._claim:
+            self._owner = threading.get_ident()
+            try:
+                yield self
+            finally:
+                self._owner = None
+
+    def _waiting(self) -> bool:
+        return self._owner is not None and self._owner != threading.get_ident()
+
+    def next_utterance(self, timeout: Optional[float] = 5.0, phrase_time_limit: Optional[float] = None,
+                       max_age: Optional[float] = 2.0, since: Optional[int] = None) -> Optional[Utterance]:
+        """
+        The next utterance, waiting up to `timeout` seconds for speech to
+        start. Speech running past `phrase_time_limit` is cut there.
+        Utterances that ended more than `max_age` seconds of audio before
+        this call (said while nobody was listening), or that started
+        before sample `since`, are skipped. While another thread holds
+        exclusive(), this only waits out its timeout.
+        """
+        if not self._exhausted:
+            self.start()
+        called_at = self.position
+        deadline = None if timeout is None else time.monotonic() + timeout
+        onset = None
+        while True:
+            if self._waiting():
+                time.sleep(0.05)
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None
+                continue
+            try:
+                utterance = self._utterances.get(timeout=0.05)
+            except queue.Empty:
+                utterance = False
+            if self._waiting() and utterance is not False:
+                self._emit(utterance)  # taken just as the claim began: it's the owner's
+                continue
+            if utterance is not None and utterance is not False:
+                if since is not None and utterance.start < since:
+                    continue
+                if max_age is None or (called_at - utterance.end) / self.sample_rate <= max_age:
+                    return utterance
+                continue
+            if not self._running and self._utterances.empty():
+                return None
+
+            now = time.monotonic()
+            if self.segmenter.active:
+                onset = onset or now
+                if phrase_time_limit is not None and now - onset >= phrase_time_limit:
+                    self._cut = True
+            elif deadline is not None and now >= deadline:
+                return None
+
+    def info(self):
+        return {
+            "running": self._running,
+            "sample_rate": self.sample_rate,
+            "seconds_captured": round(self.position / self.sample_rate, 1),
+            "noise_floor_db": round(self.vad.noise_floor_db, 1),
+            "in_speech": bool(self.segmenter and self.segmenter.active),
+            "queued": self._utterances.qsize()
+        }
+
+
+# Global instance for the microphone; opened by the first listen()
+audio_capture = AudioCapture()
@@ -0,0 +1,130 @@
+# backend/modules/command_dedup.py
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from modules.grammar import normalize
+
+DEFAULT_SCOPE = "default"
+
+
+def command_key(text: str) -> str:
+    """What makes two utterances "the same command": case, punctuation and spacing don't count"""
+    return " ".join(re.sub(r"[^\w\s]", " ", normalize(text)).split())
+
+
+class CommandDeduplicator:
+    """
+    Idempotency layer in front of command execution.
+
+    The listening loop and the frontend can both submit one utterance
+    seconds apart. A command is keyed on (session, normalized text, time
+    bucket of `window` seconds), whichever entry point it came through; a
+    copy arriving within `window` seconds of the first (the current or the
+    previous bucket) gets the first one's result instead of running again,
+    and a copy arriving while the first is still running waits for it. A
+    client-supplied idempotency key replaces the text and is remembered
+    for `key_ttl` seconds.
+
+    Entry points return results in their own shape, so each run is tagged
+    with its caller `kind`; a copy that arrives through another entry point
+    gets the result passed through its `reshape(kind, result)`.
+
+    Results the caller does not want to keep (`keep` returns False, e.g.
+    a failure) and exceptions are handed to any waiting copies but
+    forgotten, so the user can simply retry.
+    """
+
+    def __init__(self, window: float = 10.0, key_ttl: float = 300.0, max_entries: int = 10_000):
+        self.window = window
+        self.key_ttl = key_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (monotonic start time, future of (kind, result)), oldest first
+        self._recent: "OrderedDict[tuple, Tuple[float, Future]]" = OrderedDict()
+        self._keyed: "OrderedDict[tuple, Tuple[float, Future]]" = OrderedDict()
+
+    def _expire(self, entries: "OrderedDict[tuple, Tuple[float, Future]]", ttl: float, now: float):
+        while entries:
+            started, _ = next(iter(entries.values()))
+            if now - started <= ttl and len(entries) <= self.max_entries:
+                break
+            entries.popitem(last=False)
+
+    def _claim(self, scope: Optional[str], text: str, client_key: Optional[str]) -> Tuple[tuple, Future, bool]:
+        """(key, future, duplicate): a duplicate waits on the future, the original completes it"""
+        now = time.monotonic()
+        scope = scope or DEFAULT_SCOPE
+        with self._lock:
+            if client_key:
+                entries, ttl = self._keyed, self.key_ttl
+                keys = [(scope, client_key)]
+            else:
+                entries, ttl = self._recent, self.window
+                bucket = int(now // self.window)
+                command = command_key(text)
+                keys = [(scope, command, bucket), (scope, command, bucket - 1)]
+            self._expire(entries, ttl, now)
+            for key in keys:
+                entry = entries.get(key)
+                if entry is not None and now - entry[0] <= ttl:
+                    return key, entry[1], True
+            future: Future = Future()
+            entries[keys[0]] = (now, future)
+            return keys[0], future, False
+
+    def _finish(self, key: tuple, future: Future, kind: str, result: Any = None,
+                error: Optional[BaseException] = None, keep: Optional[Callable[[Any], bool]] = None):
+        if error is not None or (keep is not None and not keep(result)):
+            with self._lock:
+                for entries in (self._recent, self._keyed):
+                    if entries.get(key, (None, None))[1] is future:
+                        del entries[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result((kind, result))
+
+    @staticmethod
+    def _replay(kind: str, shared: Tuple[str, Any], reshape: Optional[Callable[[str, Any], Any]]) -> Any:
+        origin, result = shared
+        if origin != kind and reshape is not None:
+            return reshape(origin, result)
+        return result
+
+    def run(self, kind: str, scope: Optional[str], text: str, execute: Callable[[], Any],
+            client_key: Optional[str] = None, keep: Optional[Callable[[Any], bool]] = None,
+            reshape: Optional[Callable[[str, Any], Any]] = None) -> Tuple[Any, bool]:
+        """(result, duplicate) of `execute()`, run only if this command is not a duplicate"""
+        key, future, duplicate = self._claim(scope, text, client_key)
+        if duplicate:
+            return self._replay(kind, future.result(), reshape), True
+        try:
+            result = execute()
+        except BaseException as e:
+            self._finish(key, future, kind, error=e)
+            raise
+        self._finish(key, future, kind, result, keep=keep)
+        return result, False
+
+    async def run_async(self, kind: str, scope: Optional[str], text: str, execute: Callable[[], Awaitable[Any]],
+                        client_key: Optional[str] = None, keep: Optional[Callable[[Any], bool]] = None,
+                        reshape: Optional[Callable[[str, Any], Any]] = None) -> Tuple[Any, bool]:
+        """run() for async callers: `execute()` returns an awaitable"""
+        key, future, duplicate = self._claim(scope, text, client_key)
+        if duplicate:
+            return self._replay(kind, await asyncio.wrap_future(future), reshape), True
+        try:
+            result = await execute()
+        except BaseException as e:
+            self._finish(key, future, kind, error=e)
+            raise
+        self._finish(key, future, kind, result, keep=keep)
+        return result, False
+
+
+# Global instance shared by every command entry point
+command_dedup = CommandDeduplicator()
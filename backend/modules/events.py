@@ -0,0 +1,99 @@
+# backend/modules/events.py
+import asyncio
+import copy
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Subscription:
+    """A single change-feed subscriber living on an asyncio event loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def deliver(self, event: Dict[str, Any], resync: Dict[str, Any]):
+        """Queue an event; a subscriber that falls behind is told to resync"""
+        if self.queue.full():
+            # Drop the backlog instead of buffering without bound
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(resync)
+            return
+        self.queue.put_nowait(event)
+
+
+class EventBus:
+    """
+    Versioned change feed for tasks and reminders.
+
+    Every published change gets a monotonically increasing version number and
+    is kept in a bounded history, so a client that reconnects can resume from
+    the last version it applied instead of refetching everything.
+    """
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 256):
+        self.version = 0
+        self.history: deque = deque(maxlen=history_size)
+        self.queue_size = queue_size
+        self.subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def _resync_event(self) -> Dict[str, Any]:
+        return {"type": "resync", "version": self.version}
+
+    def publish(self, topic: str, event_type: str, data: Any = None) -> Dict[str, Any]:
+        """Record a change and push it to every subscriber (safe from any thread)"""
+        # Callers pass their live dicts; later in-place edits must not rewrite history
+        data = copy.deepcopy(data)
+        with self._lock:
+            self.version += 1
+            event = {
+                "version": self.version,
+                "topic": topic,
+                "type": event_type,
+                "data": data,
+                "timestamp": time.time()
+            }
+            self.history.append(event)
+            resync = self._resync_event()
+
+            # Scheduling under the lock keeps delivery in version order
+            for subscription in list(self.subscribers):
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event, resync)
+                except RuntimeError:
+                    # The subscriber's event loop has been closed
+                    self.subscribers.remove(subscription)
+        return event
+
+    def subscribe(self, since: Optional[int] = None,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> Tuple[Subscription, List[Dict[str, Any]]]:
+        """
+        Register a subscriber and return it with the events it missed.
+
+        If `since` is older than the retained history (or comes from before a
+        server restart) the backlog is a single resync event telling the
+        client to refetch the full lists.
+        """
+        subscription = Subscription(loop or asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self.subscribers.append(subscription)
+            if since is None or since == self.version:
+                backlog = []
+            elif self.history and self.history[0]["version"] - 1 <= since < self.version:
+                backlog = [e for e in self.history if e["version"] > since]
+            else:
+                backlog = [self._resync_event()]
+        return subscription, backlog
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+
+
+# Global instance shared by the routers
+event_bus = EventBus()
@@ -0,0 +1,436 @@
+# backend/modules/grammar.py
+import fnmatch
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from modules.app_catalog import app_catalog
+from modules.grammar_tuner import GroupOrderTuner
+from modules.intent_classifier import IntentClassifier, intent_classifier
+from modules.intent_matcher import IntentMatcher
+
+logger = logging.getLogger(__name__)
+
+GRAMMAR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar.json")
+
+# Named lookups extractors can use: text -> (value, score) or None
+Resolver = Callable[[str], Optional[Tuple[str, float]]]
+RESOLVERS: Dict[str, Resolver] = {
+    "app": app_catalog.resolve,
+}
+
+
+class ParseResult:
+    """What the grammar made of one utterance (adapters reshape this)"""
+
+    def __init__(self, intent: str, action: str, confidence: float, slots: Dict[str, Any],
+                 text: str, group: Optional[str] = None, rule: Optional[int] = None,
+                 source: str = "rule"):
+        self.intent = intent
+        self.action = action
+        self.confidence = confidence
+        self.slots = slots
+        self.text = text
+        self.group = group
+        self.rule = rule
+        # "rule", "classifier" or "fallback"
+        self.source = source
+
+    @property
+    def matched(self) -> bool:
+        """False when nothing recognized the text and this is the grammar's fallback"""
+        return self.source != "fallback"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "intent": self.intent,
+            "action": self.action,
+            "confidence": self.confidence,
+            "slots": dict(self.slots),
+            "group": self.group,
+            "source": self.source
+        }
+
+
+class Grammar:
+    """
+    A compiled grammar file.
+
+    Rules live in ordered groups; each group gives its rules an intent and
+    a confidence. A rule's `slots` name its capture groups, and a rule that
+    `require`s slots only counts as a match once they are filled. `extractors`
+    fill further slots for given actions with their own pattern (a fixed
+    `value` when it matches, an optional `default` otherwise, and only
+    when the slot named by `requires` is already set). An extractor with a
+    `resolver` hands the text (or its pattern's group) to that named
+    lookup instead, which also fills `<slot>_score`. One with `strip`
+    patterns takes what is left of the text once they are all removed
+    (repeatedly, until none matches), e.g. a title without "jot down that".
+
+    Groups are tried in `order` (names) when given, else as declared; the
+    declared order is what `precedence` and overlaps are measured against.
+
+    Text no rule matches goes to the statistical classifier, if the grammar
+    sets a `classifier_threshold`; below that confidence, or when the
+    verdict lacks a slot `classifier_require` lists for its action, it falls
+    back.
+    """
+
+    def __init__(self, spec: Dict[str, Any], resolvers: Optional[Dict[str, Resolver]] = None,
+                 order: Optional[List[str]] = None):
+        resolvers = RESOLVERS if resolvers is None else resolvers
+        self.spec = spec
+        self.version = spec.get("version", 1)
+        self.fallback = spec["fallback"]
+        self.classifier_threshold = spec.get("classifier_threshold")
+        self.classifier_require: Dict[str, List[str]] = spec.get("classifier_require", {})
+        separators = spec.get("sequence_separators")
+        self.separators = re.compile(separators) if separators else None
+        conjunctions = spec.get("parallel_separators")
+        self.conjunctions = re.compile(conjunctions) if conjunctions else None
+        command_starts = spec.get("command_starts")
+        self.command_starts = re.compile(command_starts) if command_starts else None
+
+        self.declared_order = [group["name"] for group in spec["groups"]]
+        self.groups: List[Dict[str, Any]] = spec["groups"]
+        if order and sorted(order) == sorted(self.declared_order):
+            by_name = {group["name"]: group for group in spec["groups"]}
+            self.groups = [by_name[name] for name in order]
+        self.order = [group["name"] for group in self.groups]
+        # Parallel to matcher.rules: (group name, slot name -> capture group, required slots)
+        self.rule_info: List[tuple] = []
+        table = []
+        for group in self.groups:
+            for rule in group["rules"]:
+                slots = rule.get("slots", {})
+                self.rule_info.append((group["name"], slots, rule.get("require", [])))
+                table.append((group["intent"], rule["action"], rule["pattern"], group["confidence"], bool(slots)))
+        self.matcher = IntentMatcher(table)
+
+        self.extractors: Dict[str, List[Dict[str, Any]]] = {}
+        for extractor in spec.get("extractors", []):
+            compiled = dict(extractor, regex=re.compile(extractor["pattern"]) if "pattern" in extractor else None)
+            if "resolver" in extractor:
+                compiled["resolve"] = resolvers[extractor["resolver"]]
+            if "strip" in extractor:
+                compiled["strip"] = [re.compile(pattern) for pattern in extractor["strip"]]
+            for action in extractor["actions"]:
+                self.extractors.setdefault(action, []).append(compiled)
+
+    def parse(self, text: str, classifier: Optional[IntentClassifier] = None) -> ParseResult:
+        """Parse already-normalized (lowercased, stripped) text"""
+        result = self._rule_result(text)
+        if result is None:
+            return self.classify(text, classifier)
+        return result
+
+    def _rule_result(self, text: str) -> Optional[ParseResult]:
+        """Result of the first rule that matches (with its required slots), or None"""
+        for rule, match in self.matcher.matches(text):
+            group_name, slot_groups, required = self.rule_info[rule.index]
+            slots = {}
+            for slot, index in slot_groups.items():
+                value = match.group(index)
+                if value is not None:
+                    slots[slot] = value.strip()
+            self._extract(rule.action, text, slots)
+            if all(slot in slots for slot in required):
+                return ParseResult(rule.intent, rule.action, rule.confidence, slots, text, group_name, rule.index)
+        return None
+
+    def classify(self, text: str, classifier: Optional[IntentClassifier] = None) -> ParseResult:
+        """Classifier verdict for text no rule matched, or the fallback"""
+        if classifier is not None and self.classifier_threshold is not None and text:
+            result = self._verdict_result(text, *classifier.predict(text))
+            if result:
+                return result
+        return self.fallback_result(text)
+
+    def _verdict_result(self, text: str, intent: str, action: str, confidence: float) -> Optional[ParseResult]:
+        """A confident, non-fallback classifier verdict as a result (else None)"""
+        if action == self.fallback["action"] or confidence < self.classifier_threshold:
+            return None
+        slots = self._extract(action, text, {})
+        if not all(slot in slots for slot in self.classifier_require.get(action, ())):
+            return None
+        return ParseResult(intent, action, round(confidence, 3), slots, text, "classifier", source="classifier")
+
+    def parse_batch(self, texts: Sequence[str], classifier: Optional[IntentClassifier] = None) -> List[ParseResult]:
+        """parse() for many texts; the unmatched ones are classified together"""
+        results: List[Optional[ParseResult]] = []
+        unmatched = []
+        for position, text in enumerate(texts):
+            result = self._rule_result(text)
+            results.append(result)
+            if result is None:
+                unmatched.append(position)
+
+        verdicts = []
+        if classifier is not None and self.classifier_threshold is not None:
+            verdicts = classifier.predict_batch([texts[position] for position in unmatched])
+        for i, position in enumerate(unmatched):
+            text = texts[position]
+            result = self._verdict_result(text, *verdicts[i]) if verdicts and text else None
+            results[position] = result or self.fallback_result(text)
+        return results
+
+    def fallback_result(self, text: str) -> ParseResult:
+        return ParseResult(self.fallback["intent"], self.fallback["action"],
+                           self.fallback["confidence"], {}, text, source="fallback")
+
+    def _extract(self, action: str, text: str, slots: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill the action's extractor slots (in place)"""
+        for extractor in self.extractors.get(action, ()):
+            if extractor["slot"] in slots:
+                continue
+            if "requires" in extractor and extractor["requires"] not in slots:
+                continue
+            if "resolve" in extractor:
+                self._resolve(extractor, text, slots)
+                continue
+            if "strip" in extractor:
+                rest = self._strip(extractor["strip"], text)
+                if rest:
+                    slots[extractor["slot"]] = rest
+                continue
+            found = extractor["regex"].search(text)
+            if found:
+                if "value" in extractor:
+                    slots[extractor["slot"]] = extractor["value"]
+                else:
+                    slots[extractor["slot"]] = found.group(extractor.get("group", 0)).strip()
+            elif "default" in extractor:
+                slots[extractor["slot"]] = extractor["default"]
+        return slots
+
+    @staticmethod
+    def _strip(patterns: List[re.Pattern], text: str) -> str:
+        rest = None
+        while rest != text:
+            rest = text
+            for pattern in patterns:
+                text = pattern.sub("", text).strip()
+        return text
+
+    def _resolve(self, extractor: Dict[str, Any], text: str, slots: Dict[str, Any]):
+        query = text
+        if extractor["regex"] is not None:
+            found = extractor["regex"].search(text)
+            if not found:
+                return
+            query = found.group(extractor.get("group", 0))
+        resolved = extractor["resolve"](query)
+        if resolved:
+            slots[extractor["slot"]], slots[extractor["slot"] + "_score"] = resolved
+
+    def constraints(self, probes: Sequence[str] = ()) -> Set[Tuple[str, str]]:
+        """
+        (before, after) group pairs whose relative order must be kept: the
+        grammar's `precedence` entries (names may be globs; where two
+        entries contradict, e.g. ["tasks", "*"] and ["schedule", "*"], the
+        earlier one wins) plus every two groups that both match one of the
+        `probes`, in declared order.
+        """
+        names = self.declared_order
+        pairs = set()
+        for before, after in self.spec.get("precedence", []):
+            for a in fnmatch.filter(names, before):
+                for b in fnmatch.filter(names, after):
+                    if a != b and (b, a) not in pairs:
+                        pairs.add((a, b))
+
+        position = {name: i for i, name in enumerate(names)}
+        for text in probes:
+            hit = sorted({self.rule_info[rule.index][0] for rule, _ in self.matcher.matches(normalize(text))},
+                         key=position.get)
+            for i, before in enumerate(hit):
+                for after in hit[i + 1:]:
+                    pairs.add((before, after))
+        return pairs
+
+    def split_steps(self, text: str) -> List[str]:
+        """Split a multi-step command ("open chrome and then ...") into its parts"""
+        if self.separators is None:
+            return [text]
+        return [part.strip() for part in self.separators.split(text) if part.strip()]
+
+    def split_stages(self, text: str) -> List[List[str]]:
+        """
+        Split a command into ordered stages of steps that may run together:
+        "open chrome and check cpu then add task x" is
+        [["open chrome", "check cpu"], ["add task x"]]
+        """
+        stages = []
+        for step in self.split_steps(text):
+            stages.append(self._split_parallel(step))
+        return [stage for stage in stages if stage]
+
+    def _split_parallel(self, step: str) -> List[str]:
+        """
+        Split a step on "and", but only where a new command starts (per
+        `command_starts`): "add task check cpu and memory usage" is one
+        task, "open chrome and check cpu" two commands.
+        """
+        if self.conjunctions is None:
+            return [step.strip()] if step.strip() else []
+        parts, start = [], 0
+        for found in self.conjunctions.finditer(step):
+            rest = step[found.end():].lstrip()
+            if self.command_starts is None or self.command_starts.match(rest):
+                parts.append(step[start:found.start()])
+                start = found.end()
+        parts.append(step[start:])
+        return [part.strip() for part in parts if part.strip()]
+
+
+class GrammarEngine:
+    """
+    The one command parser behind every entry point.
+
+    The grammar file is compiled once at startup and reloaded when it
+    changes on disk (checked at most every `reload_interval` seconds). A
+    grammar that fails to load is logged and the previous one stays in use.
+
+    Rule group hits feed the tuner; when it asks for a retune the grammar
+    is recompiled (on a background thread) with the most-hit groups first.
+    Groups that both match some text (a classifier corpus example or a
+    recently parsed utterance) keep their declared relative order, as do
+    pairs the grammar lists under `precedence`.
+    """
+
+    def __init__(self, path: str = GRAMMAR_PATH, reload_interval: float = 1.0,
+                 classifier: Optional[IntentClassifier] = intent_classifier,
+                 tuner: Optional[GroupOrderTuner] = None, recent_size: int = 1000):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.classifier = classifier
+        self.tuner = tuner if tuner is not None else GroupOrderTuner()
+        self._lock = threading.Lock()
+        self._grammar: Optional[Grammar] = None
+        self._constraints: Set[Tuple[str, str]] = set()
+        self._retuning = False
+        self._recent: deque = deque(maxlen=recent_size)
+        self._stamp = None
+        self._checked_at = 0.0
+        self.loaded_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompile the grammar if the file changed; True if a new one is in use"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stamp = self._file_stamp()
+                if not force and stamp == self._stamp and self._grammar is not None:
+                    return False
+                with open(self.path, "r", encoding="utf-8") as f:
+                    grammar = Grammar(json.load(f))
+                probes = self.classifier.examples() if self.classifier else []
+                self.tuner.load()
+                constraints = grammar.constraints(probes)
+                # A profile saved under an older grammar may contradict its precedence
+                constraints |= {pair for pair in self.tuner.constraints if pair[::-1] not in constraints}
+                order = self.tuner.order(grammar.declared_order, constraints)
+                if order != grammar.order:
+                    grammar = Grammar(grammar.spec, order=order)
+            except (OSError, ValueError, KeyError, TypeError, re.error) as e:
+                self.last_error = str(e)
+                if self._grammar is None:
+                    raise
+                logger.error(f"Grammar reload failed, keeping the previous grammar: {e}")
+                return False
+
+            self._grammar = grammar
+            self._constraints = constraints
+            self._stamp = stamp
+            self.loaded_at = time.time()
+            self.last_error = None
+            return True
+
+    @property
+    def grammar(self) -> Grammar:
+        if self._grammar is None:
+            self.reload()
+        elif time.monotonic() - self._checked_at >= self.reload_interval:
+            self.reload()
+        return self._grammar
+
+    def parse(self, text: str) -> ParseResult:
+        result = self.grammar.parse(normalize(text), self.classifier)
+        self._record(result)
+        return result
+
+    def parse_batch(self, texts: Sequence[str]) -> List[ParseResult]:
+        results = self.grammar.parse_batch([normalize(text) for text in texts], self.classifier)
+        for result in results:
+            self._record(result)
+        return results
+
+    def _record(self, result: ParseResult):
+        if result.source != "rule":
+            return
+        self._recent.append(result.text)
+        if not self.tuner.record(result.group):
+            return
+        with self._lock:
+            if self._retuning:
+                return
+            self._retuning = True
+        threading.Thread(target=self.retune, name="grammar-retune", daemon=True).start()
+
+    def retune(self):
+        """Reorder the rule groups by their hit counts and save the profile"""
+        try:
+            with self._lock:
+                grammar = self._grammar
+                # Overlaps seen in real traffic pin those groups before anything moves
+                learned = grammar.constraints(list(self._recent))
+                self._constraints = self._constraints | learned
+                order = self.tuner.order(grammar.declared_order, self._constraints)
+                if order != grammar.order:
+                    self._grammar = Grammar(grammar.spec, order=order)
+            self.tuner.checkpoint(order, learned)
+        finally:
+            self._retuning = False
+
+    def split_steps(self, text: str) -> List[str]:
+        return self.grammar.split_steps(normalize(text))
+
+    def split_stages(self, text: str) -> List[List[str]]:
+        return self.grammar.split_stages(normalize(text))
+
+    def save_profile(self):
+        """Persist the hit counts now (e.g. at shutdown)"""
+        self.tuner.checkpoint(self.grammar.order, self.grammar.constraints(list(self._recent)))
+
+    def status(self) -> Dict[str, Any]:
+        grammar = self.grammar
+        return {
+            "path": self.path,
+            "version": grammar.version,
+            "groups": len(grammar.groups),
+            "rules": len(grammar.matcher.rules),
+            "order": grammar.order,
+            "hits": {name: round(count, 1) for name, count in self.tuner.hits.items()},
+            "loaded_at": self.loaded_at,
+            "last_error": self.last_error,
+            "classifier_threshold": grammar.classifier_threshold,
+            "classifier": self.classifier.info() if self.classifier else None
+        }
+
+
+def normalize(text: str) -> str:
+    return (text or "").lower().strip()
+
+
+# Global instance shared by every parser entry point
+grammar_engine = GrammarEngine()
@@ -0,0 +1,114 @@
+# backend/modules/grammar_tuner.py
+import heapq
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_PATH = os.path.join(BASE_DIR, "data", "grammar_profile.json")
+
+
+class GroupOrderTuner:
+    """
+    Learns which grammar rule groups get hit most and orders them first.
+
+    Hits are counted per group; every `retune_every` hits the counts decay
+    (so the order follows recent traffic) and are written to a profile
+    file, which is read back at startup so the tuned order survives
+    restarts. Ordering is a topological sort by hit count: a group never
+    moves ahead of one it must come after (see Grammar.constraints). The
+    constraints learned from traffic are saved in the profile as well.
+    """
+
+    def __init__(self, profile_path: str = PROFILE_PATH, retune_every: int = 500, decay: float = 0.8):
+        self.profile_path = profile_path
+        self.retune_every = retune_every
+        self.decay = decay
+        self._lock = threading.Lock()
+        self.hits: Dict[str, float] = {}
+        self.constraints: Set[Tuple[str, str]] = set()
+        self._pending = 0
+        self._loaded = False
+
+    def load(self):
+        """Read the persisted hit counts (once; a missing or broken profile starts empty)"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.profile_path, "r", encoding="utf-8") as f:
+                    profile = json.load(f)
+                self.hits = {name: float(count) for name, count in profile.get("hits", {}).items()}
+                self.constraints = {(before, after) for before, after in profile.get("constraints", [])}
+            except FileNotFoundError:
+                pass
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.error(f"Ignoring unreadable grammar profile: {e}")
+
+    def record(self, group: str) -> bool:
+        """Count a hit; True when enough hits arrived for a retune"""
+        with self._lock:
+            self.hits[group] = self.hits.get(group, 0.0) + 1
+            self._pending += 1
+            return self._pending >= self.retune_every
+
+    def order(self, names: List[str], constraints: Iterable[Tuple[str, str]]) -> List[str]:
+        """`names` by descending hits (ties keep the given order), honouring (before, after) pairs"""
+        position = {name: i for i, name in enumerate(names)}
+        successors: Dict[str, Set[str]] = {name: set() for name in names}
+        blockers = {name: 0 for name in names}
+        for before, after in constraints:
+            if before in position and after in position and after not in successors[before]:
+                successors[before].add(after)
+                blockers[after] += 1
+
+        with self._lock:
+            hits = dict(self.hits)
+        ready = [(-hits.get(name, 0.0), position[name], name) for name in names if not blockers[name]]
+        heapq.heapify(ready)
+        ordered = []
+        while ready:
+            _, _, name = heapq.heappop(ready)
+            ordered.append(name)
+            for after in successors[name]:
+                blockers[after] -= 1
+                if not blockers[after]:
+                    heapq.heappush(ready, (-hits.get(after, 0.0), position[after], after))
+        # Only contradictory constraints (a cycle) leave names unreached
+        ordered += [name for name in names if name not in ordered]
+        return ordered
+
+    def checkpoint(self, order: List[str], constraints: Iterable[Tuple[str, str]] = ()):
+        """Decay the counts and persist them with the order and constraints now in use"""
+        with self._lock:
+            self.hits = {name: count * self.decay for name, count in self.hits.items()}
+            self.constraints |= set(constraints)
+            self._pending = 0
+            profile = {
+                "hits": dict(self.hits),
+                "order": list(order),
+                "constraints": sorted(list(pair) for pair in self.constraints)
+            }
+        try:
+            self._write(profile)
+        except OSError as e:
+            logger.error(f"Could not save grammar profile: {e}")
+
+    def _write(self, profile: Dict):
+        directory = os.path.dirname(self.profile_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".grammar_profile-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(profile, f, indent=2)
+            os.replace(tmp_path, self.profile_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,129 @@
+# backend/modules/http_client.py
+import asyncio
+import logging
+import random
+import threading
+from typing import Any, Coroutine, Dict, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Seconds allowed per request, by path prefix (the longest matching prefix wins)
+ROUTE_TIMEOUTS: Dict[str, float] = {
+    "/chat": 15.0,        # a local model can take a while to answer
+    "/api/tasks": 5.0,
+    "/api/schedule": 5.0,
+    "/api/system": 5.0,
+}
+
+# Worth another try on an idempotent request: the server was briefly unavailable
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class OutboundClient:
+    """
+    One pooled async HTTP client for every outbound call the backend makes.
+
+    Connections are kept alive and reused, and at most `max_connections`
+    requests are in flight at once (httpx never pipelines, so that is also
+    the limit per host). Each request gets the timeout of its route.
+    Failures that cannot have reached the server (connect errors, pool
+    timeouts) are retried for any method; timeouts and 502/503/504 only for
+    idempotent ones. Retries back off exponentially with full jitter, so
+    callers that failed together do not retry together.
+
+    The app lifespan starts it on the server's event loop. Synchronous
+    callers run requests on that loop; without one (a voice process running
+    on its own) the client starts a private loop thread on first use.
+    """
+
+    def __init__(self, base_url: str, route_timeouts: Optional[Dict[str, float]] = None,
+                 default_timeout: float = 10.0, retries: int = 2, backoff: float = 0.2,
+                 max_backoff: float = 2.0, max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.route_timeouts = ROUTE_TIMEOUTS if route_timeouts is None else route_timeouts
+        self.default_timeout = default_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    async def start(self):
+        """Open the pool on the running event loop"""
+        if self._client is None:
+            self._loop = asyncio.get_running_loop()
+            self._client = httpx.AsyncClient(base_url=self.base_url, limits=self.limits,
+                                             timeout=self.default_timeout)
+
+    async def close(self):
+        """Close pooled connections (the client can be started again)"""
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+    def timeout_for(self, path: str) -> float:
+        best, timeout = -1, self.default_timeout
+        for prefix, seconds in self.route_timeouts.items():
+            if path.startswith(prefix) and len(prefix) > best:
+                best, timeout = len(prefix), seconds
+        return timeout
+
+    def _delay(self, attempt: int) -> float:
+        """Full jitter: anywhere up to the exponential backoff for this attempt"""
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request through the pool, retrying transient failures"""
+        if self._client is None:
+            await self.start()
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", self.timeout_for(path))
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = await self._client.request(method, path, **kwargs)
+                if response.status_code not in RETRY_STATUSES or not idempotent or last:
+                    return response
+                logger.debug(f"{method} {path} answered {response.status_code}, retrying")
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Never reached the server, so safe to resend whatever the method
+                if last:
+                    raise
+                logger.debug(f"{method} {path} could not connect ({e!r}), retrying")
+            except (httpx.TimeoutException, httpx.RemoteProtocolError) as e:
+                if last or not idempotent:
+                    raise
+                logger.debug(f"{method} {path} failed ({e!r}), retrying")
+            await asyncio.sleep(self._delay(attempt))
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """The loop the pool lives on, starting a private one if there is none"""
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="outbound-http", daemon=True).start()
+            asyncio.run_coroutine_threadsafe(self.start(), loop).result()
+            return loop
+
+    def run_sync(self, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        """Run a coroutine that uses this client from synchronous code"""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coroutine.close()
+            raise RuntimeError("run_sync() called from the client's own event loop; await instead")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
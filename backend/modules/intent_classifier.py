@@ -0,0 +1,212 @@
+# backend/modules/intent_classifier.py
+import json
+import os
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_corpus.json")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class HashedFeaturizer:
+    """
+    Maps text to a sparse vector of hashed word unigrams, word bigrams and
+    character trigrams. crc32 keeps the hashing stable across processes
+    (unlike hash()), so a model trained once means the same everywhere.
+    """
+
+    def __init__(self, dim: int = 1 << 14, cache_size: int = 100_000):
+        self.dim = dim
+        self.cache_size = cache_size
+        # Speech reuses a small vocabulary, so most features are hashed once.
+        # lru_cache stays bounded and is safe to share between request threads
+        self._index = lru_cache(maxsize=cache_size)(self._hash)
+
+    def _hash(self, feature: str) -> int:
+        return zlib.crc32(feature.encode()) % self.dim
+
+    def features(self, text: str) -> List[str]:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = ["w:" + token for token in tokens]
+        features += ["b:" + a + " " + b for a, b in zip(tokens, tokens[1:])]
+        for token in tokens:
+            padded = f" {token} "
+            features += ["c:" + padded[i:i + 3] for i in range(len(padded) - 2)]
+        return features
+
+    def indices(self, text: str) -> Tuple[np.ndarray, float]:
+        """Hashed feature indices of `text` and the weight each one carries"""
+        features = self.features(text)
+        if not features:
+            return np.zeros(0, dtype=np.int64), 0.0
+        indices = np.fromiter(map(self._index, features), dtype=np.int64, count=len(features))
+        # Length-normalized so long and short utterances score alike
+        return indices, 1.0 / np.sqrt(len(features))
+
+    def matrix(self, texts: Sequence[str]) -> np.ndarray:
+        X = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, weight = self.indices(text)
+            np.add.at(X[row], indices, weight)
+        return X
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def _fit(X: np.ndarray, y: np.ndarray, classes: int, epochs: int, learning_rate: float,
+         l2: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Multinomial logistic regression by full-batch gradient descent"""
+    # Hash buckets no example uses keep zero weight; train on the rest only
+    used = np.flatnonzero(X.any(axis=0))
+    X_used = X[:, used]
+    W_used = np.zeros((len(used), classes), dtype=np.float32)
+    b = np.zeros(classes, dtype=np.float32)
+    Y = np.eye(classes, dtype=np.float32)[y]
+    for _ in range(epochs):
+        error = (_softmax(X_used @ W_used + b) - Y) / len(X)
+        W_used -= learning_rate * (X_used.T @ error + l2 * W_used)
+        b -= learning_rate * error.sum(axis=0)
+    W = np.zeros((X.shape[1], classes), dtype=np.float32)
+    W[used] = W_used
+    return W, b
+
+
+class IntentClassifier:
+    """
+    Fallback intent classifier for utterances no grammar rule matched.
+
+    A hashed n-gram logistic regression trained from the labelled corpus
+    at startup (well under a second). Probabilities are calibrated with a
+    temperature fitted on out-of-fold predictions, so a 0.8 really means
+    "right about 80% of the time" and can be compared to a threshold.
+    Scoring one utterance is a gather and a sum over its ~50 features.
+    """
+
+    def __init__(self, corpus_path: str = CORPUS_PATH, dim: int = 1 << 14, epochs: int = 300,
+                 learning_rate: float = 2.0, l2: float = 1e-4, folds: int = 5):
+        self.corpus_path = corpus_path
+        self.featurizer = HashedFeaturizer(dim)
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.folds = folds
+        self.labels: List[Tuple[str, str]] = []
+        self.temperature = 1.0
+        self._W: Optional[np.ndarray] = None
+        self._b: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def trained(self) -> bool:
+        return self._W is not None
+
+    def _load_corpus(self) -> Tuple[List[str], np.ndarray, List[Tuple[str, str]]]:
+        with open(self.corpus_path, "r", encoding="utf-8") as f:
+            corpus = json.load(f)
+        texts, y, labels = [], [], []
+        for index, entry in enumerate(corpus["classes"]):
+            labels.append((entry["intent"], entry["action"]))
+            texts += entry["examples"]
+            y += [index] * len(entry["examples"])
+        return texts, np.array(y, dtype=np.int64), labels
+
+    def examples(self) -> List[str]:
+        """Every labelled utterance in the corpus"""
+        return self._load_corpus()[0]
+
+    def _calibrate(self, X: np.ndarray, y: np.ndarray, classes: int) -> float:
+        """Temperature minimizing the log loss of out-of-fold predictions"""
+        order = np.random.default_rng(0).permutation(len(y))
+        logits = np.zeros((len(y), classes), dtype=np.float32)
+        for fold in np.array_split(order, self.folds):
+            train = np.setdiff1d(order, fold)
+            W, b = _fit(X[train], y[train], classes, self.epochs, self.learning_rate, self.l2)
+            logits[fold] = X[fold] @ W + b
+
+        best, best_loss = 1.0, np.inf
+        for temperature in np.geomspace(0.05, 5.0, 60):
+            probabilities = _softmax(logits / temperature)
+            loss = -np.log(probabilities[np.arange(len(y)), y] + 1e-9).mean()
+            if loss < best_loss:
+                best, best_loss = float(temperature), loss
+        return best
+
+    def train(self):
+        """(Re)train from the corpus file"""
+        with self._lock:
+            self._train()
+
+    def _train(self):
+        texts, y, labels = self._load_corpus()
+        X = self.featurizer.matrix(texts)
+        temperature = self._calibrate(X, y, len(labels)) if self.folds > 1 else 1.0
+        W, b = _fit(X, y, len(labels), self.epochs, self.learning_rate, self.l2)
+        self._W, self._b, self.temperature, self.labels = W, b, temperature, labels
+
+    def _ensure_trained(self):
+        if self._W is None:
+            with self._lock:
+                if self._W is None:
+                    self._train()
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        """Calibrated probability of each label for one utterance"""
+        self._ensure_trained()
+        indices, weight = self.featurizer.indices(text)
+        logits = self._W[indices].sum(axis=0) * weight + self._b
+        return _softmax(logits / self.temperature)
+
+    def predict(self, text: str) -> Tuple[str, str, float]:
+        """(intent, action, confidence) of the most likely label"""
+        probabilities = self.predict_proba(text)
+        best = int(probabilities.argmax())
+        intent, action = self.labels[best]
+        return intent, action, float(probabilities[best])
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Tuple[str, str, float]]:
+        """predict() for many utterances, scored in one vectorized pass"""
+        self._ensure_trained()
+        if not texts:
+            return []
+        W, b, labels = self._W, self._b, self.labels
+        all_indices, weights, lengths = [], np.zeros(len(texts), dtype=np.float32), []
+        for row, text in enumerate(texts):
+            indices, weights[row] = self.featurizer.indices(text)
+            all_indices.append(indices)
+            lengths.append(len(indices))
+
+        # Sum each row's feature weights with one segmented reduction
+        lengths = np.array(lengths)
+        gathered = W[np.concatenate(all_indices)]
+        logits = np.zeros((len(texts), W.shape[1]), dtype=np.float32)
+        nonempty = lengths > 0
+        if nonempty.any():
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+            logits[nonempty] = np.add.reduceat(gathered, starts, axis=0)
+        logits = logits * weights[:, None] + b
+
+        probabilities = _softmax(logits / self.temperature)
+        best = probabilities.argmax(axis=1)
+        confidence = probabilities[np.arange(len(texts)), best]
+        return [(*labels[label], float(p)) for label, p in zip(best, confidence)]
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "trained": self.trained,
+            "labels": [f"{intent}.{action}" for intent, action in self.labels],
+            "features": self.featurizer.dim,
+            "temperature": round(self.temperature, 3)
+        }
+
+
+# Global instance trained by the app lifespan (or on first use)
+intent_classifier = IntentClassifier()
@@ -0,0 +1,165 @@
+# backend/modules/intent_matcher.py
+import re
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+# Give up on expanding alternations that would produce more strings than this
+_MAX_LITERALS = 64
+
+
+def _literal_strings(items) -> Optional[Set[str]]:
+    """
+    Every string a parsed sub-pattern can match, if it is a finite set of
+    literals (plain text, groups and alternations). None otherwise.
+    """
+    strings = {""}
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            options = {chr(av)}
+        elif op is sre_parse.SUBPATTERN:
+            options = _literal_strings(av[3])
+        elif op is sre_parse.BRANCH:
+            options = set()
+            for branch in av[1]:
+                branch_strings = _literal_strings(branch)
+                if branch_strings is None:
+                    return None
+                options |= branch_strings
+        else:
+            return None
+        if options is None:
+            return None
+        strings = {a + b for a in strings for b in options}
+        if len(strings) > _MAX_LITERALS:
+            return None
+    return strings
+
+
+def required_literals(pattern: str) -> List[FrozenSet[str]]:
+    """
+    Literal sets that any match of `pattern` must contain (one string from
+    each set). Only fixed text is considered, so the result is a necessary
+    condition: a text lacking one of the sets can't match the pattern.
+    """
+    requirements = []
+    current = {""}
+
+    def flush():
+        if current and "" not in current:
+            requirements.append(frozenset(current))
+
+    for op, av in sre_parse.parse(pattern):
+        options = _literal_strings([(op, av)])
+        if options is not None:
+            combined = {a + b for a in current for b in options}
+            if len(combined) <= _MAX_LITERALS:
+                current = combined
+                continue
+            flush()
+            current = options
+            continue
+        # Repeats, wildcards, anchors: whatever was accumulated must appear
+        flush()
+        current = {""}
+    flush()
+    return requirements
+
+
+class Rule:
+    """One pattern of the intent table"""
+
+    def __init__(self, index: int, intent: str, action: str, pattern: str,
+                 confidence: float, uses_groups: bool):
+        self.index = index
+        self.intent = intent
+        self.action = action
+        self.pattern = pattern
+        self.confidence = confidence
+        self.uses_groups = uses_groups
+        self.requirements = required_literals(pattern)
+        # A leading/trailing ".*" never changes whether re.search matches, only
+        # how much it backtracks; keep it only where the groups are read
+        search_pattern = pattern
+        if not uses_groups:
+            if search_pattern.startswith(".*"):
+                search_pattern = search_pattern[2:]
+            if search_pattern.endswith(".*") and not search_pattern.endswith("\\.*"):
+                search_pattern = search_pattern[:-2]
+        self.regex = re.compile(search_pattern)
+
+
+class IntentMatcher:
+    """
+    Finds the first rule (in table order) whose pattern matches a text.
+
+    All patterns are compiled once. A single keyword scan, using one combined
+    alternation of every fixed literal in the table, finds which literals
+    the text contains. Only rules whose required literals are all present
+    are then tried, in their original order. Most texts need no full
+    regex at all, and matched texts need one or two, so the result is
+    the same as trying every pattern with re.search without the cost.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str, str, float, bool]]):
+        self.rules = [Rule(i, *rule) for i, rule in enumerate(rules)]
+
+        keywords = set()
+        for rule in self.rules:
+            for requirement in rule.requirements:
+                keywords |= requirement
+        # Longest first so the scan reports the longest keyword at each position
+        ordered = sorted(keywords, key=lambda k: (-len(k), k))
+        self._scanner = re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))") if ordered else None
+        # A found keyword implies every keyword it contains
+        self._implied: Dict[str, FrozenSet[str]] = {
+            k: frozenset(other for other in keywords if other in k) for k in keywords
+        }
+
+        # Rules are indexed by one keyword of their most selective requirement
+        self._by_keyword: Dict[str, List[Rule]] = {}
+        self._unconstrained: List[Rule] = []
+        for rule in self.rules:
+            if not rule.requirements:
+                self._unconstrained.append(rule)
+                continue
+            anchor = min(rule.requirements, key=len)
+            for keyword in anchor:
+                self._by_keyword.setdefault(keyword, []).append(rule)
+
+    def present_keywords(self, text: str) -> Set[str]:
+        present: Set[str] = set()
+        if self._scanner is None:
+            return present
+        for found in self._scanner.findall(text):
+            if found not in present:
+                present |= self._implied[found]
+        return present
+
+    def candidates(self, text: str) -> List[Rule]:
+        """Rules whose required literals all occur in `text`, in table order"""
+        present = self.present_keywords(text)
+        seen = {}
+        for keyword in present:
+            for rule in self._by_keyword.get(keyword, ()):
+                seen[rule.index] = rule
+        for rule in self._unconstrained:
+            seen[rule.index] = rule
+        return [
+            seen[index] for index in sorted(seen)
+            if all(not present.isdisjoint(req) for req in seen[index].requirements)
+        ]
+
+    def matches(self, text: str) -> Iterator[Tuple[Rule, "re.Match"]]:
+        """Every matching rule and its match object, in table order (lazily)"""
+        for rule in self.candidates(text):
+            match = rule.regex.search(text)
+            if match:
+                yield rule, match
+
+    def match(self, text: str) -> Optional[Tuple[Rule, "re.Match"]]:
+        """First matching rule and its match object, or None"""
+        return next(self.matches(text), None)
@@ -0,0 +1,210 @@
+# backend/modules/metrics_rollup.py
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS_DIR = os.path.join(BASE_DIR, "data", "metrics")
+
+# Sampler fields that get long-term rollups
+ROLLUP_METRICS = [
+    "cpu_percent",
+    "memory_percent",
+    "disk_usage",
+    "net_sent_per_sec",
+    "net_recv_per_sec",
+]
+
+# (bucket size in seconds, number of buckets kept): 1 hour of 1s, 7 days of 1m, 90 days of 1h
+RESOLUTIONS = [
+    (1, 3600),
+    (60, 7 * 24 * 60),
+    (3600, 90 * 24),
+]
+
+
+def _record_dtype(metrics: Sequence[str]) -> np.dtype:
+    fields = [("bucket", "<i8"), ("count", "<u4")]
+    for name in metrics:
+        # Per metric count: a metric can be missing from some snapshots
+        fields += [(f"{name}_min", "<f4"), (f"{name}_max", "<f4"), (f"{name}_sum", "<f8"), (f"{name}_count", "<u4")]
+    return np.dtype(fields)
+
+
+class RollupRing:
+    """
+    One resolution: a fixed number of fixed-width min/max/sum records in a
+    memory-mapped file, used as a ring indexed by bucket number. Old buckets
+    are overwritten in place, so the file never grows.
+    """
+
+    def __init__(self, path: str, seconds: int, capacity: int, dtype: np.dtype):
+        self.path = path
+        self.seconds = seconds
+        self.capacity = capacity
+        self.dtype = dtype
+
+        expected_size = capacity * dtype.itemsize
+        if not os.path.exists(path) or os.path.getsize(path) != expected_size:
+            # New file, or the layout changed: start empty
+            data = np.memmap(path, dtype=dtype, mode="w+", shape=(capacity,))
+            data["bucket"] = -1
+            data.flush()
+            del data
+        self.data = np.memmap(path, dtype=dtype, mode="r+", shape=(capacity,))
+
+    @property
+    def retention(self) -> int:
+        return self.seconds * self.capacity
+
+    def add(self, timestamp: float, values: Dict[str, float], metrics: Sequence[str]):
+        bucket = int(timestamp // self.seconds) * self.seconds
+        record = self.data[(bucket // self.seconds) % self.capacity]
+        if record["bucket"] != bucket:
+            record["bucket"] = bucket
+            record["count"] = 0
+            for name in metrics:
+                record[f"{name}_min"] = np.inf
+                record[f"{name}_max"] = -np.inf
+                record[f"{name}_sum"] = 0.0
+                record[f"{name}_count"] = 0
+
+        record["count"] += 1
+        for name in metrics:
+            value = values.get(name)
+            if value is None:
+                continue
+            record[f"{name}_min"] = min(record[f"{name}_min"], value)
+            record[f"{name}_max"] = max(record[f"{name}_max"], value)
+            record[f"{name}_sum"] += value
+            record[f"{name}_count"] += 1
+
+    def read(self, start: float, end: float) -> np.ndarray:
+        """Records for buckets in [start, end], oldest first (empty buckets skipped)"""
+        first = int(start // self.seconds) * self.seconds
+        last = int(end // self.seconds) * self.seconds
+        first = max(first, last - (self.capacity - 1) * self.seconds)
+        buckets = np.arange(first, last + 1, self.seconds, dtype=np.int64)
+        records = self.data[(buckets // self.seconds) % self.capacity]
+        return records[records["bucket"] == buckets]
+
+    def flush(self):
+        self.data.flush()
+
+
+def _merge(records: np.ndarray, first: int, width: int, metrics: Sequence[str]) -> np.ndarray:
+    """Fold records into `width`-second buckets counted from `first` (records sorted by bucket)"""
+    keys = (records["bucket"] - first) // width
+    starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    merged = np.zeros(len(starts), dtype=records.dtype)
+    merged["bucket"] = first + keys[starts] * width
+    merged["count"] = np.add.reduceat(records["count"], starts)
+    for name in metrics:
+        merged[f"{name}_min"] = np.minimum.reduceat(records[f"{name}_min"], starts)
+        merged[f"{name}_max"] = np.maximum.reduceat(records[f"{name}_max"], starts)
+        merged[f"{name}_sum"] = np.add.reduceat(records[f"{name}_sum"], starts)
+        merged[f"{name}_count"] = np.add.reduceat(records[f"{name}_count"], starts)
+    return merged
+
+
+class MetricsRollup:
+    """
+    Long-term system metrics history as 1s/1m/1h min/max/avg rollups.
+
+    Every sampler snapshot is folded into each resolution; storage is fixed
+    by the retention settings no matter how long the server runs. Queries
+    pick the coarsest resolution that still gives the requested step and
+    covers the requested window, and merge neighbouring buckets when that
+    still leaves more than the requested number of points.
+    """
+
+    def __init__(self, directory: str = METRICS_DIR, resolutions: Sequence[Tuple[int, int]] = RESOLUTIONS,
+                 metrics: Sequence[str] = ROLLUP_METRICS, flush_every: int = 60):
+        self.directory = directory
+        self.resolutions = sorted(resolutions)
+        self.metrics = list(metrics)
+        self.flush_every = flush_every
+        self.rings: List[RollupRing] = []
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        dtype = _record_dtype(self.metrics)
+        with self._lock:
+            self.rings = [
+                RollupRing(os.path.join(self.directory, f"rollup_{seconds}s.bin"), seconds, capacity, dtype)
+                for seconds, capacity in self.resolutions
+            ]
+
+    def close(self):
+        with self._lock:
+            for ring in self.rings:
+                ring.flush()
+            self.rings = []
+
+    def add(self, snapshot: Dict[str, Any]):
+        """Fold one sampler snapshot into every resolution (sampler listener)"""
+        with self._lock:
+            if not self.rings:
+                return
+            for ring in self.rings:
+                ring.add(snapshot["timestamp"], snapshot, self.metrics)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                for ring in self.rings:
+                    ring.flush()
+                self._pending = 0
+
+    def choose_ring(self, window: float, step: float) -> RollupRing:
+        """Coarsest ring with buckets no larger than `step` that still covers `window`"""
+        covering = [ring for ring in self.rings if ring.retention >= window] or self.rings[-1:]
+        fine_enough = [ring for ring in covering if ring.seconds <= step]
+        return fine_enough[-1] if fine_enough else covering[0]
+
+    def query(self, window: float, points: int = 300, step: Optional[float] = None,
+              now: Optional[float] = None) -> Dict[str, Any]:
+        """Aggregated series for the last `window` seconds, at most `points` samples"""
+        now = time.time() if now is None else now
+        step = step or window / max(points, 1)
+        with self._lock:
+            if not self.rings:
+                return {"resolution": None, "step": None, "window": window, "samples": [], "count": 0}
+            ring = self.choose_ring(window, step)
+            records = np.array(ring.read(now - window, now))
+
+        first = int((now - window) // ring.seconds) * ring.seconds
+        buckets = int(now // ring.seconds) * ring.seconds - first + ring.seconds
+        width = ring.seconds * -(-buckets // (ring.seconds * max(points, 1)))
+        if width > ring.seconds and len(records):
+            records = _merge(records, first, width, self.metrics)
+
+        samples = []
+        for record in records:
+            sample = {"timestamp": int(record["bucket"]), "count": int(record["count"])}
+            for name in self.metrics:
+                count = int(record[f"{name}_count"])
+                if not count:
+                    # Metric missing from every snapshot in this bucket
+                    sample[name] = None
+                    continue
+                sample[name] = {
+                    "min": round(float(record[f"{name}_min"]), 2),
+                    "max": round(float(record[f"{name}_max"]), 2),
+                    "avg": round(float(record[f"{name}_sum"]) / count, 2)
+                }
+            samples.append(sample)
+
+        return {
+            "resolution": ring.seconds,
+            "step": width,
+            "window": window,
+            "samples": samples,
+            "count": len(samples)
+        }
+
+
+# Global instance opened by the app lifespan
+metrics_rollup = MetricsRollup()
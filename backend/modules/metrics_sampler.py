@@ -0,0 +1,194 @@
+# backend/modules/metrics_sampler.py
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import psutil
+
+
+class StreamSubscription:
+    """
+    A live-metrics subscriber on an asyncio event loop.
+
+    Holds at most one pending frame: if the consumer hasn't taken the last
+    one when a new tick arrives, the stale frame is replaced (and counted as
+    dropped) instead of queueing up behind a slow client.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, min_interval: float = 0.0,
+                 fields: Optional[Sequence[str]] = None):
+        self.loop = loop
+        self.min_interval = min_interval
+        self.fields = set(fields) if fields else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.dropped = 0
+        self._last_sent = 0.0
+
+    def offer(self, snapshot: Dict[str, Any]):
+        """Called on the subscriber's loop for every sampler tick"""
+        # Ticks jitter around the sampling interval; without the slack a client
+        # asking for every tick would miss about half of them
+        if snapshot["timestamp"] - self._last_sent < self.min_interval * 0.9:
+            return
+        self._last_sent = snapshot["timestamp"]
+
+        if self.fields is not None:
+            snapshot = {k: v for k, v in snapshot.items() if k in self.fields or k == "timestamp"}
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(snapshot)
+
+
+class MetricsSampler:
+    """
+    Samples system metrics on a background thread at a fixed interval.
+
+    Snapshots go into a fixed-size ring buffer, so /stats just returns the
+    latest one and every caller sees the same numbers. psutil.cpu_percent()
+    is only ever called here, which makes each reading cover exactly one
+    sampling interval instead of "time since some other request".
+    """
+
+    def __init__(self, interval: float = 1.0, history_size: int = 3600, disk_path: str = "/"):
+        self.interval = interval
+        self.disk_path = disk_path
+        self.history: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._latest: Optional[Dict[str, Any]] = None
+        self._last_net = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._subscribers: List[StreamSubscription] = []
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def start(self):
+        """Start the sampling thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        psutil.cpu_percent(percpu=True)  # prime the CPU counters
+        self._last_net = (time.time(), psutil.net_io_counters())
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self._record(self.sample())
+            except Exception as e:
+                print(f"Metrics sampling error: {e}")
+            # Fixed-rate schedule: slow samples don't make the interval drift
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
+
+    def sample(self) -> Dict[str, Any]:
+        """Collect one snapshot of CPU, memory, disk and network usage"""
+        now = time.time()
+        per_core = psutil.cpu_percent(percpu=True)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        net = psutil.net_io_counters()
+
+        sent_rate = recv_rate = 0.0
+        if self._last_net is not None:
+            last_time, last_net = self._last_net
+            elapsed = now - last_time
+            if elapsed > 0:
+                sent_rate = max(net.bytes_sent - last_net.bytes_sent, 0) / elapsed
+                recv_rate = max(net.bytes_recv - last_net.bytes_recv, 0) / elapsed
+        self._last_net = (now, net)
+
+        return {
+            "timestamp": now,
+            "cpu_percent": round(sum(per_core) / len(per_core), 1) if per_core else 0.0,
+            "cpu_per_core": per_core,
+            "memory_percent": memory.percent,
+            "memory_used": memory.used,
+            "memory_total": memory.total,
+            "disk_usage": disk.percent,
+            "disk_used": disk.used,
+            "disk_total": disk.total,
+            "net_bytes_sent": net.bytes_sent,
+            "net_bytes_recv": net.bytes_recv,
+            "net_sent_per_sec": round(sent_rate, 1),
+            "net_recv_per_sec": round(recv_rate, 1)
+        }
+
+    def _record(self, snapshot: Dict[str, Any]):
+        with self._lock:
+            self.history.append(snapshot)
+            self._latest = snapshot
+            subscribers = list(self._subscribers)
+
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Metrics listener error: {e}")
+
+        # Fan the tick out to every stream subscriber on its own loop
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, snapshot)
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call `listener` with every snapshot on the sampler thread (keep it fast)"""
+        self._listeners.append(listener)
+
+    def subscribe(self, min_interval: float = 0.0, fields: Optional[Sequence[str]] = None,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> StreamSubscription:
+        """Receive every snapshot (at most one per `min_interval` seconds)"""
+        subscription = StreamSubscription(loop or asyncio.get_running_loop(), min_interval, fields)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def latest(self) -> Dict[str, Any]:
+        """Most recent snapshot (samples once on demand if the sampler isn't running)"""
+        snapshot = self._latest
+        if snapshot is None or not self.running:
+            snapshot = self.sample()
+            self._record(snapshot)
+        return snapshot
+
+    def get_history(self, window: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Buffered snapshots from the last `window` seconds, oldest first"""
+        with self._lock:
+            if window is None:
+                return list(self.history)
+            cutoff = time.time() - window
+            recent = []
+            for snapshot in reversed(self.history):
+                if snapshot["timestamp"] < cutoff:
+                    break
+                recent.append(snapshot)
+        recent.reverse()
+        return recent
+
+
+# Global instance started by the app lifespan
+metrics_sampler = MetricsSampler()
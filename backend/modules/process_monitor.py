@@ -0,0 +1,91 @@
+# backend/modules/process_monitor.py
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+import psutil
+
+
+class ProcessMonitor:
+    """
+    Top-N process view ("what's eating my CPU?").
+
+    Each refresh is a single pass over the process table, reading every
+    process inside Process.oneshot() so psutil fetches its stats in one go.
+    CPU usage is the delta of cumulative CPU time against a per-process
+    baseline from the previous pass, so there is no per-process sleep and
+    the numbers cover the real time between refreshes. Results are cached
+    for `min_refresh` seconds so concurrent callers share one pass.
+    """
+
+    def __init__(self, min_refresh: float = 1.0, prime_delay: float = 0.25):
+        self.min_refresh = min_refresh
+        self.prime_delay = prime_delay
+        self._lock = threading.Lock()
+        # (pid, create_time) -> (cumulative cpu seconds, monotonic timestamp)
+        self._baseline: Dict[Tuple[int, float], Tuple[float, float]] = {}
+        self._rows: List[Dict[str, Any]] = []
+        self._refreshed_at = 0.0
+
+    def _refresh(self):
+        now = time.monotonic()
+        memory_total = psutil.virtual_memory().total
+        baseline = {}
+        rows = []
+
+        for proc in psutil.process_iter():
+            try:
+                with proc.oneshot():
+                    # create_time guards against a recycled PID inheriting a baseline
+                    key = (proc.pid, proc.create_time())
+                    times = proc.cpu_times()
+                    rss = proc.memory_info().rss
+                    name = proc.name()
+                    try:
+                        username = proc.username()
+                    except psutil.AccessDenied:
+                        username = None
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+            cpu_total = times.user + times.system
+            baseline[key] = (cpu_total, now)
+            previous = self._baseline.get(key)
+            cpu_percent = 0.0
+            if previous is not None and now > previous[1]:
+                cpu_percent = max(cpu_total - previous[0], 0.0) / (now - previous[1]) * 100
+
+            rows.append({
+                "pid": proc.pid,
+                "name": name,
+                "username": username,
+                "cpu_percent": round(cpu_percent, 1),
+                "memory_rss": rss,
+                "memory_percent": round(rss / memory_total * 100, 1) if memory_total else 0.0
+            })
+
+        # Exited processes fall out of the baseline here
+        self._baseline = baseline
+        self._rows = rows
+        self._refreshed_at = now
+
+    def processes(self) -> List[Dict[str, Any]]:
+        """All processes from the latest pass (refreshing if it is stale)"""
+        with self._lock:
+            if not self._baseline:
+                # First call: take a baseline so CPU deltas mean something
+                self._refresh()
+                time.sleep(self.prime_delay)
+                self._refresh()
+            elif time.monotonic() - self._refreshed_at >= self.min_refresh:
+                self._refresh()
+            return self._rows
+
+    def top(self, n: int = 10, sort: str = "cpu") -> List[Dict[str, Any]]:
+        """The `n` processes using the most CPU ("cpu") or memory ("mem")"""
+        key = "cpu_percent" if sort == "cpu" else "memory_rss"
+        return heapq.nlargest(n, self.processes(), key=lambda row: row[key])
+
+
+# Global instance shared by the system routes
+process_monitor = ProcessMonitor()
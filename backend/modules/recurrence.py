@@ -0,0 +1,177 @@
+# backend/modules/recurrence.py
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Tuple
+from modules.reminder_time import parse_reminder_time, reminder_due_time
+
+'''
+A recurring reminder stores its rule once instead of one entry per occurrence:
+
+    "recurrence": {"freq": "daily" | "weekly", "interval": 1,
+                   "weekdays": [0, 2, 4],      # weekly only, 0 = Monday
+                   "until": "2026-12-31", "count": 10}
+    "exceptions": {"2026-10-21T09:00:00": {"skip": true},
+                   "2026-10-22T09:00:00": {"time": "2026-10-22 11:00:00"}}
+
+The reminder's own "time" is the first occurrence. Occurrences are identified
+by their original (unmoved) local time in ISO format, which is also the key
+used for per-occurrence exceptions.
+'''
+
+FREQUENCIES = ("daily", "weekly")
+
+
+def local_time(moment: datetime) -> datetime:
+    """`moment` as naive local time, which is how occurrences are computed"""
+    if moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def occurrence_key(moment: datetime) -> str:
+    """Stable identifier of an occurrence (its original local start time)"""
+    return local_time(moment).replace(microsecond=0).isoformat()
+
+
+def is_recurring(reminder: Dict[str, Any]) -> bool:
+    return bool(reminder.get("recurrence"))
+
+
+def _parse_until(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    until = local_time(datetime.fromisoformat(value))
+    if len(value) <= 10:
+        # A bare date includes the whole day
+        until += timedelta(days=1) - timedelta(microseconds=1)
+    return until
+
+
+def _base_occurrences(first: datetime, rule: Dict[str, Any], after: datetime) -> Iterator[datetime]:
+    """
+    Rule-generated occurrences at or after `after`, in order.
+
+    Jumps straight to the window instead of walking from the first
+    occurrence, so a years-old daily reminder costs the same as a new one.
+    """
+    interval = max(int(rule.get("interval") or 1), 1)
+    count = rule.get("count")
+    until = _parse_until(rule.get("until"))
+
+    if rule["freq"] == "daily":
+        step = timedelta(days=interval)
+        index = 0
+        if after > first:
+            index = (after - first) // step
+        moment = first + index * step
+        while True:
+            if (count is not None and index >= count) or (until is not None and moment > until):
+                return
+            if moment >= after:
+                yield moment
+            index += 1
+            moment = first + index * step
+
+    elif rule["freq"] == "weekly":
+        weekdays = sorted(set(rule.get("weekdays") or [first.weekday()]))
+        week_start = first - timedelta(days=first.weekday())
+        step = timedelta(weeks=interval)
+        first_week = [week_start + timedelta(days=d) for d in weekdays]
+        first_week = [m for m in first_week if m >= first]
+
+        week = 0
+        if after > week_start:
+            week = (after - week_start) // step
+        index = 0 if week == 0 else len(first_week) + (week - 1) * len(weekdays)
+        while True:
+            base = week_start + week * step
+            for day in weekdays:
+                moment = base + timedelta(days=day)
+                if moment < first:
+                    continue
+                if (count is not None and index >= count) or (until is not None and moment > until):
+                    return
+                index += 1
+                if moment >= after:
+                    yield moment
+            week += 1
+
+    else:
+        raise ValueError(f"Unsupported recurrence frequency: {rule['freq']}")
+
+
+def expand(reminder: Dict[str, Any], start: Optional[float] = None,
+           end: Optional[float] = None) -> Iterator[Tuple[float, str]]:
+    """
+    Lazily yield (due timestamp, occurrence key) for a reminder in [start, end).
+
+    Works for one-off reminders too (at most one occurrence). Skipped
+    occurrences are dropped and moved ones are yielded at their new time,
+    keeping the output sorted by due time.
+    """
+    due = reminder_due_time(reminder)
+    if due is None:
+        return
+    first = datetime.fromtimestamp(due)
+    exceptions = reminder.get("exceptions") or {}
+
+    def in_window(timestamp: float) -> bool:
+        return (start is None or timestamp >= start) and (end is None or timestamp < end)
+
+    moved = []
+    overridden = set()
+    for key, override in exceptions.items():
+        overridden.add(key)
+        if override.get("skip") or not override.get("time"):
+            continue
+        new_time = parse_reminder_time(override["time"])
+        if new_time is not None and in_window(new_time):
+            moved.append((new_time, key))
+    moved.sort()
+
+    def base_stream() -> Iterator[Tuple[float, str]]:
+        if not is_recurring(reminder):
+            candidates = iter([first])
+        else:
+            after = first if start is None else max(first, datetime.fromtimestamp(start))
+            candidates = _base_occurrences(first, reminder["recurrence"], after)
+        for moment in candidates:
+            timestamp = moment.timestamp()
+            if end is not None and timestamp >= end:
+                return
+            key = occurrence_key(moment)
+            if key not in overridden and in_window(timestamp):
+                yield (timestamp, key)
+
+    yield from heapq.merge(base_stream(), moved)
+
+
+def next_occurrence(reminder: Dict[str, Any], after: float,
+                    after_key: Optional[str] = None) -> Optional[Tuple[float, str]]:
+    """
+    First occurrence due at or after `after`, or None when the rule has
+    ended. With `after_key`, the occurrence (after, after_key) itself and
+    everything ordered before it are passed over: occurrences are walked in
+    (due, key) order, so one moved onto the same time as another is still
+    reached.
+    """
+    for occurrence in expand(reminder, start=after):
+        if after_key is None or occurrence > (after, after_key):
+            return occurrence
+    return None
+
+
+def is_occurrence(reminder: Dict[str, Any], key: str) -> bool:
+    """Whether `key` is an occurrence the rule generates (ignoring exceptions)"""
+    try:
+        moment = local_time(datetime.fromisoformat(key))
+    except ValueError:
+        return False
+    due = reminder_due_time(reminder)
+    if due is None:
+        return False
+    first = datetime.fromtimestamp(due)
+    if not is_recurring(reminder):
+        return occurrence_key(first) == occurrence_key(moment)
+    found = next(_base_occurrences(first, reminder["recurrence"], moment), None)
+    return found is not None and occurrence_key(found) == occurrence_key(moment)
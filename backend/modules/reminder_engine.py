@@ -0,0 +1,193 @@
+# backend/modules/reminder_engine.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from modules.recurrence import next_occurrence
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderEngine:
+    """
+    Fires reminders when they fall due.
+
+    Pending reminders sit in a min-heap keyed by due time (a recurring
+    reminder only ever has its next occurrence in the heap); the engine task
+    sleeps until the head is due (or until an earlier reminder is added), so
+    an idle schedule costs no CPU regardless of its size. Add, update and
+    delete are O(log n): replaced entries are only marked dead and skipped
+    when they reach the top of the heap.
+
+    schedule(), unschedule() and clear() may be called from any thread.
+    """
+
+    # Re-check the wall clock at least this often (clock changes, suspend)
+    MAX_SLEEP = 300.0
+
+    def __init__(self, grace_seconds: float = 60.0):
+        self.grace_seconds = grace_seconds
+        self.callbacks: List[Callable[[Dict[str, Any]], Any]] = []
+        self._heap: List[list] = []
+        self._entries: Dict[str, list] = {}
+        self._counter = itertools.count()
+        self._dead = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running_callbacks: set = set()
+
+    def add_callback(self, callback: Callable[[Dict[str, Any]], Any]):
+        """Register a function (or coroutine function) called with each fired reminder"""
+        self.callbacks.append(callback)
+
+    async def start(self, reminders: Iterable[Dict[str, Any]] = ()):
+        """Load the current reminders and start the firing task"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        for reminder in reminders:
+            self._schedule(reminder)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Reminder engine started with {len(self._entries)} pending reminders")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._entries)
+
+    # ---- thread-safe public API ----
+
+    def schedule(self, reminder: Dict[str, Any]):
+        """Add a reminder, or move it if it is already scheduled"""
+        self._call_in_loop(self._schedule, dict(reminder))
+
+    def unschedule(self, reminder_id: str):
+        self._call_in_loop(self._unschedule, reminder_id)
+
+    def clear(self):
+        self._call_in_loop(self._clear)
+
+    def _call_in_loop(self, func, *args):
+        if self._loop is None:
+            # Not started yet; start() loads everything from the store
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            func(*args)
+        else:
+            self._loop.call_soon_threadsafe(func, *args)
+
+    # ---- heap maintenance (event loop thread only) ----
+
+    def _schedule(self, reminder: Dict[str, Any], after: Optional[float] = None, after_key: Optional[str] = None):
+        """
+        Queue the reminder's next occurrence (recurring reminders keep one
+        entry at a time): the first one due from `after` on, or the one
+        following occurrence (after, after_key) when that has just fired.
+        """
+        self._unschedule(reminder["id"])
+        if after is None:
+            # Occurrences further in the past were missed while the server was down
+            after = time.time() - self.grace_seconds
+        occurrence = next_occurrence(reminder, after, after_key)
+        if occurrence is None:
+            return
+
+        due, key = occurrence
+        entry = [due, next(self._counter), key, reminder]
+        self._entries[reminder["id"]] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry and self._wakeup:
+            self._wakeup.set()
+
+    def _unschedule(self, reminder_id: str):
+        entry = self._entries.pop(reminder_id, None)
+        if entry is not None:
+            entry[-1] = None
+            self._dead += 1
+            if self._dead > 64 and self._dead > len(self._heap) // 2:
+                self._compact()
+
+    def _clear(self):
+        self._heap.clear()
+        self._entries.clear()
+        self._dead = 0
+
+    def _compact(self):
+        """Drop dead entries once they make up most of the heap"""
+        self._heap = [entry for entry in self._heap if entry[-1] is not None]
+        heapq.heapify(self._heap)
+        self._dead = 0
+
+    def _pop_dead(self):
+        while self._heap and self._heap[0][-1] is None:
+            heapq.heappop(self._heap)
+            self._dead -= 1
+
+    # ---- firing ----
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            self._pop_dead()
+
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, self.MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due, _, key, reminder = heapq.heappop(self._heap)
+            del self._entries[reminder["id"]]
+            self._fire(reminder, due, key)
+            # Recurring reminders go straight back in with the occurrence after this one
+            self._schedule(reminder, after=due, after_key=key)
+
+    def _fire(self, reminder: Dict[str, Any], due: float, key: str):
+        fired = {
+            "id": reminder["id"],
+            "message": reminder.get("message", ""),
+            "time": reminder.get("time"),
+            "occurrence": key,
+            "due_at": datetime.fromtimestamp(due).isoformat(),
+            "fired_at": datetime.now().isoformat()
+        }
+        for callback in self.callbacks:
+            # Callbacks run concurrently so a slow one (TTS) can't delay the next reminder
+            task = asyncio.create_task(self._run_callback(callback, fired))
+            self._running_callbacks.add(task)
+            task.add_done_callback(self._running_callbacks.discard)
+
+    async def _run_callback(self, callback, fired: Dict[str, Any]):
+        try:
+            if asyncio.iscoroutinefunction(callback):
+                await callback(fired)
+            else:
+                await asyncio.to_thread(callback, fired)
+        except Exception as e:
+            logger.error(f"Reminder callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+# Global instance shared by the scheduler routes and the app lifespan
+reminder_engine = ReminderEngine()
@@ -0,0 +1,87 @@
+# backend/modules/reminder_time.py
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+# Spoken back when a voice reminder names no time we understand
+MISSING_TIME_REPLY = "I need a time for that reminder, like \"remind me at 5 pm to stretch\""
+
+# Formats accepted for the free-form "time" field (full date and time)
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %I:%M %p",
+    "%d/%m/%Y %H:%M",
+]
+
+# Time-only formats resolve to the next matching time after the reference
+TIME_FORMATS = [
+    "%H:%M:%S",
+    "%H:%M",
+    "%I:%M %p",
+    "%I:%M%p",
+    "%I %p",
+    "%I%p",
+]
+
+
+def parse_reminder_time(value: Optional[str], reference: Optional[datetime] = None) -> Optional[float]:
+    """
+    Turn a reminder's "time" string into a Unix timestamp.
+
+    Full dates are taken as local time. A bare time of day ("14:30",
+    "2:30 pm") means its next occurrence after `reference` (usually the
+    reminder's created_at). Returns None if the string can't be understood.
+    """
+    if not value:
+        return None
+    text = value.strip()
+
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+
+    reference = reference or datetime.now()
+    for fmt in TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(text.upper(), fmt)
+        except ValueError:
+            continue
+        due = reference.replace(hour=parsed.hour, minute=parsed.minute,
+                                second=parsed.second, microsecond=0)
+        if due <= reference:
+            due += timedelta(days=1)
+        return due.timestamp()
+
+    return None
+
+
+def spoken_reminder(slots: Dict[str, Any], reference: Optional[datetime] = None) -> Optional[Dict[str, str]]:
+    """
+    The reminder a parsed voice command asks for, {"time", "message"}, with
+    the spoken time resolved to a full date and time. None when no time
+    (or none we understand) was said: the caller asks for one rather than
+    making a date up.
+    """
+    due = parse_reminder_time(slots.get("time"), reference)
+    if due is None:
+        return None
+    return {"time": datetime.fromtimestamp(due).strftime(DATETIME_FORMATS[0]),
+            "message": slots.get("message") or "Reminder"}
+
+
+def reminder_due_time(reminder: Dict[str, Any]) -> Optional[float]:
+    """Due timestamp for a stored reminder dict"""
+    reference = None
+    if reminder.get("created_at"):
+        try:
+            reference = datetime.fromisoformat(reminder["created_at"])
+        except ValueError:
+            reference = None
+    return parse_reminder_time(reminder.get("time"), reference)
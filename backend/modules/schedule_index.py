@@ -0,0 +1,98 @@
+# backend/modules/schedule_index.py
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from modules.reminder_time import reminder_due_time
+from modules.recurrence import expand, is_recurring, occurrence_key
+
+
+class ScheduleIndex:
+    """
+    Due-time-sorted view of the schedule for range and "next N" queries.
+
+    The index is rebuilt lazily whenever the store hands out a new schedule
+    snapshot (i.e. after a write or an external edit), so each query is a
+    bisect plus a slice: O(log n + k). Parsed due times are memoised per
+    (time, created_at) so a rebuild doesn't re-parse unchanged reminders.
+
+    Recurring reminders (and one-offs with a skip/move exception) are not in
+    the sorted array; their occurrences are generated lazily for the
+    requested window and merged in, so only the k returned occurrences are
+    ever produced.
+    """
+
+    # Cap for open-ended queries that would otherwise expand recurring rules forever
+    MAX_OPEN_ENDED = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source: Optional[List[Dict[str, Any]]] = None
+        self._keys: List[Tuple[float, int]] = []
+        self._expanded: List[int] = []
+        self._due_cache: Dict[Tuple[Any, Any], Optional[float]] = {}
+
+    def _due_time(self, reminder: Dict[str, Any]) -> Optional[float]:
+        key = (reminder.get("time"), reminder.get("created_at"))
+        if key not in self._due_cache:
+            self._due_cache[key] = reminder_due_time(reminder)
+        return self._due_cache[key]
+
+    def _sync(self, schedule: List[Dict[str, Any]]):
+        if schedule is self._source:
+            return
+        keys = []
+        expanded = []
+        for position, reminder in enumerate(schedule):
+            if is_recurring(reminder) or reminder.get("exceptions"):
+                expanded.append(position)
+                continue
+            due = self._due_time(reminder)
+            if due is not None:
+                keys.append((due, position))
+        keys.sort()
+        self._keys = keys
+        self._expanded = expanded
+        self._source = schedule
+        if len(self._due_cache) > 4 * max(len(schedule), 256):
+            self._due_cache.clear()
+
+    def query(self, schedule: List[Dict[str, Any]], start: Optional[float] = None,
+              end: Optional[float] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Occurrences due in [start, end), earliest first.
+
+        Each item is the reminder plus "due_at" and "occurrence" fields; a
+        recurring reminder appears once per occurrence in the window.
+        """
+        with self._lock:
+            self._sync(schedule)
+            keys = self._keys
+            lo = 0 if start is None else bisect_left(keys, (start, -1))
+            hi = len(keys) if end is None else bisect_left(keys, (end, -1))
+            if limit is not None:
+                hi = min(hi, lo + max(limit, 0))
+            selected = keys[lo:hi]
+            expanded = self._expanded
+
+        if expanded and end is None and limit is None:
+            limit = self.MAX_OPEN_ENDED
+
+        def occurrences(position: int) -> Iterator[Tuple[float, str, int]]:
+            for due, key in expand(schedule[position], start, end):
+                yield (due, key, position)
+
+        one_off = ((due, occurrence_key(datetime.fromtimestamp(due)), position) for due, position in selected)
+        merged = heapq.merge(one_off, *(occurrences(p) for p in expanded))
+        return [
+            dict(schedule[position], due_at=datetime.fromtimestamp(due).isoformat(), occurrence=key)
+            for due, key, position in islice(merged, limit)
+        ]
+
+    def upcoming(self, schedule: List[Dict[str, Any]], limit: int = 5,
+                 now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The next `limit` reminders that are not yet due"""
+        return self.query(schedule, start=time.time() if now is None else now, limit=limit)
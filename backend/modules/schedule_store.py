@@ -0,0 +1,69 @@
+# backend/modules/schedule_store.py
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ScheduleStore:
+    """
+    In-memory copy of schedule.json.
+
+    The file is parsed once and re-read only when its mtime/size changes
+    (someone edited it by hand). Writes go through a temp file and
+    os.replace so readers never see a half-written file. Callers hold `lock`
+    around a load-modify-save sequence so concurrent requests can't lose
+    each other's changes.
+
+    The cached list is treated as an immutable snapshot: build a new list
+    and pass it to save() instead of mutating what load() returned.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self._schedule: Optional[List[Dict[str, Any]]] = None
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return []
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Return the cached schedule, re-reading the file only if it changed"""
+        with self.lock:
+            signature = self._file_signature()
+            if self._schedule is None or signature != self._signature:
+                self._schedule = self._read()
+                self._signature = signature
+            return self._schedule
+
+    def save(self, schedule_list: List[Dict[str, Any]]):
+        """Atomically replace the file and the cached copy"""
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".schedule-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(schedule_list, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._schedule = schedule_list
+            self._signature = self._file_signature()
@@ -0,0 +1,57 @@
+# backend/modules/step_graph.py
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, List, Set
+
+
+class StepGraph:
+    """
+    Steps of a multi-step command and what each one must wait for.
+
+    A step can only depend on steps added before it, so the graph is
+    acyclic by construction. run() starts every step as soon as the steps
+    it depends on have finished, so independent steps overlap and the
+    whole run takes about as long as the slowest chain of dependent steps.
+    """
+
+    def __init__(self):
+        self.steps: List[Any] = []
+        self.after: List[Set[int]] = []
+
+    def add(self, step: Any, after: Iterable[int] = ()) -> int:
+        """Add a step that waits for the steps at `after`; returns its index"""
+        index = len(self.steps)
+        after = set(after)
+        if any(not 0 <= dep < index for dep in after):
+            raise ValueError(f"Step {index} can only depend on earlier steps, got {sorted(after)}")
+        self.steps.append(step)
+        self.after.append(after)
+        return index
+
+    def run(self, execute: Callable[[Any], Any], max_workers: int = 8) -> List[Any]:
+        """
+        Run every step through `execute` and return the results in step
+        order. A step that raises has the exception as its result; the
+        steps after it still run.
+        """
+        results: List[Any] = [None] * len(self.steps)
+        blockers = [len(after) for after in self.after]
+        dependents: List[List[int]] = [[] for _ in self.steps]
+        for index, after in enumerate(self.after):
+            for dep in after:
+                dependents[dep].append(index)
+
+        if not self.steps:
+            return results
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(self.steps))) as pool:
+            running = {pool.submit(execute, self.steps[i]): i for i, count in enumerate(blockers) if not count}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    error = future.exception()
+                    results[index] = error if error is not None else future.result()
+                    for dependent in dependents[index]:
+                        blockers[dependent] -= 1
+                        if not blockers[dependent]:
+                            running[pool.submit(execute, self.steps[dependent])] = dependent
+        return results
@@ -0,0 +1,184 @@
+# backend/modules/tts_cache.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "data", "tts_cache")
+
+
+def wav_duration(path: str) -> Optional[float]:
+    """Length of a WAV file in seconds, or None if it is not a readable WAV"""
+    try:
+        with wave.open(path, "rb") as audio:
+            return audio.getnframes() / float(audio.getframerate())
+    except (OSError, EOFError, wave.Error, ZeroDivisionError):
+        return None
+
+
+class WinsoundPlayer:
+    """Plays WAV files asynchronously through winsound (Windows)"""
+
+    def __init__(self):
+        import winsound
+        self._winsound = winsound
+
+    def play(self, path: str):
+        flags = self._winsound.SND_FILENAME | self._winsound.SND_ASYNC | self._winsound.SND_NODEFAULT
+        self._winsound.PlaySound(path, flags)
+
+    def stop(self):
+        self._winsound.PlaySound(None, self._winsound.SND_PURGE)
+
+
+def default_player():
+    """A WAV player for this platform, or None (everything is then synthesized live)"""
+    try:
+        return WinsoundPlayer()
+    except ImportError:
+        return None
+
+
+class TTSCache:
+    """
+    Rendered speech on disk, so frequent phrases play back instead of
+    being synthesized every time.
+
+    Files are keyed by a hash of (text, voice, rate, personality) and
+    evicted least recently used first once they exceed `budget_bytes`.
+    Use is recorded in the file's mtime, so the LRU order survives
+    restarts. A phrase is worth rendering once it has been asked for
+    `render_after` times (or when it is pre-rendered explicitly).
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, budget_bytes: int = 50 * 1024 * 1024,
+                 render_after: int = 2, max_tracked: int = 10_000):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.render_after = render_after
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        self._files: "OrderedDict[str, int]" = OrderedDict()  # key -> size, least recently used first
+        self._misses: Dict[str, int] = {}
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str, voice: Any, rate: Any, personality: str = "") -> str:
+        identity = json.dumps([text, str(voice), str(rate), personality])
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.wav")
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(self._files.values())
+
+    def load(self):
+        """Index the files already on disk (once), oldest use first"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                entries = [entry for entry in os.scandir(self.directory)
+                           if entry.is_file() and entry.name.endswith(".wav")]
+            except FileNotFoundError:
+                return
+            for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+                self._files[entry.name[:-4]] = entry.stat().st_size
+            self._evict()
+
+    def has(self, key: str) -> bool:
+        self.load()
+        with self._lock:
+            return key in self._files
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the rendered phrase (marking it used), or None"""
+        self.load()
+        with self._lock:
+            if key not in self._files:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            if not os.path.exists(path):
+                del self._files[key]
+                self.misses += 1
+                return None
+            self._files.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def should_render(self, key: str) -> bool:
+        """Count a miss; True once the phrase has been asked for often enough"""
+        with self._lock:
+            if len(self._misses) > self.max_tracked:
+                self._misses.clear()
+            self._misses[key] = self._misses.get(key, 0) + 1
+            return self._misses[key] >= self.render_after
+
+    def temp_path(self) -> str:
+        """A fresh file in the cache directory for the engine to render into"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix=".render-", suffix=".wav")
+        os.close(fd)
+        return path
+
+    def add(self, key: str, rendered_path: str) -> Optional[str]:
+        """Move a rendered file into the cache; None if it is not playable audio"""
+        if not wav_duration(rendered_path):
+            self.discard(rendered_path)
+            return None
+        path = self._path(key)
+        os.replace(rendered_path, path)
+        with self._lock:
+            self._files[key] = os.path.getsize(path)
+            self._files.move_to_end(key)
+            self._misses.pop(key, None)
+            self._evict()
+            return path if key in self._files else None
+
+    def remove(self, key: str):
+        with self._lock:
+            self._files.pop(key, None)
+        self.discard(self._path(key))
+
+    def discard(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used files until the cache fits its budget"""
+        total = self.size_bytes
+        while self._files and total > self.budget_bytes:
+            key, size = self._files.popitem(last=False)
+            total -= size
+            self.discard(self._path(key))
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "phrases": len(self._files),
+                "size_bytes": self.size_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Global instance used by the TTS worker
+tts_cache = TTSCache()
@@ -0,0 +1,309 @@
+# backend/modules/tts_worker.py
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from modules.tts_cache import TTSCache, tts_cache, default_player, wav_duration
+
+logger = logging.getLogger(__name__)
+
+# Lower numbers are spoken first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+PRIORITY_RENDER = 20   # rendering phrases into the cache, after everything audible
+
+
+def _default_engine():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+class SpeechHandle:
+    """One queued utterance: wait for it to be spoken, or cancel it"""
+
+    def __init__(self, utterance_id: int, text: str, priority: int, properties: Dict[str, Any],
+                 tag: str = "", kind: str = "speak"):
+        self.id = utterance_id
+        self.text = text
+        self.priority = priority
+        self.properties = properties
+        self.tag = tag          # e.g. the personality; part of the cache key
+        self.kind = kind        # "speak", or "render" into the cache
+        self.state = "queued"   # queued, speaking, done, interrupted, cancelled, failed
+        self._finished = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the utterance has finished (or was dropped); False on timeout"""
+        return self._finished.wait(timeout)
+
+    def cancel(self):
+        """Drop the utterance; stops it mid-sentence if it is being spoken"""
+        if not self.done:
+            self.state = "cancelled" if self.state == "queued" else "interrupted"
+
+    def _finish(self, state: str):
+        if not self.done:
+            if self.state not in ("cancelled", "interrupted"):
+                self.state = state
+            self._finished.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "text": self.text, "priority": self.priority, "kind": self.kind, "state": self.state}
+
+
+class TTSWorker:
+    """
+    Speaks on a dedicated thread that owns the TTS engine.
+
+    say() queues an utterance and returns a SpeechHandle at once, so no
+    caller blocks for the length of the audio. Utterances are spoken by
+    priority, oldest first within a priority. The engine runs its own
+    loop in non-blocking mode (startLoop(False) + iterate()), so the
+    worker can notice new work while speaking: an utterance queued with
+    interrupt=True cuts off the one being spoken if that one has a lower
+    priority (barge-in). The cut-off utterance is not resumed.
+
+    With a cache and a WAV player, phrases that come up repeatedly are
+    rendered to files (the engine's save_to_file, as the lowest-priority
+    job, stopped by any new speech) and played back from then on.
+    """
+
+    def __init__(self, engine_factory: Callable[[], Any] = _default_engine, poll_interval: float = 0.02,
+                 cache: Optional[TTSCache] = None, player: Any = None):
+        self.engine_factory = engine_factory
+        self.poll_interval = poll_interval
+        self.cache = cache
+        self.player = player
+        self._queue: List[Tuple[int, int, SpeechHandle]] = []
+        self._setup: List[Callable[[Any], None]] = []
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._barge_in = False
+        self._current: Optional[SpeechHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop speaking, drop the queue and end the worker thread"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def configure(self, setup: Callable[[Any], None]):
+        """Run `setup(engine)` on the worker thread before the next utterance (voices, rate...)"""
+        with self._cond:
+            self._setup.append(setup)
+            self._cond.notify_all()
+        self.start()
+
+    def say(self, text: str, priority: int = PRIORITY_NORMAL, interrupt: bool = False, tag: str = "",
+            **properties) -> SpeechHandle:
+        """Queue `text`; engine properties (rate, volume, voice) apply to this utterance only"""
+        return self._enqueue(SpeechHandle(next(self._ids), text, priority, properties, tag), interrupt)
+
+    def prerender(self, text: str, tag: str = "", **properties) -> Optional[SpeechHandle]:
+        """Render a phrase into the cache ahead of time, as say() with these settings would play it"""
+        if self.cache is None or self.player is None:
+            return None
+        return self._enqueue(SpeechHandle(next(self._ids), text, PRIORITY_RENDER, properties, tag, kind="render"))
+
+    def _enqueue(self, handle: SpeechHandle, interrupt: bool = False) -> SpeechHandle:
+        with self._cond:
+            heapq.heappush(self._queue, (handle.priority, handle.id, handle))
+            current = self._current
+            if current is not None and current.priority > handle.priority:
+                # Rendering never holds up speech; speaking is cut off only on request
+                if interrupt or current.kind == "render":
+                    self._barge_in = True
+            self._cond.notify_all()
+        self.start()
+        return handle
+
+    def interrupt(self):
+        """Stop the current utterance and drop everything queued"""
+        with self._cond:
+            for _, _, handle in self._queue:
+                handle.cancel()
+                handle._finish("cancelled")
+            self._queue.clear()
+            if self._current is not None:
+                self._current.cancel()
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "running": self._running,
+                "speaking": self._current.to_dict() if self._current else None,
+                "queued": [handle.to_dict() for _, _, handle in sorted(self._queue)]
+            }
+
+    def _next(self) -> Optional[SpeechHandle]:
+        """Wait for the next live utterance (None once stopped); engine setups are passed back first"""
+        with self._cond:
+            while self._running:
+                while self._queue and self._queue[0][2].state == "cancelled":
+                    heapq.heappop(self._queue)[2]._finish("cancelled")
+                if self._setup or self._queue:
+                    break
+                self._cond.wait()
+            if not self._running:
+                return None
+            if self._queue:
+                self._current = heapq.heappop(self._queue)[2]
+                self._current.state = "speaking"
+                self._barge_in = False
+            return self._current
+
+    def _run(self):
+        try:
+            engine = self.engine_factory()
+        except Exception as e:
+            logger.error(f"TTS engine unavailable: {e}")
+            self._drain("failed")
+            return
+
+        finished = threading.Event()
+        engine.connect("finished-utterance", lambda name, completed: finished.set())
+        engine.startLoop(False)
+        try:
+            while True:
+                handle = self._next()
+                with self._cond:
+                    setups, self._setup = self._setup, []
+                for setup in setups:
+                    try:
+                        setup(engine)
+                    except Exception as e:
+                        logger.error(f"TTS setup failed: {e}")
+                if handle is None:
+                    if not self._running:
+                        break
+                    continue
+                self._run_job(engine, handle, finished)
+        finally:
+            try:
+                engine.endLoop()
+            except Exception:
+                pass
+            self._drain("cancelled")
+
+    def _should_stop(self, handle: SpeechHandle) -> bool:
+        with self._cond:
+            return self._barge_in or not self._running or handle.state == "interrupted"
+
+    def _cache_key(self, engine: Any, handle: SpeechHandle) -> str:
+        voice = handle.properties.get("voice", engine.getProperty("voice"))
+        rate = handle.properties.get("rate", engine.getProperty("rate"))
+        return self.cache.key(handle.text, voice, rate, handle.tag)
+
+    def _run_job(self, engine: Any, handle: SpeechHandle, finished: threading.Event):
+        try:
+            if self.cache is None or self.player is None:
+                self._synthesize(engine, handle, finished)
+            elif handle.kind == "render":
+                self._render(engine, handle, finished)
+            else:
+                key = self._cache_key(engine, handle)
+                path = self.cache.get(key)
+                if path is None or not self._play(handle, path):
+                    if path is not None:
+                        self.cache.remove(key)   # unplayable file
+                    self._synthesize(engine, handle, finished)
+                    if self.cache.should_render(key):
+                        self.prerender(handle.text, handle.tag, **handle.properties)
+            handle._finish("done")
+        except Exception as e:
+            logger.error(f"TTS failed for utterance {handle.id}: {e}")
+            handle._finish("failed")
+        finally:
+            with self._cond:
+                self._current = None
+
+    def _play(self, handle: SpeechHandle, path: str) -> bool:
+        """Play a rendered phrase; False if the file can't be played"""
+        duration = wav_duration(path)
+        if not duration:
+            return False
+        self.player.play(path)
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            if self._should_stop(handle):
+                self.player.stop()
+                handle.state = "interrupted"
+                break
+            time.sleep(self.poll_interval)
+        return True
+
+    def _synthesize(self, engine: Any, handle: SpeechHandle, finished: threading.Event, path: Optional[str] = None):
+        """Speak with the engine, or render to `path`; False if it was cut off"""
+        previous = {}
+        try:
+            for name, value in handle.properties.items():
+                previous[name] = engine.getProperty(name)
+                engine.setProperty(name, value)
+            finished.clear()
+            if path is None:
+                engine.say(handle.text, str(handle.id))
+            else:
+                engine.save_to_file(handle.text, path, str(handle.id))
+            while not finished.is_set():
+                if self._should_stop(handle):
+                    engine.stop()
+                    handle.state = "interrupted"
+                    return False
+                engine.iterate()
+                time.sleep(self.poll_interval)
+            return True
+        finally:
+            for name, value in previous.items():
+                try:
+                    engine.setProperty(name, value)
+                except Exception:
+                    pass
+
+    def _render(self, engine: Any, handle: SpeechHandle, finished: threading.Event):
+        key = self._cache_key(engine, handle)
+        if self.cache.has(key):
+            return
+        path = self.cache.temp_path()
+        try:
+            if self._synthesize(engine, handle, finished, path):
+                self.cache.add(key, path)
+            elif self._running and handle.state == "interrupted":
+                # Pushed aside by speech: try again once the queue is quiet
+                self.prerender(handle.text, handle.tag, **handle.properties)
+        finally:
+            self.cache.discard(path)
+
+    def info(self) -> Dict[str, Any]:
+        return {**self.status(), "cache": self.cache.info() if self.cache and self.player else None}
+
+    def _drain(self, state: str):
+        with self._cond:
+            self._running = False
+            for _, _, handle in self._queue:
+                handle._finish(state)
+            self._queue.clear()
+
+
+# Global instance; its thread starts with the first utterance
+tts_worker = TTSWorker(cache=tts_cache, player=default_player())
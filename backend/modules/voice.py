@@ -1,9 +1,17 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+# Spoken responses that mean the command did not go through (worth running again on a retry)
+FAILURE_PREFIXES = ("❌", "⚠️", "⏳")
 
 class VoiceCommandRequest(BaseModel):
     text: str
     session_id: Optional[str] = None
+    idempotency_key: Optional[str] = None  # or the Idempotency-Key header
+
+class VoiceBatchRequest(BaseModel):
+    texts: List[str]
+    session_id: Optional[str] = None
 
 class ParsedCommandResponse(BaseModel):
     intent: str
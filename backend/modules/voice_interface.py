@@ -1,5 +1,7 @@
 # 📁 modules/voice_interface.py
-from modules.voice_io import continuous_listen, speak, listen, parse_voice_command, execute_voice_command
+from modules.voice_io import continuous_listen, speak, listen, listen_for_wake_word, handle_voice_command
+from modules.audio_capture import audio_capture
+from modules.tts_worker import PRIORITY_HIGH
 import threading
 
 class VoiceInterface:
@@ -27,18 +29,21 @@ class VoiceInterface:
         """Main listening loop"""
         while self.is_listening:
             try:
-                text = listen(timeout=10, phrase_time_limit=5)
+                # The wake word is checked on the device; only a hit goes to cloud recognition
+                heard, command_text = listen_for_wake_word(timeout=10)
                 
-                if text and "hey neurotrain" in text.lower():
+                if heard:
                     print("✅ Wake word detected")
-                    speak("Yes, I'm listening", is_command_response=True)
-                    
-                    # Listen for command
-                    command_text = listen(timeout=8, phrase_time_limit=15)
+                    if not command_text:
+                        # Barge in on a reply still being read out; listen once this is said
+                        speak("Yes, I'm listening", is_command_response=True, priority=PRIORITY_HIGH, interrupt=True).wait()
+                        
+                        # Listen for command
+                        command_text = listen(timeout=8, phrase_time_limit=15, since=audio_capture.position)
                     if command_text:
-                        command = parse_voice_command(command_text)
-                        response = execute_voice_command(command)
+                        command, response = handle_voice_command(command_text)
                         
+                        # Not waited for: saying the wake word again cuts a long reply short
                         speak(response, is_command_response=True)
                         
                         if self.callback:
@@ -58,8 +63,7 @@ class VoiceInterface:
         print("🎤 Say your command...")
         text = listen(timeout=10, phrase_time_limit=15)
         if text:
-            command = parse_voice_command(text)
-            response = execute_voice_command(command)
+            command, response = handle_voice_command(text)
             speak(response, is_command_response=True)
             return response
         return None
@@ -1,15 +1,24 @@
 # 📁 modules/voice_io.py
 import speech_recognition as sr
-import pyttsx3
-import re
-import requests, time
+import time
 import winsound
 import random  # Add this import
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from modules.grammar import grammar_engine, normalize
+from modules.actions import action_registry, ActionTimeout
+from modules.step_graph import StepGraph
+from modules.command_dedup import command_dedup
+from modules.voice import FAILURE_PREFIXES
+from modules.tts_worker import tts_worker, SpeechHandle, PRIORITY_HIGH, PRIORITY_NORMAL
+from modules.audio_capture import audio_capture, Utterance, SAMPLE_WIDTH
+from modules.wake_word import wake_detector
+from modules.reminder_time import MISSING_TIME_REPLY, spoken_reminder
 
 # Initialize engines
 recognizer = sr.Recognizer()
-tts_engine = pyttsx3.init()
+
+WAKE_WORD = "hey neurotrain"
+MIN_COMMAND_SECONDS = 0.6  # audio after the wake word shorter than this is just the pause
 
 # ==================== ANALYTICS SETUP ====================
 # Add command analytics tracking
@@ -20,7 +29,10 @@ command_analytics = {
     "command_types": {},
     "response_times": [],
     "last_command": None,
-    "last_response_time": 0
+    "last_response_time": 0,
+    "duplicate_commands": 0,
+    "cloud_recognitions": 0,
+    "wake_rejections": 0      # utterances turned away by the local wake word detector
 }
 
 def get_voice_analytics():
@@ -41,22 +53,29 @@ def get_voice_analytics():
             if command_analytics["response_times"] else 0
         ),
         "last_command": command_analytics["last_command"],
-        "last_response_time": command_analytics["last_response_time"]
+        "last_response_time": command_analytics["last_response_time"],
+        "duplicate_commands": command_analytics["duplicate_commands"],
+        "cloud_recognitions": command_analytics["cloud_recognitions"],
+        "wake_rejections": command_analytics["wake_rejections"]
     }
 # ==================== END ANALYTICS ====================
 
 
 # Configure TTS
 def setup_tts():
-    tts_engine.setProperty('rate', 180)
-    voices = tts_engine.getProperty('voices')
+    def configure(engine):
+        engine.setProperty('rate', 180)
+        voices = engine.getProperty('voices')
+        
+        # Prefer female voice if available
+        for voice in voices:
+            if "female" in voice.name.lower() or "zira" in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+        print("✅ TTS Engine configured")
     
-    # Prefer female voice if available
-    for voice in voices:
-        if "female" in voice.name.lower() or "zira" in voice.name.lower():
-            tts_engine.setProperty('voice', voice.id)
-            break
-    print("✅ TTS Engine configured")
+    # The engine lives on the TTS worker thread; configure it there
+    tts_worker.configure(configure)
 
 # Voice personality settings
 VOICE_PERSONALITY = {
@@ -67,109 +86,190 @@ VOICE_PERSONALITY = {
 
 current_personality = "friendly"
 
+# Stock replies worth having rendered before they are first needed
+KNOWN_PHRASES = [
+    "Yes, I'm listening",
+    "💬 I'm here to help!",
+    "⏳ The AI is thinking... please try again",
+    "❌ I couldn't add that task. Please try again.",
+    "❌ Couldn't retrieve system statistics.",
+    "❌ Command not implemented yet"
+]
+
+def prerender_phrases():
+    """Render the stock replies into the TTS cache for the current personality"""
+    personality = VOICE_PERSONALITY[current_personality]
+    for phrase in KNOWN_PHRASES:
+        tts_worker.prerender(phrase, tag=current_personality, rate=personality["rate"])
+        if personality["assertive"]:
+            tts_worker.prerender(phrase.upper(), tag=current_personality, rate=personality["rate"])
+
 def set_voice_personality(personality: str):
     """Change voice personality"""
     global current_personality
     if personality in VOICE_PERSONALITY:
         current_personality = personality
         setup_tts()  # Reapply settings
+        prerender_phrases()
 
 
 
-def speak(text: str, is_command_response: bool = False):
-    """Speak with current personality"""
+def speak(text: str, is_command_response: bool = False, priority: int = PRIORITY_NORMAL,
+          interrupt: bool = False) -> SpeechHandle:
+    """
+    Speak with current personality. Returns at once with a handle (call
+    .wait() to block until it has been said); interrupt=True cuts off a
+    lower-priority utterance that is being spoken.
+    """
     personality = VOICE_PERSONALITY[current_personality]
-    tts_engine.setProperty('rate', personality["rate"])
     
     if personality["assertive"] and is_command_response:
         text = text.upper() if random.random() > 0.7 else text
     
     print(f"🗣️ NeuroTrain ({current_personality}): {text}")
-    tts_engine.say(text)
-    tts_engine.runAndWait()
+    return tts_worker.say(text, priority=priority, interrupt=interrupt, tag=current_personality,
+                          rate=personality["rate"])
 
-def listen(timeout: int = 5, phrase_time_limit: int = 10, listening_callback=None) -> Optional[str]:
-    """Listen for voice input with visual feedback"""
+def recognize(utterance: Utterance) -> str:
+    """Cloud speech recognition of one utterance (lower-cased)"""
+    command_analytics["cloud_recognitions"] += 1
+    audio = sr.AudioData(utterance.to_bytes(), utterance.sample_rate, SAMPLE_WIDTH)
+    return recognizer.recognize_google(audio).lower()
+
+def listen(timeout: int = 5, phrase_time_limit: int = 10, listening_callback=None,
+           since: Optional[int] = None) -> Optional[str]:
+    """
+    Listen for voice input with visual feedback. Speech that started
+    before sample `since` of the stream (e.g. our own reply) is ignored.
+    """
     if listening_callback:
         listening_callback("start")  # UI: Show listening indicator
     
-    with sr.Microphone() as source:
-        print("🎤 Listening...")
-        try:
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-            text = recognizer.recognize_google(audio)
-            print("👤 User said:", text)
-            
-            if listening_callback:
-                listening_callback("stop")  # UI: Hide listening indicator
-                
-            return text.lower()
-        except sr.WaitTimeoutError:
+    print("🎤 Listening...")
+    try:
+        # The microphone stays open between calls; speech is cut out of it by the VAD
+        utterance = audio_capture.next_utterance(timeout=timeout, phrase_time_limit=phrase_time_limit, since=since)
+        if utterance is None:
             if listening_callback:
                 listening_callback("timeout")  # UI: Show timeout indicator
             print("⏰ Listening timeout")
             return None
-        except Exception as e:
-            if listening_callback:
-                listening_callback("error")  # UI: Show error indicator
-            print(f"❌ Listening error: {e}")
-            return None
+        text = recognize(utterance)
+        print("👤 User said:", text)
+        
+        if listening_callback:
+            listening_callback("stop")  # UI: Hide listening indicator
+            
+        return text
+    except Exception as e:
+        if listening_callback:
+            listening_callback("error")  # UI: Show error indicator
+        print(f"❌ Listening error: {e}")
+        return None
 
 def parse_voice_command(text: str) -> Dict[str, Any]:
     """Parse voice text and determine intent"""
     if not text:
         return {"intent": "unknown", "action": "none", "original_text": ""}
     
-    text = text.lower().strip()
-    
-    # Task commands
-    if re.match(r'(add|create|new).*task.*', text):
-        task_match = re.search(r'(add|create|new).*task.*to (.+)', text) or re.search(r'(add|create|new).*task.*called (.+)', text)
-        if task_match:
-            return {
-                "intent": "task", 
-                "action": "add", 
-                "title": task_match.group(2).strip(),
-                "original_text": text
-            }
-    
-    # System commands - FIXED REGEX
-    elif re.match(r'.*(cpu|memory|ram|disk|system).*(usage|stats|status).*', text):
-        return {"intent": "system", "action": "get_stats", "original_text": text}
-    
-    elif re.match(r'(open|launch|start).*(chrome|firefox|notepad|calculator|vscode|browser|app|application).*', text):
-        app_match = re.search(r'(open|launch|start).*(chrome|firefox|notepad|calculator|vscode|browser)', text)
-        if app_match:
-            app_name = app_match.group(2)
-            # Map browser to specific app
-            if app_name == "browser":
-                app_name = "chrome"
-            return {
-                "intent": "system", 
-                "action": "open_app", 
-                "app_name": app_name,
-                "original_text": text
-            }
-    
-    # Schedule commands
-    elif re.match(r'(set|add|create).*(reminder|alarm|schedule).*', text):
-        return {"intent": "schedule", "action": "add_reminder", "original_text": text}
-    # Add to parse_voice_command function
-    elif "and then" in text or "after that" in text:
-        # Handle multi-step commands: "open chrome and then check cpu usage"
-        parts = re.split(r'\b(?:and then|after that|then)\b', text)
-        return {
-            "intent": "multi",
-            "actions": [parse_voice_command(part.strip()) for part in parts],
-            "original_text": text
-        }
-    # Default to chat
-    else:
-        return {"intent": "chat", "action": "process_chat", "original_text": text}
+    text = normalize(text)
+    command = _legacy_command(grammar_engine.parse(text))
+
+    # Multi-step commands: "open chrome and check cpu", "add task x and then open chrome"
+    stages = grammar_engine.split_stages(text)
+    parts = [part for stage in stages for part in stage]
+    if len(parts) > 1:
+        actions = [_legacy_command(grammar_engine.parse(part)) for part in parts]
+        if all(action["intent"] != "chat" for action in actions):
+            return _multi_command(text, actions, [len(stage) for stage in stages])
+    if command["intent"] == "chat":
+        # "and" may just be part of what was said; only "then" splits a chat message
+        parts = grammar_engine.split_steps(text)
+        if len(parts) > 1:
+            actions = [_legacy_command(grammar_engine.parse(part)) for part in parts]
+            return _multi_command(text, actions, [1] * len(parts))
+    return command
+
+def _multi_command(text: str, actions: List[Dict[str, Any]], stage_sizes: List[int]) -> Dict[str, Any]:
+    """A multi-step command; `stages` lists which actions may run together, in order"""
+    stages, start = [], 0
+    for size in stage_sizes:
+        stages.append(list(range(start, start + size)))
+        start += size
+    return {"intent": "multi", "actions": actions, "stages": stages, "original_text": text}
+
+def _legacy_command(result) -> Dict[str, Any]:
+    """Reshape a grammar parse into the dicts execute_voice_command expects"""
+    slots = result.slots
+    if result.action == "add_task" and "title" in slots:
+        return {"intent": "task", "action": "add", "title": slots["title"], "original_text": result.text}
+    if result.action == "system_stats":
+        return {"intent": "system", "action": "get_stats", "original_text": result.text}
+    if result.action == "open_app" and "app_name" in slots:
+        # Map browser to specific app
+        app_name = "chrome" if slots["app_name"] == "browser" else slots["app_name"]
+        return {"intent": "system", "action": "open_app", "app_name": app_name, "original_text": result.text}
+    if result.action == "add_reminder":
+        # time is None when none was said; the executor asks for one
+        reminder = spoken_reminder(slots) or {"time": None, "message": slots.get("message") or "Reminder"}
+        return {"intent": "schedule", "action": "add_reminder", **reminder, "original_text": result.text}
+    # Anything this executor can't run is handed to the chat model
+    return {"intent": "chat", "action": "process_chat", "original_text": result.text}
+
+# Shared state a step changes; steps changing the same thing keep their spoken order
+STEP_RESOURCES = {
+    ("task", "add"): "tasks",
+    ("schedule", "add_reminder"): "schedule",
+    ("chat", "process_chat"): "chat"
+}
+
+def build_step_graph(command: Dict[str, Any]) -> StepGraph:
+    """
+    Dependency graph of a multi command: every step waits for the stage
+    before its own ("... then ..."), and for earlier steps in its stage
+    that change the same resource. Everything else runs concurrently.
+    """
+    actions = command["actions"]
+    stages = command.get("stages") or [[i] for i in range(len(actions))]
+    graph = StepGraph()
+    previous: List[int] = []
+    for stage in stages:
+        last_writer: Dict[str, int] = {}
+        for index in stage:
+            action = actions[index]
+            after = set(previous)
+            resource = STEP_RESOURCES.get((action["intent"], action["action"]))
+            if resource in last_writer:
+                after.add(last_writer[resource])
+            step = graph.add(action, after)
+            if resource:
+                last_writer[resource] = step
+        previous = stage
+    return graph
+
+def execute_multi_command(command: Dict[str, Any]) -> str:
+    """Run the steps of a multi command (independent ones concurrently) and combine their responses"""
+    start_time = time.time()
+    results = build_step_graph(command).run(execute_voice_command)
+    result = "\n".join(
+        f"⚠️ Sorry, I encountered an error: {r}" if isinstance(r, Exception) else r for r in results
+    )
+
+    # The steps were counted one by one; record the combined command as the latest
+    response_time = time.time() - start_time
+    command_analytics["last_response_time"] = response_time
+    command_analytics["last_command"] = {
+        "command": command,
+        "response": result,
+        "timestamp": time.time(),
+        "response_time": response_time
+    }
+    return result
 
 def execute_voice_command(command: Dict[str, Any]) -> str:
     """Execute the parsed command and return response"""
+    if command["intent"] == "multi":
+        return execute_multi_command(command)
     start_time = time.time()
     
     # Track command type
@@ -179,12 +279,8 @@ def execute_voice_command(command: Dict[str, Any]) -> str:
 
     try:
         if command["intent"] == "task" and command["action"] == "add":
-            # Call your tasks API
-            response = requests.post(
-                "http://127.0.0.1:8000/api/tasks",
-                json={"title": command["title"]}
-            )
-            if response.status_code == 200:
+            response = action_registry.call_sync("tasks.add", title=command["title"])
+            if response.ok:
                 play_sound("success")
                 result = f"✅ Task '{command['title']}' has been added to your list!"
                 command_analytics["successful_commands"] += 1
@@ -194,9 +290,9 @@ def execute_voice_command(command: Dict[str, Any]) -> str:
                 command_analytics["failed_commands"] += 1
         
         elif command["intent"] == "system" and command["action"] == "get_stats":
-            response = requests.get("http://127.0.0.1:8000/api/system/stats")
-            if response.status_code == 200:
-                stats = response.json()
+            response = action_registry.call_sync("system.stats")
+            if response.ok:
+                stats = response.data
                 play_sound("success")
                 result = f"📊 CPU: {stats['cpu_percent']}%, Memory: {stats['memory_percent']}%"
                 command_analytics["successful_commands"] += 1
@@ -206,12 +302,9 @@ def execute_voice_command(command: Dict[str, Any]) -> str:
                 command_analytics["failed_commands"] += 1
         
         elif command["intent"] == "system" and command["action"] == "open_app":
-            response = requests.post(
-                "http://127.0.0.1:8000/api/system/open", 
-                json={"app_name": command["app_name"]}
-            )
-            if response.status_code == 200:
-                result_data = response.json()
+            response = action_registry.call_sync("system.open", app_name=command["app_name"])
+            if response.ok:
+                result_data = response.data
                 if result_data.get("success"):
                     result = f"🚀 Opening {command['app_name']}"
                     command_analytics["successful_commands"] += 1
@@ -225,16 +318,29 @@ def execute_voice_command(command: Dict[str, Any]) -> str:
                 command_analytics["failed_commands"] += 1
                 play_sound("error")
         
+        elif command["intent"] == "schedule" and command["action"] == "add_reminder":
+            if command["time"] is None:
+                play_sound("error")
+                result = f"❌ {MISSING_TIME_REPLY}"
+                command_analytics["failed_commands"] += 1
+            else:
+                response = action_registry.call_sync("schedule.add", time=command["time"],
+                                                     message=command["message"])
+                if response.ok:
+                    play_sound("success")
+                    result = f"⏰ Reminder set for {command['time']}: {command['message']}"
+                    command_analytics["successful_commands"] += 1
+                else:
+                    play_sound("error")
+                    result = "❌ I couldn't set that reminder. Please try again."
+                    command_analytics["failed_commands"] += 1
+        
         elif command["intent"] == "chat":
             try:
-                response = requests.post(
-                    "http://127.0.0.1:8000/chat",
-                    json={"text": command["original_text"]},
-                    timeout=15
-                )
+                response = action_registry.call_sync("chat", text=command["original_text"])
                 
-                if response.status_code == 200:
-                    result_data = response.json()
+                if response.ok:
+                    result_data = response.data
                     reply = result_data.get("reply", "")
                     if reply.startswith("AI: "):
                         reply = reply[4:]
@@ -244,7 +350,7 @@ def execute_voice_command(command: Dict[str, Any]) -> str:
                     result = "❌ Chat service returned an error"
                     command_analytics["failed_commands"] += 1
                     
-            except requests.exceptions.Timeout:
+            except ActionTimeout:
                 result = "⏳ The AI is thinking... please try again"
                 command_analytics["failed_commands"] += 1
             except Exception as e:
@@ -275,26 +381,102 @@ def execute_voice_command(command: Dict[str, Any]) -> str:
     return result
 
 
-def continuous_listen(callback, wake_word: str = "hey neurotrain"):
+def handle_voice_command(text: str, session_id: Optional[str] = None,
+                         idempotency_key: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Parse and execute an utterance. The same utterance submitted again for
+    the session within the dedup window (the listening loop and the
+    frontend both sending it, through here or /api/voice/execute) gets the
+    first (command, response) back.
+    """
+    def run():
+        command = parse_voice_command(text)
+        return command, execute_voice_command(command)
+
+    def reshape(origin, result):
+        # Executed through the voice API: a CommandExecutionResponse
+        return parse_voice_command(text), result.tts_response
+
+    (command, response), duplicate = command_dedup.run(
+        "voice", session_id, text, run,
+        client_key=idempotency_key,
+        keep=lambda result: not result[1].startswith(FAILURE_PREFIXES),
+        reshape=reshape
+    )
+    if duplicate:
+        command_analytics["duplicate_commands"] += 1
+    return command, response
+
+
+def listen_for_wake_word(timeout: int = 10, phrase_time_limit: int = 10, wake_word: str = WAKE_WORD,
+                         detector=None) -> Tuple[bool, Optional[str]]:
+    """
+    Wait for one utterance and check it for the wake word. Returns
+    (heard, command): command is what was said right after the wake word
+    in the same breath, if anything.
+
+    The wake word is spotted on the device (`detector`, the enrolled
+    templates by default), so only a hit and what follows it go to cloud
+    recognition. Until the wake word has been enrolled, every utterance is
+    recognized and searched for `wake_word` as before.
+    """
+    detector = detector or wake_detector
+    utterance = audio_capture.next_utterance(timeout=timeout, phrase_time_limit=phrase_time_limit)
+    if utterance is None:
+        return False, None
+
+    if not detector.ready:
+        try:
+            text = recognize(utterance)
+        except Exception:
+            return False, None
+        if wake_word.lower() not in text:
+            return False, None
+        return True, text.split(wake_word.lower(), 1)[1].strip() or None
+
+    hit = detector.detect(utterance.samples, utterance.sample_rate)
+    if hit is None:
+        command_analytics["wake_rejections"] += 1
+        return False, None
+    rest = utterance.samples[hit.end:]
+    if len(rest) < MIN_COMMAND_SECONDS * utterance.sample_rate:
+        return True, None
+    try:
+        return True, recognize(Utterance(rest, utterance.sample_rate, utterance.start + hit.end, utterance.end)) or None
+    except Exception:
+        return True, None  # just the wake word and a pause: ask for the command
+
+def enroll_wake_word(timeout: int = 8) -> Optional[str]:
+    """Record the next utterance as a wake word template; returns its path (None if nothing was said)"""
+    # The listening loop must not take the recording (or hear it as a command)
+    with audio_capture.exclusive():
+        utterance = audio_capture.next_utterance(timeout=timeout, phrase_time_limit=3,
+                                                 since=audio_capture.position)
+    if utterance is None:
+        return None
+    return wake_detector.enroll(utterance.samples, utterance.sample_rate)
+
+def continuous_listen(callback, wake_word: str = WAKE_WORD):
     """Continuous listening mode with wake word detection"""
     print(f"🔊 Continuous listening started. Say '{wake_word}' to activate.")
     
     while True:
         try:
-            text = listen(timeout=10, phrase_time_limit=5)
+            heard, command_text = listen_for_wake_word(timeout=10, wake_word=wake_word)
             
-            if text and wake_word.lower() in text:
+            if heard:
                 print(f"✅ Wake word detected: {wake_word}")
-                speak("Yes, I'm listening", is_command_response=True)
-                
-                # Listen for actual command
-                command_text = listen(timeout=8, phrase_time_limit=15)
+                if not command_text:
+                    # Barge in on whatever is being said, and finish before listening
+                    speak("Yes, I'm listening", is_command_response=True, priority=PRIORITY_HIGH, interrupt=True).wait()
+                    
+                    # Listen for actual command (not the acknowledgement itself)
+                    command_text = listen(timeout=8, phrase_time_limit=15, since=audio_capture.position)
                 if command_text:
-                    # Parse and execute command
-                    command = parse_voice_command(command_text)
-                    response = execute_voice_command(command)
+                    # Parse and execute command (once, if the frontend sent it too)
+                    command, response = handle_voice_command(command_text)
                     
-                    # Speak response
+                    # Speak response; the wake word can cut it short
                     speak(response, is_command_response=True)
                     
                     # Call callback if provided (for UI updates)
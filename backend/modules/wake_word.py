@@ -0,0 +1,256 @@
+# backend/modules/wake_word.py
+import glob
+import logging
+import os
+import threading
+import time
+import wave
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from modules.audio_capture import WavFileSource, SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "data", "wake_word")
+
+WINDOW_MS = 25
+HOP_MS = 10
+N_MELS = 26
+N_MFCC = 13
+DYNAMIC_RANGE_DB = 15.0   # range kept below each frame's strongest band
+NOISE_PERCENTILE = 10     # per band: this percentile of the frames is taken as noise
+TRIM_DB = 12.0            # template frames less than this above the noise are leading/trailing silence
+DEFAULT_THRESHOLD = 7.5   # used with a single template; run bench_wake_word.py to tune
+
+
+@lru_cache(maxsize=8)
+def _filters(sample_rate: int, n_fft: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(mel filterbank, DCT-II matrix) for this sample rate and FFT size"""
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(to_mel(60.0), to_mel(min(7600.0, sample_rate / 2)), N_MELS + 2)
+    bins = np.floor((n_fft + 1) * to_hz(mels) / sample_rate).astype(int)
+    bank = np.zeros((N_MELS, n_fft // 2 + 1))
+    for i in range(N_MELS):
+        left, center, right = bins[i:i + 3]
+        if center > left:
+            bank[i, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[i, center:right] = (right - np.arange(center, right)) / (right - center)
+
+    k = np.arange(N_MFCC)[:, None]
+    n = np.arange(N_MELS)[None, :]
+    dct = np.cos(np.pi * k * (2 * n + 1) / (2 * N_MELS))
+    return bank, dct
+
+
+def mfcc(samples: np.ndarray, sample_rate: int, trim: bool = False) -> np.ndarray:
+    """
+    MFCC frames (25 ms windows every 10 ms) of int16 samples. c0 is left
+    out so loudness doesn't count, and the steady room noise is subtracted
+    first. trim=True drops leading and trailing silence (for templates).
+    """
+    x = samples.astype(np.float32) / 32768.0
+    if len(x) < 2:
+        return np.zeros((0, N_MFCC - 1))
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])  # pre-emphasis
+    window = sample_rate * WINDOW_MS // 1000
+    hop = sample_rate * HOP_MS // 1000
+    if len(x) < window:
+        x = np.pad(x, (0, window - len(x)))
+    count = 1 + (len(x) - window) // hop
+    frames = x[np.arange(window)[None, :] + hop * np.arange(count)[:, None]] * np.hamming(window)
+
+    n_fft = 1 << (window - 1).bit_length()
+    bank, dct = _filters(sample_rate, n_fft)
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    mel = power @ bank.T
+    # Spectral subtraction: the quietest frames (the pre-roll before speech) give the room's noise
+    noise = np.percentile(mel, NOISE_PERCENTILE, axis=0)
+    mel = np.maximum(mel - noise, mel * 0.05)
+    log_mel = np.log(mel + 1e-10)
+    # Bands far below the frame's strongest one carry room noise, not speech
+    log_mel = np.maximum(log_mel, log_mel.max(axis=1, keepdims=True) - DYNAMIC_RANGE_DB * np.log(10) / 10)
+
+    if trim:
+        level = 10 * np.log10(power.sum(axis=1) + 1e-10)
+        loud = np.flatnonzero(level > np.percentile(level, NOISE_PERCENTILE) + TRIM_DB)
+        log_mel = log_mel[loud[0]:loud[-1] + 1] if len(loud) else log_mel[:0]
+
+    return (log_mel @ dct.T)[:, 1:]
+
+
+def subsequence_dtw(template: np.ndarray, features: np.ndarray) -> Tuple[float, int]:
+    """
+    (distance, end frame) of the best match of `template` anywhere in
+    `features`. The path may run between half and twice the template's
+    speed; the distance is the mean frame distance along it.
+    """
+    n, m = len(template), len(features)
+    if n == 0 or m == 0:
+        return float("inf"), 0
+    cost = np.sqrt(((template[:, None, :] - features[None, :, :]) ** 2).sum(axis=2))
+    # Steps (1,1), (1,2) and (2,1): every template frame is paid for exactly once,
+    # and each row only needs the two before it, so a row is one vector operation
+    before, previous = np.full(m, np.inf), cost[0].copy()  # free start anywhere
+    for i in range(1, n):
+        best = np.full(m, np.inf)
+        best[1:] = previous[:-1]
+        best[2:] = np.minimum(best[2:], previous[:-2])
+        if i >= 2:
+            best[1:] = np.minimum(best[1:], before[:-1] + cost[i - 1, :-1])
+        before, previous = previous, cost[i] + best
+    end = int(np.argmin(previous))
+    return float(previous[end] / n), end
+
+
+class WakeHit:
+    """The wake word found in an utterance"""
+
+    def __init__(self, distance: float, end: int, elapsed_ms: float):
+        self.distance = distance
+        self.end = end              # sample where the wake word ends; the rest may be a command
+        self.elapsed_ms = elapsed_ms
+
+
+class WakeWordDetector:
+    """
+    Spots the wake word on the device, so only speech addressed to us is
+    sent to cloud recognition.
+
+    The wake word is enrolled by recording it a few times; each recording
+    is kept as a WAV template. An utterance is scored by the closest DTW
+    match of any template's MFCCs within its first `search_seconds`. With
+    two or more templates the threshold is calibrated from how far the
+    templates are from each other (times `margin`); otherwise
+    DEFAULT_THRESHOLD applies unless `threshold` is given.
+
+    Anything with `ready` and detect(samples, sample_rate) -> WakeHit or
+    None can stand in for this class in the listening loops.
+    """
+
+    def __init__(self, directory: str = TEMPLATE_DIR, threshold: Optional[float] = None, margin: float = 1.5,
+                 search_seconds: float = 3.0):
+        self.directory = directory
+        self.fixed_threshold = threshold
+        self.margin = margin
+        self.search_seconds = search_seconds
+        self._lock = threading.Lock()
+        self._templates: List[np.ndarray] = []
+        self._threshold = DEFAULT_THRESHOLD
+        self._loaded = False
+        self.checks = 0
+        self.hits = 0
+        self.total_ms = 0.0
+
+    def load(self, reload: bool = False):
+        """Read the templates from disk (once, unless reload=True)"""
+        with self._lock:
+            if self._loaded and not reload:
+                return
+            self._loaded = True
+            templates = []
+            for path in sorted(glob.glob(os.path.join(self.directory, "*.wav"))):
+                try:
+                    source = WavFileSource(path)
+                    templates.append(mfcc(source.samples, source.sample_rate, trim=True))
+                except (OSError, EOFError, ValueError, wave.Error) as e:
+                    logger.warning(f"Skipping wake word template {path}: {e}")
+            self._templates = [template for template in templates if len(template) >= 10]
+            self._threshold = self._calibrate()
+
+    def _calibrate(self) -> float:
+        if self.fixed_threshold is not None:
+            return self.fixed_threshold
+        if len(self._templates) < 2:
+            return DEFAULT_THRESHOLD
+        nearest = []
+        for i, template in enumerate(self._templates):
+            others = [subsequence_dtw(template, other)[0] for j, other in enumerate(self._templates) if j != i]
+            nearest.append(min(others))
+        nearest = [distance for distance in nearest if np.isfinite(distance)]
+        return self.margin * max(nearest) if nearest else DEFAULT_THRESHOLD
+
+    @property
+    def ready(self) -> bool:
+        self.load()
+        return bool(self._templates)
+
+    @property
+    def threshold(self) -> float:
+        self.load()
+        return self._threshold
+
+    def enroll(self, samples: np.ndarray, sample_rate: int) -> str:
+        """Keep one recording of the wake word as a template; returns its path"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"template-{int(time.time() * 1000)}.wav")
+        with wave.open(path, "wb") as audio:
+            audio.setnchannels(1)
+            audio.setsampwidth(SAMPLE_WIDTH)
+            audio.setframerate(sample_rate)
+            audio.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+        self.load(reload=True)
+        return path
+
+    def clear(self):
+        """Forget every template"""
+        for path in glob.glob(os.path.join(self.directory, "*.wav")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.load(reload=True)
+
+    def score(self, samples: np.ndarray, sample_rate: int) -> Tuple[float, int]:
+        """(distance of the closest template, sample where that match ends)"""
+        self.load()
+        with self._lock:
+            templates = list(self._templates)
+        head = samples[:int(self.search_seconds * sample_rate)]
+        features = mfcc(head, sample_rate)
+        best, end = float("inf"), 0
+        for template in templates:
+            distance, frame = subsequence_dtw(template, features)
+            if distance < best:
+                best, end = distance, frame
+        hop, window = sample_rate * HOP_MS // 1000, sample_rate * WINDOW_MS // 1000
+        return best, min(len(samples), end * hop + window)
+
+    def detect(self, samples: np.ndarray, sample_rate: int) -> Optional[WakeHit]:
+        started = time.perf_counter()
+        distance, end = self.score(samples, sample_rate)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        detected = distance <= self.threshold
+        with self._lock:
+            self.checks += 1
+            self.hits += detected
+            self.total_ms += elapsed_ms
+        return WakeHit(distance, end, elapsed_ms) if detected else None
+
+    def info(self) -> Dict[str, Any]:
+        self.load()
+        with self._lock:
+            return {
+                "templates": len(self._templates),
+                "threshold": round(self._threshold, 2),
+                "calibrated": self.fixed_threshold is None and len(self._templates) >= 2,
+                "checks": self.checks,
+                "hits": self.hits,
+                "avg_ms": round(self.total_ms / self.checks, 2) if self.checks else 0.0
+            }
+
+
+def _threshold_from_env() -> Optional[float]:
+    value = os.environ.get("NEUROTRAIN_WAKE_THRESHOLD")
+    return float(value) if value else None
+
+
+# Global instance used by the listening loops
+wake_detector = WakeWordDetector(threshold=_threshold_from_env())
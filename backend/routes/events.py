@@ -0,0 +1,52 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from modules.events import event_bus
+
+router = APIRouter()
+
+
+async def wait_for_disconnect(websocket: WebSocket):
+    """Consume client frames until the socket closes"""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+    except WebSocketDisconnect:
+        return
+
+
+@router.websocket("/events")
+async def events_feed(websocket: WebSocket, since: Optional[int] = None):
+    """
+    Push task and reminder changes to the client as they happen.
+
+    Connect with ?since=<version> to replay the changes missed while
+    disconnected. A "resync" event means the client must refetch
+    GET /tasks and GET /schedule.
+    """
+    await websocket.accept()
+    subscription, backlog = event_bus.subscribe(since)
+    disconnected = asyncio.create_task(wait_for_disconnect(websocket))
+
+    try:
+        await websocket.send_json({"type": "hello", "version": event_bus.version})
+        for event in backlog:
+            await websocket.send_json(event)
+
+        while True:
+            next_event = asyncio.create_task(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected},
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected in done:
+                next_event.cancel()
+                break
+            await websocket.send_json(next_event.result())
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        disconnected.cancel()
+        event_bus.unsubscribe(subscription)
@@ -1,10 +1,16 @@
-import json
 import os
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field, conint, field_validator
+from typing import List, Literal, Optional
+from modules.events import event_bus
+from modules.actions import action_registry
+from modules.schedule_store import ScheduleStore
+from modules.reminder_engine import reminder_engine
+from modules.reminder_time import parse_reminder_time, reminder_due_time
+from modules.recurrence import is_occurrence, occurrence_key
+from modules.schedule_index import ScheduleIndex
 
 router = APIRouter()
 
@@ -13,40 +19,83 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 STORAGE_DIR = os.path.join(BASE_DIR, "modules", "stored")
 SCHEDULE_FILE = os.path.join(STORAGE_DIR, "schedule.json")
 
+# Loaded once and kept in memory; re-read only when the file changes on disk
+schedule_store = ScheduleStore(SCHEDULE_FILE)
+schedule_index = ScheduleIndex()
+
 # Pydantic models for validation
+class Recurrence(BaseModel):
+    freq: Literal["daily", "weekly"]
+    interval: int = Field(1, ge=1)
+    weekdays: Optional[List[conint(ge=0, le=6)]] = None  # weekly only, 0 = Monday
+    until: Optional[str] = None
+    count: Optional[int] = Field(None, ge=1)
+
+    @field_validator("until")
+    @classmethod
+    def check_until(cls, value):
+        if value is not None:
+            datetime.fromisoformat(value)
+        return value
+
 class ReminderCreate(BaseModel):
     time: str
     message: str
+    recurrence: Optional[Recurrence] = None
 
 class ReminderUpdate(BaseModel):
     time: Optional[str] = None
     message: Optional[str] = None
+    recurrence: Optional[Recurrence] = None  # send null to make the reminder one-off again
+
+class OccurrenceOverride(BaseModel):
+    skip: bool = False
+    time: Optional[str] = None  # move this occurrence to another time
 
 def load_schedule():
-    """Load schedule from JSON file with error handling"""
-    if os.path.exists(SCHEDULE_FILE):
-        try:
-            with open(SCHEDULE_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
-    return []
+    """Return the cached schedule (do not mutate the returned list)"""
+    return schedule_store.load()
 
 def save_schedule(schedule_list):
-    """Save schedule to JSON file with error handling"""
+    """Atomically save the schedule with error handling"""
     try:
-        with open(SCHEDULE_FILE, 'w') as f:
-            json.dump(schedule_list, f, indent=2)
+        schedule_store.save(schedule_list)
         return True
     except Exception as e:
         print(f"Error saving schedule: {e}")
         return False
 
+def _parse_bound(value: Optional[str], name: str) -> Optional[float]:
+    """Parse a from/to query parameter into a timestamp"""
+    if value is None:
+        return None
+    timestamp = parse_reminder_time(value)
+    if timestamp is None:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}' time: {value}")
+    return timestamp
+
+def _find_reminder(schedule, reminder_id: str) -> int:
+    """Index of a reminder in the schedule, or 404"""
+    index = next((i for i, r in enumerate(schedule) if r["id"] == reminder_id), None)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Reminder not found")
+    return index
+
+def _replace_reminder(schedule, index: int, reminder) -> bool:
+    """Save a copy of the schedule with one reminder replaced and notify listeners"""
+    saved = save_schedule(schedule[:index] + [reminder] + schedule[index + 1:])
+    if saved:
+        event_bus.publish("schedule", "updated", reminder)
+        reminder_engine.schedule(reminder)
+    return saved
+
+def get_upcoming_reminders(limit: int = 5):
+    """Next reminders that are not yet due, earliest first"""
+    return schedule_index.upcoming(load_schedule(), limit=limit)
+
 @router.post("/schedule", response_model=dict)
 def add_reminder(reminder: ReminderCreate):
     """Add a new reminder to the schedule"""
-    schedule = load_schedule()
-    
     new_reminder = {
         "id": str(uuid.uuid4()),  # Use UUID for unique IDs
         "time": reminder.time,
@@ -54,10 +103,20 @@ def add_reminder(reminder: ReminderCreate):
         "created_at": datetime.now().isoformat(),
         "updated_at": None
     }
+    if reminder.recurrence is not None:
+        # The rule is stored once; occurrences are expanded on demand
+        new_reminder["recurrence"] = reminder.recurrence.model_dump(exclude_none=True)
+        new_reminder["exceptions"] = {}
+        if reminder_due_time(new_reminder) is None:
+            raise HTTPException(status_code=400, detail=f"Invalid time for a recurring reminder: {reminder.time}")
     
-    schedule.append(new_reminder)
+    with schedule_store.lock:
+        saved = save_schedule(load_schedule() + [new_reminder])
+        if saved:
+            event_bus.publish("schedule", "created", new_reminder)
+            reminder_engine.schedule(new_reminder)
     
-    if save_schedule(schedule):
+    if saved:
         return {
             "message": "Reminder added successfully",
             "reminder": new_reminder,
@@ -67,51 +126,164 @@ def add_reminder(reminder: ReminderCreate):
         raise HTTPException(status_code=500, detail="Failed to save reminder")
 
 @router.get("/schedule", response_model=dict)
-def get_schedule():
-    """Get all reminders from the schedule"""
+def get_schedule(
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+    limit: Optional[int] = Query(None, ge=0)
+):
+    """
+    Get reminders from the schedule.
+
+    Without parameters returns everything in stored order. With from/to/limit
+    returns reminders due in [from, to) sorted by due time.
+    """
     schedule = load_schedule()
+    if start is None and end is None and limit is None:
+        return {
+            "schedule": schedule,
+            "count": len(schedule),
+            "success": True
+        }
+    
+    reminders = schedule_index.query(
+        schedule,
+        start=_parse_bound(start, "from"),
+        end=_parse_bound(end, "to"),
+        limit=limit
+    )
+    return {
+        "schedule": reminders,
+        "count": len(reminders),
+        "success": True
+    }
+
+@router.get("/schedule/upcoming", response_model=dict)
+def get_upcoming(limit: int = Query(5, ge=1, le=100)):
+    """Get the next reminders that are not yet due"""
+    reminders = get_upcoming_reminders(limit)
     return {
-        "schedule": schedule,
-        "count": len(schedule),
+        "schedule": reminders,
+        "count": len(reminders),
         "success": True
     }
 
 @router.put("/schedule/{reminder_id}", response_model=dict)
 def update_reminder(reminder_id: str, updates: ReminderUpdate):
     """Update an existing reminder"""
-    schedule = load_schedule()
-    
-    for reminder in schedule:
-        if reminder["id"] == reminder_id:
-            if updates.time is not None:
-                reminder["time"] = updates.time
-            if updates.message is not None:
-                reminder["message"] = updates.message
-            reminder["updated_at"] = datetime.now().isoformat()
-            
-            if save_schedule(schedule):
-                return {
-                    "message": "Reminder updated successfully",
-                    "reminder": reminder,
-                    "success": True
-                }
+    with schedule_store.lock:
+        schedule = load_schedule()
+        index = _find_reminder(schedule, reminder_id)
+        
+        # Copy instead of editing in place so a failed save leaves the cache intact
+        reminder = dict(schedule[index])
+        if updates.time is not None:
+            reminder["time"] = updates.time
+        if updates.message is not None:
+            reminder["message"] = updates.message
+        if "recurrence" in updates.model_fields_set:
+            if updates.recurrence is None:
+                reminder.pop("recurrence", None)
             else:
-                raise HTTPException(status_code=500, detail="Failed to update reminder")
+                reminder["recurrence"] = updates.recurrence.model_dump(exclude_none=True)
+        if reminder.get("recurrence") and reminder_due_time(reminder) is None:
+            raise HTTPException(status_code=400, detail=f"Invalid time for a recurring reminder: {reminder['time']}")
+        if reminder.get("exceptions"):
+            # Drop overrides for occurrences the new rule no longer produces
+            reminder["exceptions"] = {
+                key: override for key, override in reminder["exceptions"].items()
+                if is_occurrence(reminder, key)
+            }
+        reminder["updated_at"] = datetime.now().isoformat()
+        
+        saved = _replace_reminder(schedule, index, reminder)
+    
+    if saved:
+        return {
+            "message": "Reminder updated successfully",
+            "reminder": reminder,
+            "success": True
+        }
+    else:
+        raise HTTPException(status_code=500, detail="Failed to update reminder")
+
+@router.put("/schedule/{reminder_id}/occurrences/{occurrence}", response_model=dict)
+def override_occurrence(reminder_id: str, occurrence: str, override: OccurrenceOverride):
+    """Skip or move a single occurrence of a reminder"""
+    if not override.skip and override.time is None:
+        raise HTTPException(status_code=400, detail="Set 'skip' or a new 'time'")
+    if override.time is not None and parse_reminder_time(override.time) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid time: {override.time}")
+    
+    with schedule_store.lock:
+        schedule = load_schedule()
+        index = _find_reminder(schedule, reminder_id)
+        reminder = dict(schedule[index])
+        if not is_occurrence(reminder, occurrence):
+            raise HTTPException(status_code=404, detail="Occurrence not found")
+        
+        # Exceptions are sparse: only overridden occurrences are stored
+        key = occurrence_key(datetime.fromisoformat(occurrence))
+        reminder["exceptions"] = dict(reminder.get("exceptions") or {})
+        reminder["exceptions"][key] = {"skip": True} if override.skip else {"time": override.time}
+        reminder["updated_at"] = datetime.now().isoformat()
+        
+        saved = _replace_reminder(schedule, index, reminder)
+    
+    if saved:
+        return {
+            "message": "Occurrence updated successfully",
+            "reminder": reminder,
+            "success": True
+        }
+    else:
+        raise HTTPException(status_code=500, detail="Failed to update occurrence")
+
+@router.delete("/schedule/{reminder_id}/occurrences/{occurrence}", response_model=dict)
+def restore_occurrence(reminder_id: str, occurrence: str):
+    """Remove a skip/move override so the occurrence follows the rule again"""
+    with schedule_store.lock:
+        schedule = load_schedule()
+        index = _find_reminder(schedule, reminder_id)
+        reminder = dict(schedule[index])
+        exceptions = dict(reminder.get("exceptions") or {})
+        try:
+            key = occurrence_key(datetime.fromisoformat(occurrence))
+        except ValueError:
+            key = occurrence
+        if exceptions.pop(key, None) is None:
+            raise HTTPException(status_code=404, detail="No override for this occurrence")
+        
+        reminder["exceptions"] = exceptions
+        reminder["updated_at"] = datetime.now().isoformat()
+        saved = _replace_reminder(schedule, index, reminder)
     
-    raise HTTPException(status_code=404, detail="Reminder not found")
+    if saved:
+        return {
+            "message": "Occurrence restored successfully",
+            "reminder": reminder,
+            "success": True
+        }
+    else:
+        raise HTTPException(status_code=500, detail="Failed to restore occurrence")
 
 @router.delete("/schedule/{reminder_id}", response_model=dict)
 def delete_reminder(reminder_id: str):
     """Delete a reminder from the schedule"""
-    schedule = load_schedule()
-    initial_count = len(schedule)
+    with schedule_store.lock:
+        schedule = load_schedule()
+        initial_count = len(schedule)
+        
+        schedule = [r for r in schedule if r["id"] != reminder_id]
+        
+        if len(schedule) == initial_count:
+            raise HTTPException(status_code=404, detail="Reminder not found")
+        
+        saved = save_schedule(schedule)
+        if saved:
+            event_bus.publish("schedule", "deleted", {"id": reminder_id})
+            reminder_engine.unschedule(reminder_id)
     
-    schedule = [r for r in schedule if r["id"] != reminder_id]
-    
-    if len(schedule) == initial_count:
-        raise HTTPException(status_code=404, detail="Reminder not found")
-    
-    if save_schedule(schedule):
+    if saved:
         return {
             "message": "Reminder deleted successfully",
             "id": reminder_id,
@@ -123,10 +295,21 @@ def delete_reminder(reminder_id: str):
 @router.delete("/schedule", response_model=dict)
 def clear_schedule():
     """Clear all reminders from the schedule"""
-    if save_schedule([]):
+    with schedule_store.lock:
+        saved = save_schedule([])
+        if saved:
+            event_bus.publish("schedule", "cleared")
+            reminder_engine.clear()
+    
+    if saved:
         return {
             "message": "All reminders cleared successfully",
             "success": True
         }
     else:
-        raise HTTPException(status_code=500, detail="Failed to clear schedule")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to clear schedule")
+
+
+# In-process handlers for the voice executors
+action_registry.register("schedule.add", lambda time, message: add_reminder(ReminderCreate(time=time, message=message)))
+action_registry.register("schedule.upcoming", lambda limit=5: get_upcoming(limit))
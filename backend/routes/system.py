@@ -1,56 +1,151 @@
-import psutil
-import subprocess
-import platform
-from fastapi import APIRouter
+import asyncio
+from typing import Literal, Optional
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
+from modules.metrics_sampler import metrics_sampler
+from modules.process_monitor import process_monitor
+from modules.metrics_rollup import metrics_rollup
+from modules.app_catalog import app_catalog
+from modules.app_launcher import app_resolver, app_launcher
+from modules.actions import action_registry
+from routes.events import wait_for_disconnect
 
 router = APIRouter()
 
 ## for json body approach
 class AppRequest(BaseModel):
     app_name:str
+    dedupe: bool = True   # focus a running instance instead of starting another
 
 @router.get("/stats")
 def get_system_stats():
+    """Latest snapshot from the background sampler"""
+    return metrics_sampler.latest()
+
+
+@router.get("/stats/history")
+def get_system_stats_history(window: Optional[float] = Query(None, gt=0)):
+    """Buffered snapshots from the last `window` seconds (everything buffered if omitted)"""
+    samples = metrics_sampler.get_history(window)
+    return {
+        "window": window,
+        "interval": metrics_sampler.interval,
+        "samples": samples,
+        "count": len(samples)
+    }
+
+
+@router.get("/stats/rollup")
+def get_system_stats_rollup(
+    window: float = Query(3600, gt=0),
+    points: int = Query(300, ge=1, le=5000),
+    step: Optional[float] = Query(None, gt=0)
+):
+    """
+    Long-term min/max/avg history for the last `window` seconds.
+
+    Served from the coarsest stored resolution (1s, 1m or 1h) whose buckets
+    are no larger than `step` (default window / points) and whose retention
+    covers the window. Neighbouring buckets are merged if there would still
+    be more than `points` samples; `step` in the reply is their width.
+    """
+    return metrics_rollup.query(window, points=points, step=step)
+
+
+@router.get("/processes")
+def get_top_processes(top: int = Query(10, ge=1, le=100), sort: Literal["cpu", "mem"] = "cpu"):
+    """The processes using the most CPU or memory"""
+    processes = process_monitor.top(top, sort)
     return {
-        "cpu_percent": psutil.cpu_percent(),
-        "memory_percent": psutil.virtual_memory().percent,
-        "memory_used": psutil.virtual_memory().used,
-        "memory_total": psutil.virtual_memory().total,
-        "disk_usage": psutil.disk_usage('/').percent
+        "processes": processes,
+        "sort": sort,
+        "count": len(processes)
     }
 
 
+@router.websocket("/stream")
+async def stream_system_stats(websocket: WebSocket, interval: float = 0.0, fields: Optional[str] = None):
+    """
+    Push each sampler tick to the client.
+
+    ?interval=<seconds> limits how often frames are sent and
+    ?fields=cpu_percent,memory_percent selects what each frame contains.
+    Frames a slow client can't keep up with are dropped, not buffered.
+    """
+    await websocket.accept()
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    subscription = metrics_sampler.subscribe(min_interval=max(interval, 0.0), fields=selected)
+    disconnected = asyncio.create_task(wait_for_disconnect(websocket))
+
+    try:
+        while True:
+            next_frame = asyncio.create_task(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {next_frame, disconnected},
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected in done:
+                next_frame.cancel()
+                break
+            # Copy: without field selection the frame is the shared history snapshot
+            frame = dict(next_frame.result(), dropped=subscription.dropped)
+            await websocket.send_json(frame)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        disconnected.cancel()
+        metrics_sampler.unsubscribe(subscription)
+
+
+@router.get("/apps")
+def list_available_apps():
+    """Which supported apps are installed, and the executable each one runs"""
+    available = app_resolver.available()
+    return {
+        "available": available,
+        "unavailable": [name for name in app_resolver.app_commands if name not in available]
+    }
+
+
+@router.get("/apps/resolve")
+def resolve_app_name(name: str = Query(..., min_length=1)):
+    """Catalog app a spoken name refers to ("fire fox" -> firefox), with its similarity score"""
+    resolved = app_catalog.resolve(name)
+    if resolved is None:
+        return {"query": name, "app_name": None, "score": 0.0}
+    app_name, score = resolved
+    return {"query": name, "app_name": app_name, "score": score,
+            "installed": app_resolver.resolve(app_name) is not None}
+
+
+@router.get("/apps/launched")
+def list_launched_apps():
+    """Apps started through /open, with PID, start time and exit status"""
+    launches = app_launcher.records()
+    return {"launches": launches, "count": len(launches)}
+
+
 @router.post("/open")
 def open_application(app_request: AppRequest):
     app_name = app_request.app_name.lower()
-    app_commands = {
-        "chrome": ["google-chrome", "chrome", "google-chrome-stable"],
-        "firefox": ["firefox"],
-        "notepad": ["notepad.exe", "gedit", "textedit"],
-        "calculator": ["calc.exe", "gnome-calculator"],
-        "vscode": ["code", "visual-studio-code"],
-        "terminal": ["cmd.exe", "gnome-terminal", "terminal"],
-        "explorer": ["explorer.exe", "nautilus", "dolphin"],
-        "browser": ["chrome.exe", "google-chrome", "firefox"] 
-    }
-    
-    if app_name not in app_commands:
-        return {"error": f"Application '{app_name}' not supported. Available: {list(app_commands.keys())}"}
     
-    system = platform.system().lower()
-    command = app_commands[app_name]
+    if not app_resolver.is_supported(app_name):
+        return {"error": f"Application '{app_name}' not supported. Available: {list(app_resolver.app_commands.keys())}"}
     
     try:
-        if system == "windows":
-            subprocess.Popen(command[0], shell=True)
-        else:
-            for cmd in command:
-                try:
-                    subprocess.Popen(cmd)
-                    break
-                except:
-                    continue
-        return {"message": f"Opening {app_name}", "success": True}
+        # Resolved once against PATH, so an uninstalled app costs no failed spawns
+        result = app_launcher.launch(app_name, dedupe=app_request.dedupe)
     except Exception as e:
         return {"error": str(e), "success": False}
+    
+    if result["status"] == "not_installed":
+        return {"error": f"Application '{app_name}' is not installed", "success": False}
+    if result["status"] == "already_running":
+        return {"message": f"{app_name} is already running", **result}
+    return {"message": f"Opening {app_name}", **result}
+
+
+# In-process handlers for the voice executors
+action_registry.register("system.stats", get_system_stats)
+action_registry.register("system.processes", lambda top=10, sort="cpu": get_top_processes(top, sort))
+action_registry.register("system.open", lambda app_name, dedupe=True: open_application(AppRequest(app_name=app_name, dedupe=dedupe)))
@@ -4,6 +4,8 @@ import uuid
 from datetime import datetime
 from fastapi import APIRouter, HTTPException
 from modules.task import TaskCreate, TaskUpdate, TaskResponse
+from modules.events import event_bus
+from modules.actions import action_registry
 
 router = APIRouter()
 
@@ -45,6 +47,7 @@ def add_task(task: TaskCreate):
     }
     tasks.append(new_task)
     save_tasks(tasks)
+    event_bus.publish("tasks", "created", new_task)
     return new_task
 
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
@@ -57,6 +60,7 @@ def update_task(task_id: str, updated_task: TaskUpdate):
                 task["completed"] = updated_task.completed
             task["updated_at"] = datetime.now().isoformat()
             save_tasks(tasks)
+            event_bus.publish("tasks", "updated", task)
             return task
     raise HTTPException(status_code=404, detail="Task not found")
 
@@ -70,4 +74,10 @@ def delete_task(task_id: str):
         raise HTTPException(status_code=404, detail="Task not found")
     
     save_tasks(tasks)
-    return {"message": "Task deleted", "id": task_id}
\ No newline at end of file
+    event_bus.publish("tasks", "deleted", {"id": task_id})
+    return {"message": "Task deleted", "id": task_id}
+
+
+# In-process handlers for the voice executors
+action_registry.register("tasks.add", lambda title: add_task(TaskCreate(title=title)))
+action_registry.register("tasks.list", get_tasks)
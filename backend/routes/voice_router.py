@@ -1,13 +1,20 @@
 # backend/modules/voice_router.py
-import re
-import requests
-from fastapi import APIRouter, HTTPException
-from modules.voice import VoiceCommandRequest, ParsedCommandResponse, CommandExecutionResponse
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from modules.voice import VoiceCommandRequest, VoiceBatchRequest, ParsedCommandResponse, CommandExecutionResponse, \
+    FAILURE_PREFIXES
+from modules.app_launcher import app_resolver
+from modules.grammar import grammar_engine
+from modules.actions import action_registry, ActionError, ActionTimeout
+from modules.command_dedup import command_dedup
+from modules.reminder_time import MISSING_TIME_REPLY, spoken_reminder
 
 router = APIRouter()
 
-# Your backend base URL - FIXED: Use consistent URL format
-BACKEND_BASE = "http://127.0.0.1:8000/api"
+# Utterances parsed (and streamed back) per batch step
+BATCH_CHUNK_SIZE = 500
 
 # Add debug logging
 import logging,time
@@ -28,160 +35,37 @@ def parse_voice_command(text: str) -> ParsedCommandResponse:
             confidence=0.0
         )
     
-    text_lower = text.lower().strip()
-    parameters = {"original_text": text}
-    
-    # Task commands - high confidence patterns
-    task_patterns = [
-        (r'(add|create|new).*task.*to (.+)', "add_task"),
-        (r'(add|create|new).*task.*called (.+)', "add_task"),
-        (r'(add|create|new).*task.*to do (.+)', "add_task"),
-        (r'(add|create|new).*remind me to (.+)', "add_task"),
-        (r'delete.*task.*', "delete_task"),
-        (r'remove.*task.*', "delete_task"),
-        (r'clear.*task.*', "delete_task"),
-        (r'show.*task.*', "get_tasks"),
-        (r'list.*task.*', "get_tasks"),
-        (r'what.*task.*', "get_tasks"),
-    ]
-    
-    for pattern, action in task_patterns:
-        match = re.search(pattern, text_lower)
-        if match:
-            if action == "add_task" and match.lastindex >= 2:
-                parameters["title"] = match.group(2).strip()
-            return ParsedCommandResponse(
-                intent="task",
-                action=action,
-                parameters=parameters,
-                original_text=text,
-                confidence=0.9
-            )
-    
-    # System commands
-    system_patterns = [
-    # System monitoring patterns
-    (r'.*(cpu|processor).*(usage|load|percent).*', "system_stats"),
-    (r'.*(memory|ram).*(usage|percent).*', "system_stats"),
-    (r'.*(disk|storage).*(usage|percent).*', "system_stats"),
-    (r'.*(system|computer).*(status|stats).*', "system_stats"),
-    
-    # Web browsers
-    (r'(open|launch|start).*(chrome|browser).*', "open_app"),
-    (r'(open|launch|start).*(firefox).*', "open_app"),
-    (r'(open|launch|start).*(edge|microsoft edge).*', "open_app"),
-    (r'(open|launch|start).*(safari).*', "open_app"),
-    (r'(open|launch|start).*(opera).*', "open_app"),
-    (r'(open|launch|start).*(brave).*', "open_app"),
-    
-    # Office and productivity
-    (r'(open|launch|start).*(notepad|text editor).*', "open_app"),
-    (r'(open|launch|start).*(word|microsoft word).*', "open_app"),
-    (r'(open|launch|start).*(excel|microsoft excel).*', "open_app"),
-    (r'(open|launch|start).*(powerpoint|microsoft powerpoint).*', "open_app"),
-    (r'(open|launch|start).*(outlook).*', "open_app"),
-    (r'(open|launch|start).*(calendar).*', "open_app"),
-    (r'(open|launch|start).*(notes|stickies).*', "open_app"),
-    
-    # Development tools
-    (r'(open|launch|start).*(vscode|code|visual studio).*', "open_app"),
-    (r'(open|launch|start).*(pycharm).*', "open_app"),
-    (r'(open|launch|start).*(intellij|idea).*', "open_app"),
-    (r'(open|launch|start).*(eclipse).*', "open_app"),
-    (r'(open|launch|start).*(sublime|sublime text).*', "open_app"),
-    (r'(open|launch|start).*(atom).*', "open_app"),
-    (r'(open|launch|start).*(terminal|command prompt|cmd).*', "open_app"),
-    (r'(open|launch|start).*(powershell).*', "open_app"),
-    
-    # Media and entertainment
-    (r'(open|launch|start).*(calculator).*', "open_app"),
-    (r'(open|launch|start).*(spotify).*', "open_app"),
-    (r'(open|launch|start).*(vlc|media player).*', "open_app"),
-    (r'(open|launch|start).*(windows media player).*', "open_app"),
-    (r'(open|launch|start).*(itunes).*', "open_app"),
-    (r'(open|launch|start).*(netflix).*', "open_app"),
-    (r'(open|launch|start).*(youtube).*', "open_app"),
-    
-    # Communication apps
-    (r'(open|launch|start).*(slack).*', "open_app"),
-    (r'(open|launch|start).*(discord).*', "open_app"),
-    (r'(open|launch|start).*(teams|microsoft teams).*', "open_app"),
-    (r'(open|launch|start).*(zoom).*', "open_app"),
-    (r'(open|launch|start).*(skype).*', "open_app"),
-    (r'(open|launch|start).*(whatsapp).*', "open_app"),
-    
-    # Graphics and design
-    (r'(open|launch|start).*(photoshop).*', "open_app"),
-    (r'(open|launch|start).*(illustrator).*', "open_app"),
-    (r'(open|launch|start).*(paint).*', "open_app"),
-    (r'(open|launch|start).*(gimp).*', "open_app"),
-    (r'(open|launch|start).*(inkscape).*', "open_app"),
-    
-    # File management
-    (r'(open|launch|start).*(file explorer|explorer|files).*', "open_app"),
-    (r'(open|launch|start).*(finder).*', "open_app"),
-    
-    # System utilities
-    (r'(open|launch|start).*(task manager).*', "open_app"),
-    (r'(open|launch|start).*(control panel).*', "open_app"),
-    (r'(open|launch|start).*(settings).*', "open_app"),
-    
-    # Games
-    (r'(open|launch|start).*(steam).*', "open_app"),
-    (r'(open|launch|start).*(epic games).*', "open_app"),
-    (r'(open|launch|start).*(minecraft).*', "open_app"),
-]
-    
-    for pattern, action in system_patterns:
-        if re.search(pattern, text_lower):
-            # Extract app name for open commands
-            if action == "open_app":
-                app_match = re.search(r'(open|launch|start).*(chrome|firefox|notepad|calculator|vscode|browser)', text_lower)
-                if app_match and app_match.lastindex >= 2:
-                    parameters["app_name"] = app_match.group(2)
-            
-            return ParsedCommandResponse(
-                intent="system",
-                action=action,
-                parameters=parameters,
-                original_text=text,
-                confidence=0.85
-            )
-    
-    # Schedule commands
-    schedule_patterns = [
-        (r'(set|add|create).*(reminder|alarm).*to (.+)', "add_reminder"),
-        (r'(set|add|create).*(reminder|alarm).*for (.+)', "add_reminder"),
-        (r'remind me to (.+)', "add_reminder"),
-        (r'show.*(reminder|alarm).*', "get_schedule"),
-        (r'list.*(reminder|alarm).*', "get_schedule"),
+    return _parsed_response(text, grammar_engine.parse(text))
+
+def parse_voice_commands(texts: List[str]) -> List[ParsedCommandResponse]:
+    """
+    parse_voice_command() for many utterances in one grammar pass
+    """
+    results = grammar_engine.parse_batch(texts)
+    return [
+        _parsed_response(text, result) if text and len(text.strip()) >= 2 else parse_voice_command(text)
+        for text, result in zip(texts, results)
     ]
-    
-    for pattern, action in schedule_patterns:
-        match = re.search(pattern, text_lower)
-        if match:
-            if action == "add_reminder" and match.lastindex >= 3:
-                parameters["message"] = match.group(3).strip()
-            return ParsedCommandResponse(
-                intent="schedule",
-                action=action,
-                parameters=parameters,
-                original_text=text,
-                confidence=0.8
-            )
-    
-    # Default to chat
+
+def _parsed_response(text: str, result) -> ParsedCommandResponse:
+    parameters = {"original_text": text}
+    parameters.update(result.slots)
+
+    # Lets the executor refuse uninstalled apps without spawning anything
+    if result.action == "open_app" and "app_name" in parameters:
+        parameters["app_available"] = app_resolver.resolve(parameters["app_name"]) is not None
+
     return ParsedCommandResponse(
-        intent="chat",
-        action="process_chat",
+        intent=result.intent,
+        action=result.action,
         parameters=parameters,
         original_text=text,
-        confidence=0.7
+        confidence=result.confidence
     )
 
 async def execute_command(parsed_command: ParsedCommandResponse) -> CommandExecutionResponse:
     """
-    Execute the parsed command by calling appropriate endpoints
+    Execute the parsed command through the action registry (in-process unless configured for HTTP)
     """
     logger.debug(f"Executing command: {parsed_command.intent}.{parsed_command.action}")
     logger.debug(f"Parameters: {parsed_command.parameters}")
@@ -194,21 +78,17 @@ async def execute_command(parsed_command: ParsedCommandResponse) -> CommandExecu
         
         if intent == "task":
             if action == "add_task" and "title" in params:
-                logger.debug(f"Calling {BACKEND_BASE}/tasks with title: {params['title']}")
+                logger.debug(f"Dispatching tasks.add with title: {params['title']}")
                 task_start = time.time()
-                response = requests.post(
-                    f"{BACKEND_BASE}/tasks",
-                    json={"title": params["title"]},
-                    timeout=10
-                )
+                response = await action_registry.call("tasks.add", title=params["title"])
                 task_time = time.time() - task_start
-                logger.debug(f"Tasks call completed in {task_time:.2f}s - Status: {response.status_code}")
+                logger.debug(f"tasks.add completed in {task_time:.2f}s - Status: {response.status_code}")
                 
-                if response.status_code == 200:
+                if response.ok:
                     return CommandExecutionResponse(
                         success=True,
                         message="Task added successfully",
-                        data=response.json(),
+                        data=response.data,
                         tts_response=f"Task '{params['title']}' added successfully"
                     )
                 else:
@@ -219,14 +99,14 @@ async def execute_command(parsed_command: ParsedCommandResponse) -> CommandExecu
                     )
             
             elif action == "get_tasks":
-                logger.debug(f"Calling {BACKEND_BASE}/tasks")
+                logger.debug("Dispatching tasks.list")
                 task_start = time.time()
-                response = requests.get(f"{BACKEND_BASE}/tasks", timeout=10)
+                response = await action_registry.call("tasks.list")
                 task_time = time.time() - task_start
-                logger.debug(f"Get tasks call completed in {task_time:.2f}s - Status: {response.status_code}")
+                logger.debug(f"tasks.list completed in {task_time:.2f}s - Status: {response.status_code}")
                 
-                if response.status_code == 200:
-                    tasks = response.json().get("tasks", [])
+                if response.ok:
+                    tasks = response.data.get("tasks", [])
                     return CommandExecutionResponse(
                         success=True,
                         message=f"Found {len(tasks)} tasks",
@@ -239,30 +119,39 @@ async def execute_command(parsed_command: ParsedCommandResponse) -> CommandExecu
                         message="Failed to get tasks",
                         tts_response="Sorry, I couldn't retrieve your tasks"
                     )
-            
-            elif action == "get_tasks":
-                response = requests.get(f"{BACKEND_BASE}/tasks")
-                if response.status_code == 200:
-                    tasks = response.json().get("tasks", [])
+
+        
+        elif intent == "system":
+            if action == "system_stats" and params.get("view") == "processes":
+                sort = params.get("sort", "cpu")
+                logger.debug("Dispatching system.processes")
+                response = await action_registry.call("system.processes", top=3, sort=sort)
+                if response.ok:
+                    processes = response.data.get("processes", [])
+                    if sort == "mem":
+                        listing = ", ".join(f"{p['name']} at {p['memory_percent']} percent" for p in processes)
+                        tts = f"Top processes by memory: {listing}"
+                    else:
+                        listing = ", ".join(f"{p['name']} at {p['cpu_percent']} percent" for p in processes)
+                        tts = f"Top processes by CPU: {listing}"
                     return CommandExecutionResponse(
                         success=True,
-                        message=f"Found {len(tasks)} tasks",
-                        data={"tasks": tasks},
-                        tts_response=f"You have {len(tasks)} tasks in your list"
+                        message="Top processes retrieved",
+                        data={"processes": processes},
+                        tts_response=tts
                     )
                 else:
                     return CommandExecutionResponse(
                         success=False,
-                        message="Failed to get tasks",
-                        tts_response="Sorry, I couldn't retrieve your tasks"
+                        message="Failed to get processes",
+                        tts_response="Sorry, I couldn't retrieve the process list"
                     )
-        
-        elif intent == "system":
-            if action == "system_stats":
-                logger.debug(f"Calling {BACKEND_BASE}/system/stats")
-                response = requests.get(f"{BACKEND_BASE}/system/stats", timeout=5)
-                if response.status_code == 200:
-                    stats = response.json()
+            
+            elif action == "system_stats":
+                logger.debug("Dispatching system.stats")
+                response = await action_registry.call("system.stats")
+                if response.ok:
+                    stats = response.data
                     return CommandExecutionResponse(
                         success=True,
                         message="System stats retrieved",
@@ -276,18 +165,28 @@ async def execute_command(parsed_command: ParsedCommandResponse) -> CommandExecu
                         tts_response="Sorry, I couldn't retrieve system information"
                     )
             
-            elif action == "open_app" and "app_name" in params:
-                logger.debug(f"Calling {BACKEND_BASE}/system/open")
-                response = requests.post(
-                    f"{BACKEND_BASE}/system/open",
-                    json={"app_name": params["app_name"]},
-                    timeout=5
+            elif action == "open_app" and params.get("app_available") is False:
+                return CommandExecutionResponse(
+                    success=False,
+                    message=f"{params['app_name']} is not installed",
+                    tts_response=f"Sorry, {params['app_name']} isn't installed on this computer"
                 )
-                if response.status_code == 200:
+            
+            elif action == "open_app" and "app_name" in params:
+                logger.debug("Dispatching system.open")
+                response = await action_registry.call("system.open", app_name=params["app_name"])
+                if response.ok and response.data.get("status") == "already_running":
+                    return CommandExecutionResponse(
+                        success=True,
+                        message=f"{params['app_name']} is already running",
+                        data=response.data,
+                        tts_response=f"{params['app_name']} is already open"
+                    )
+                elif response.ok:
                     return CommandExecutionResponse(
                         success=True,
                         message=f"Opening {params['app_name']}",
-                        data=response.json(),
+                        data=response.data,
                         tts_response=f"Opening {params['app_name']}"
                     )
                 else:
@@ -298,24 +197,22 @@ async def execute_command(parsed_command: ParsedCommandResponse) -> CommandExecu
                     )
         
         elif intent == "schedule":
-            if action == "add_reminder" and "message" in params:
-                logger.debug(f"Calling {BACKEND_BASE}/schedule")
-                # For now, use a default time - you can enhance this later
-                reminder_data = {
-                    "time": "2024-01-15 12:00:00",  # Default time
-                    "message": params["message"]
-                }
-                response = requests.post(
-                    f"{BACKEND_BASE}/schedule",
-                    json=reminder_data,
-                    timeout=5
-                )
-                if response.status_code == 200:
+            if action == "add_reminder":
+                reminder = spoken_reminder(params)
+                if reminder is None:
+                    return CommandExecutionResponse(
+                        success=False,
+                        message="Reminder has no time",
+                        tts_response=MISSING_TIME_REPLY
+                    )
+                logger.debug(f"Dispatching schedule.add for {reminder['time']}")
+                response = await action_registry.call("schedule.add", **reminder)
+                if response.ok:
                     return CommandExecutionResponse(
                         success=True,
                         message="Reminder added",
-                        data=response.json(),
-                        tts_response=f"Reminder set for {params['message']}"
+                        data=response.data,
+                        tts_response=f"Reminder set for {reminder['time']}: {reminder['message']}"
                     )
                 else:
                     return CommandExecutionResponse(
@@ -323,23 +220,42 @@ async def execute_command(parsed_command: ParsedCommandResponse) -> CommandExecu
                         message="Failed to add reminder",
                         tts_response="Sorry, I couldn't set the reminder"
                     )
+            
+            elif action == "get_schedule":
+                logger.debug("Dispatching schedule.upcoming")
+                response = await action_registry.call("schedule.upcoming", limit=5)
+                if response.ok:
+                    reminders = response.data.get("schedule", [])
+                    if reminders:
+                        upcoming = ", ".join(f"{r['message']} at {r['time']}" for r in reminders)
+                        tts = f"Your next reminders are: {upcoming}"
+                    else:
+                        tts = "You have no upcoming reminders"
+                    return CommandExecutionResponse(
+                        success=True,
+                        message=f"Found {len(reminders)} upcoming reminders",
+                        data={"schedule": reminders},
+                        tts_response=tts
+                    )
+                else:
+                    return CommandExecutionResponse(
+                        success=False,
+                        message="Failed to get schedule",
+                        tts_response="Sorry, I couldn't retrieve your reminders"
+                    )
         
-        # Default: send to chat endpoint
-        logger.debug("Calling default chat endpoint")
+        # Default: hand the utterance to chat
+        logger.debug("Dispatching chat")
         chat_start = time.time()
-        response = requests.post(
-            "http://127.0.0.1:8000/chat",
-            json={"user_input": parsed_command.original_text},
-            timeout=10
-        )
+        response = await action_registry.call("chat", text=parsed_command.original_text)
         chat_time = time.time() - chat_start
-        logger.debug(f"Chat call completed in {chat_time:.2f}s - Status: {response.status_code}")
-        if response.status_code == 200:
-            chat_response = response.json().get("response", "I didn't understand that")
+        logger.debug(f"chat completed in {chat_time:.2f}s - Status: {response.status_code}")
+        if response.ok:
+            chat_response = response.data.get("reply", "I didn't understand that")
             return CommandExecutionResponse(
                 success=True,
                 message="Chat response",
-                data=response.json(),
+                data=response.data,
                 tts_response=chat_response
             )
         else:
@@ -349,14 +265,14 @@ async def execute_command(parsed_command: ParsedCommandResponse) -> CommandExecu
                 tts_response="I'm having trouble connecting to the chat service"
             )
              
-    except requests.exceptions.Timeout:
+    except ActionTimeout:
         logger.error("Request timed out")
         return CommandExecutionResponse(
             success=False,
             message="Request timeout - backend service not responding",
             tts_response="Sorry, the service is taking too long to respond"
         )
-    except requests.RequestException as e:
+    except ActionError as e:
         logger.error(f"Network error: {e}")
         return CommandExecutionResponse(
             success=False,
@@ -382,26 +298,71 @@ async def parse_command(request: VoiceCommandRequest):
     parsed_command = parse_voice_command(request.text)
     return parsed_command
 
+@router.post("/parse-batch")
+async def parse_command_batch(request: VoiceBatchRequest):
+    """
+    Parse many voice commands at once, streamed back as NDJSON (one
+    ParsedCommandResponse per line, tagged with its index in `texts`)
+    """
+    texts = request.texts
+
+    def lines():
+        for start in range(0, len(texts), BATCH_CHUNK_SIZE):
+            parsed = parse_voice_commands(texts[start:start + BATCH_CHUNK_SIZE])
+            yield "".join(
+                json.dumps({"index": start + offset, **command.model_dump()}) + "\n"
+                for offset, command in enumerate(parsed)
+            )
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+async def execute_once(request: VoiceCommandRequest, parsed_command: ParsedCommandResponse, response: Response,
+                       idempotency_key: Optional[str] = None) -> CommandExecutionResponse:
+    """
+    execute_command, unless the same command (or idempotency key) was just
+    executed for this session, here or by the listening loop: then the
+    first result is returned again
+    """
+    def reshape(origin, result):
+        # Executed by the listening loop: (command, spoken response)
+        _, spoken = result
+        success = not spoken.startswith(FAILURE_PREFIXES)
+        return CommandExecutionResponse(success=success, message=spoken, tts_response=spoken)
+
+    result, duplicate = await command_dedup.run_async(
+        "voice_api", request.session_id, request.text,
+        lambda: execute_command(parsed_command),
+        client_key=idempotency_key or request.idempotency_key,
+        keep=lambda result: result.success,
+        reshape=reshape
+    )
+    if duplicate:
+        logger.debug(f"Duplicate command, replaying result: {request.text}")
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
 @router.post("/execute", response_model=CommandExecutionResponse)
-async def execute_voice_command(request: VoiceCommandRequest):
+async def execute_voice_command(request: VoiceCommandRequest, response: Response,
+                                idempotency_key: Optional[str] = Header(None)):
     """
     Parse and execute a voice command in one step
     """
     # Parse the command
     parsed_command = parse_voice_command(request.text)
     
-    # Execute the command
-    result = await execute_command(parsed_command)
+    # Execute the command (once per repeat window)
+    result = await execute_once(request, parsed_command, response, idempotency_key)
     
     return result
 
 @router.post("/full-process", response_model=dict)
-async def full_voice_process(request: VoiceCommandRequest):
+async def full_voice_process(request: VoiceCommandRequest, response: Response,
+                             idempotency_key: Optional[str] = Header(None)):
     """
     Complete voice processing: parse + execute + return all details
     """
     parsed_command = parse_voice_command(request.text)
-    execution_result = await execute_command(parsed_command)
+    execution_result = await execute_once(request, parsed_command, response, idempotency_key)
     
     return {
         "original_text": request.text,
@@ -410,6 +371,26 @@ async def full_voice_process(request: VoiceCommandRequest):
         "session_id": request.session_id
     }
 
+@router.get("/grammar")
+async def grammar_status():
+    """
+    Which command grammar is loaded
+    """
+    return grammar_engine.status()
+
+@router.post("/grammar/reload")
+async def reload_grammar():
+    """
+    Recompile the command grammar from disk now
+    """
+    try:
+        grammar_engine.reload(force=True)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid grammar: {e}")
+    if grammar_engine.last_error:
+        raise HTTPException(status_code=400, detail=f"Invalid grammar: {grammar_engine.last_error}")
+    return grammar_engine.status()
+
 # Add this to your voice_router.py
 @router.get("/test")
 async def test_endpoint():
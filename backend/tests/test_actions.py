@@ -0,0 +1,30 @@
+# backend/tests/test_actions.py
+import asyncio
+import warnings
+
+from modules.actions import ActionRegistry
+
+
+async def echo(value):
+    return {"value": value}
+
+
+def test_call_sync_runs_async_handlers():
+    registry = ActionRegistry()
+    registry.register("echo", echo)
+    response = registry.call_sync("echo", value=3)
+    assert response.ok and response.data == {"value": 3}
+
+
+def test_call_sync_inside_a_running_loop_fails_cleanly():
+    registry = ActionRegistry()
+    registry.register("echo", echo)
+
+    async def misuse():
+        return registry.call_sync("echo", value=3)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # "coroutine ... was never awaited" would be raised here
+        response = asyncio.run(misuse())
+    assert response.status_code == 500
+    assert "use call()" in response.data["detail"]
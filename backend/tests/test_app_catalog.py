@@ -0,0 +1,39 @@
+# backend/tests/test_app_catalog.py
+import pytest
+
+from modules.app_catalog import app_catalog
+from modules.grammar import GRAMMAR_PATH, GrammarEngine
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return GrammarEngine(path=GRAMMAR_PATH, classifier=None)
+
+
+@pytest.mark.parametrize("text", [
+    "how do i open a file in python",
+    "run some code",
+    "start writing some code",
+    "open a new tab in chrome",
+])
+def test_app_name_not_right_after_the_verb_is_chat(engine, text):
+    assert engine.parse(text).action == "process_chat"
+
+
+@pytest.mark.parametrize("text, app", [
+    ("could you open up fire fox for me", "firefox"),
+    ("open visual studio code please", "vscode"),
+    ("open chrome browser", "chrome"),
+    ("launch calculater please", "calculator"),
+    ("run discord", "discord"),
+])
+def test_app_named_after_the_verb_is_opened(engine, text, app):
+    result = engine.parse(text)
+    assert (result.action, result.slots["app_name"]) == ("open_app", app)
+
+
+def test_misheard_name_only_counts_on_its_own():
+    assert app_catalog.resolve("open spotifi") == ("spotify", 0.714)
+    assert app_catalog.resolve("open file") == ("explorer", 0.667)
+    assert app_catalog.resolve("open file in python") is None
+    assert app_catalog.resolve("note pad") == ("notepad", 1.0)
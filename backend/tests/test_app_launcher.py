@@ -0,0 +1,91 @@
+# backend/tests/test_app_launcher.py
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from modules.app_launcher import AppLauncher, AppResolver
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses POSIX shell scripts and sessions")
+
+
+@pytest.fixture
+def bin_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
+    return tmp_path
+
+
+def script(bin_dir, name, body):
+    path = bin_dir / name
+    path.write_text("#!/bin/sh\n" + body + "\n")
+    path.chmod(0o755)
+    return path
+
+
+@pytest.fixture
+def sessions():
+    """Session leaders to kill (with everything they started) after the test"""
+    started = []
+    yield started
+    for pid in started:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_launch_does_not_wait_for_the_startup_check(bin_dir, sessions):
+    script(bin_dir, "slowapp", "sleep 30")
+    launcher = AppLauncher(AppResolver({"slowapp": ["slowapp"]}), startup_check=5.0)
+    started = time.monotonic()
+    result = launcher.launch("slowapp")
+    sessions.append(result["pid"])
+    assert result["status"] == "launched"
+    assert time.monotonic() - started < 1.0
+
+
+def test_app_dying_right_away_is_recorded_as_failed(bin_dir):
+    script(bin_dir, "brokenapp", "exit 3")
+    launcher = AppLauncher(AppResolver({"brokenapp": ["brokenapp"]}), startup_check=5.0)
+    assert launcher.launch("brokenapp")["status"] == "launched"
+    wait_for(lambda: launcher.records()[0]["status"] != "running")
+    assert launcher.records()[0]["status"] == "failed"
+    assert launcher.records()[0]["returncode"] == 3
+
+
+def test_app_left_behind_by_a_launcher_script_is_not_started_twice(bin_dir, sessions):
+    # The script starts the real app (named differently) in the background and exits
+    script(bin_dir, "wrapped-app", "sleep 30 &\nexit 0")
+    launcher = AppLauncher(AppResolver({"wrapped": ["wrapped-app"]}))
+    first = launcher.launch("wrapped")
+    sessions.append(first["pid"])
+    wait_for(lambda: launcher.records()[0]["status"] == "exited")
+
+    again = launcher.launch("wrapped")
+    assert again["status"] == "already_running"
+    assert os.getsid(again["pid"]) == first["pid"]
+    assert len(launcher.records()) == 1
+
+
+def test_script_started_elsewhere_is_found_by_its_path(bin_dir, sessions):
+    path = script(bin_dir, "elsewhere-app", "sleep 30")
+    # Run through its interpreter, so the process is called "sh"
+    other = subprocess.Popen(["/bin/sh", str(path)], start_new_session=True)
+    sessions.append(other.pid)
+    wait_for(lambda: psutil.Process(other.pid).cmdline()[1:2] == [str(path)])
+
+    launcher = AppLauncher(AppResolver({"elsewhere": ["elsewhere-app"]}))
+    result = launcher.launch("elsewhere")
+    assert result["status"] == "already_running"
+    assert result["pid"] == other.pid
@@ -0,0 +1,101 @@
+# backend/tests/test_audio_capture.py
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from modules.audio_capture import SAMPLE_RATE, ArraySource, AudioCapture, AudioRing
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+def noise(rng, seconds, level):
+    return rng.normal(0, level, int(seconds * SAMPLE_RATE))
+
+
+def voicing(rng, seconds, level=3000, syllables=False):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t) if syllables else 1.0
+    return level * np.sin(2 * np.pi * 180 * t) * envelope + rng.normal(0, 30, len(t))
+
+
+def segments(*parts):
+    """(start, end) seconds of every utterance AudioCapture cuts out of the concatenated parts"""
+    samples = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+    capture = AudioCapture(lambda: ArraySource(samples))
+    found = []
+    while True:
+        utterance = capture.next_utterance(timeout=1, max_age=None)
+        if utterance is None:
+            return found
+        found.append((utterance.start / SAMPLE_RATE, utterance.end / SAMPLE_RATE))
+
+
+def covers(segment, start, end, slack=0.4):
+    """The segment holds [start, end] (give or take a frame or two) and not much around it"""
+    return (segment[0] <= start + 0.1 and segment[1] >= end - 0.1
+            and segment[1] - segment[0] <= end - start + 2 * slack)
+
+
+def test_silence_gives_no_utterance(rng):
+    assert segments(noise(rng, 5, 30)) == []
+
+
+def test_sustained_voicing_is_not_absorbed_into_the_floor(rng):
+    found = segments(noise(rng, 1, 30), voicing(rng, 3), noise(rng, 1.5, 30))
+    assert len(found) == 1
+    assert covers(found[0], 1.0, 4.0)
+
+
+def test_long_command_is_kept_whole(rng):
+    found = segments(noise(rng, 1, 30), voicing(rng, 8, syllables=True), noise(rng, 1.5, 30))
+    assert len(found) == 1
+    assert covers(found[0], 1.0, 9.0)
+
+
+def test_noise_step_is_absorbed(rng):
+    found = segments(noise(rng, 1, 30), voicing(rng, 0.8), noise(rng, 1, 30), voicing(rng, 1.5),
+                     noise(rng, 0.5, 30), noise(rng, 6, 300),  # a fan switches on
+                     voicing(rng, 1, 6000), noise(rng, 1, 300), voicing(rng, 0.1), noise(rng, 1, 300))
+    assert len(found) == 3  # the 0.1s blip is too short to count
+    assert covers(found[0], 1.0, 1.8)
+    assert found[1][0] <= 2.8 and found[1][1] < 10.8  # the fan doesn't run into the next utterance
+    assert covers(found[2], 10.8, 11.8)
+
+
+def test_ring_keeps_the_latest_samples():
+    ring = AudioRing(10)
+    ring.write(np.arange(7, dtype=np.int16))
+    ring.write(np.arange(7, 14, dtype=np.int16))
+    assert ring.slice(0, 14).tolist() == list(range(4, 14))
+    assert ring.slice(5, 9).tolist() == [5, 6, 7, 8]
+
+
+def test_exclusive_keeps_utterances_from_other_listeners(rng):
+    samples = np.clip(np.concatenate([noise(rng, 1, 30), voicing(rng, 0.8), noise(rng, 1, 30)]),
+                      -32768, 32767).astype(np.int16)
+    capture = AudioCapture(lambda: ArraySource(samples, realtime=True))
+    heard, done = [], threading.Event()
+
+    def listening_loop():
+        while not done.is_set():
+            utterance = capture.next_utterance(timeout=0.2, max_age=None)
+            if utterance is not None:
+                heard.append(utterance)
+
+    listener = threading.Thread(target=listening_loop, daemon=True)
+    listener.start()
+    try:
+        while not capture.running:
+            time.sleep(0.01)
+        with capture.exclusive():
+            enrolled = capture.next_utterance(timeout=3, since=capture.position)
+    finally:
+        done.set()
+        listener.join(2)
+    assert enrolled is not None and covers((enrolled.start / SAMPLE_RATE, enrolled.end / SAMPLE_RATE), 1.0, 1.8)
+    assert heard == []
@@ -0,0 +1,84 @@
+# backend/tests/test_command_dedup.py
+import asyncio
+import threading
+
+import pytest
+from fastapi import Response
+
+from modules.command_dedup import CommandDeduplicator
+from modules.voice import VoiceCommandRequest
+from routes import voice_router
+
+
+@pytest.fixture
+def dedup(monkeypatch):
+    dedup = CommandDeduplicator(window=10)
+    monkeypatch.setattr(voice_router, "command_dedup", dedup)
+    return dedup
+
+
+def loop_copy(dedup, text, response="✅ Opening chrome"):
+    """What voice_io.handle_voice_command does for the listening loop"""
+    return dedup.run("voice", None, text, lambda: ({"intent": "app", "action": "open"}, response),
+                     keep=lambda result: not result[1].startswith("❌"),
+                     reshape=lambda origin, result: ({"intent": "app"}, result.tts_response))
+
+
+def api_copy(text, monkeypatch, executed):
+    async def execute_command(parsed):
+        executed.append(parsed.original_text)
+        return voice_router.CommandExecutionResponse(success=True, message="ok", tts_response="Opening chrome")
+    monkeypatch.setattr(voice_router, "execute_command", execute_command)
+    request = VoiceCommandRequest(text=text)
+    response = Response()
+    parsed = voice_router.parse_voice_command(text)
+    result = asyncio.run(voice_router.execute_once(request, parsed, response))
+    return result, response
+
+
+def test_api_copy_of_a_loop_command_is_replayed(dedup, monkeypatch):
+    executed = []
+    _, duplicate = loop_copy(dedup, "Open Chrome")
+    result, response = api_copy("open chrome.", monkeypatch, executed)
+    assert not duplicate
+    assert executed == []
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert result.success and result.tts_response == "✅ Opening chrome"
+
+
+def test_loop_copy_of_an_api_command_is_replayed(dedup, monkeypatch):
+    executed = []
+    api_copy("open chrome", monkeypatch, executed)
+    (command, spoken), duplicate = loop_copy(dedup, "open chrome")
+    assert executed == ["open chrome"]
+    assert duplicate and spoken == "Opening chrome"
+
+
+def test_failed_loop_command_runs_again_through_the_api(dedup, monkeypatch):
+    executed = []
+    loop_copy(dedup, "open chrome", response="❌ Couldn't open chrome")
+    api_copy("open chrome", monkeypatch, executed)
+    assert executed == ["open chrome"]
+
+
+def test_copy_waits_for_the_running_original():
+    dedup = CommandDeduplicator()
+    started, release, runs = threading.Event(), threading.Event(), []
+
+    def slow():
+        runs.append(1)
+        started.set()
+        release.wait(2)
+        return "done"
+
+    first = threading.Thread(target=lambda: dedup.run("voice", None, "check cpu", slow))
+    first.start()
+    started.wait(2)
+    results = []
+    second = threading.Thread(target=lambda: results.append(dedup.run("voice_api", None, "check cpu", slow)))
+    second.start()
+    release.set()
+    first.join(2)
+    second.join(2)
+    assert runs == [1]
+    assert results == [("done", True)]
@@ -0,0 +1,19 @@
+# backend/tests/test_events.py
+import asyncio
+
+from modules.events import EventBus
+
+
+def test_history_keeps_the_state_at_publish_time():
+    bus = EventBus()
+    task = {"id": "t1", "title": "buy milk", "completed": False}
+    bus.publish("tasks", "created", task)
+    task["completed"] = True
+    bus.publish("tasks", "updated", task)
+
+    async def replay():
+        subscription, backlog = bus.subscribe(since=0)
+        return backlog
+
+    backlog = asyncio.run(replay())
+    assert [event["data"]["completed"] for event in backlog] == [False, True]
@@ -0,0 +1,126 @@
+# backend/tests/test_grammar.py
+import pytest
+
+from modules.grammar import GRAMMAR_PATH, GrammarEngine
+from modules.grammar_tuner import GroupOrderTuner
+
+
+@pytest.fixture
+def skewed_engine(tmp_path):
+    """A grammar retuned after traffic that hits system stats and browsers far more than tasks"""
+    tuner = GroupOrderTuner(profile_path=str(tmp_path / "grammar_profile.json"))
+    engine = GrammarEngine(path=GRAMMAR_PATH, classifier=None, tuner=tuner)
+    tuner.load()
+    tuner.hits = {"system_stats": 900.0, "apps_web_browsers": 800.0, "apps_catalog": 700.0,
+                  "tasks": 5.0, "schedule": 1.0}
+    engine.reload(force=True)
+    return engine
+
+
+def test_retune_puts_busy_groups_after_tasks_and_schedule(skewed_engine):
+    order = skewed_engine.grammar.order
+    assert order[:2] == ["tasks", "schedule"]
+    assert order.index("system_stats") < order.index("apps_web_browsers")
+    assert order.index("apps_web_browsers") < order.index("apps_catalog")
+
+
+@pytest.mark.parametrize("text, title", [
+    ("add a task to open chrome", "open chrome"),
+    ("add a task to check cpu usage", "check cpu usage"),
+    ("create a new task called review memory usage report", "review memory usage report"),
+])
+def test_task_titles_survive_retune(skewed_engine, text, title):
+    result = skewed_engine.parse(text)
+    assert result.action == "add_task"
+    assert result.slots["title"] == title
+
+
+@pytest.mark.parametrize("text", ["remind me to open chrome", "set a reminder to check memory usage"])
+def test_reminders_survive_retune(skewed_engine, text):
+    assert skewed_engine.parse(text).action == "add_reminder"
+
+
+def test_contradicting_precedence_keeps_the_first_entry(skewed_engine):
+    constraints = skewed_engine.grammar.constraints()
+    assert ("tasks", "schedule") in constraints
+    assert ("schedule", "tasks") not in constraints
+    assert ("schedule", "system_stats") in constraints
+
+
+@pytest.mark.parametrize("text, title", [
+    ("add task check cpu and memory usage", "check cpu and memory usage"),
+    ("create a new task called buy bread and milk", "buy bread and milk"),
+])
+def test_and_inside_a_task_title_does_not_split(text, title):
+    engine = GrammarEngine(path=GRAMMAR_PATH, classifier=None)
+    assert engine.split_stages(text) == [[text]]
+    assert engine.parse(text).slots["title"] == title
+
+
+@pytest.mark.parametrize("text, stages", [
+    ("open chrome and check cpu usage", [["open chrome", "check cpu usage"]]),
+    ("open chrome and also show my tasks then add task buy milk and eggs",
+     [["open chrome", "show my tasks"], ["add task buy milk and eggs"]]),
+])
+def test_and_before_a_new_command_splits(text, stages):
+    engine = GrammarEngine(path=GRAMMAR_PATH, classifier=None)
+    assert engine.split_stages(text) == stages
+
+
+class FixedClassifier:
+    """Gives every text the same verdict"""
+
+    def __init__(self, intent, action, confidence=0.95):
+        self.verdict = (intent, action, confidence)
+
+    def predict(self, text):
+        return self.verdict
+
+    def predict_batch(self, texts):
+        return [self.verdict for _ in texts]
+
+    def examples(self):
+        return []
+
+
+@pytest.mark.parametrize("text, title", [
+    ("jot down that i need to call the bank", "call the bank"),
+    ("put pay rent on my to do list", "pay rent"),
+    ("could you add a todo for cleaning the garage", "cleaning the garage"),
+])
+def test_classifier_task_verdict_gets_a_title(text, title):
+    engine = GrammarEngine(path=GRAMMAR_PATH, classifier=FixedClassifier("task", "add_task"))
+    result = engine.parse(text)
+    assert (result.source, result.action, result.slots) == ("classifier", "add_task", {"title": title})
+    assert engine.parse_batch([text])[0].slots == {"title": title}
+
+
+def test_classifier_task_verdict_without_a_title_falls_back():
+    engine = GrammarEngine(path=GRAMMAR_PATH, classifier=FixedClassifier("task", "add_task"))
+    assert engine.parse("add an item to my to do list").source == "fallback"
+
+
+@pytest.mark.parametrize("text, message", [
+    ("nudge me at 9 to take my pills", "take my pills"),
+    ("remind me about the meeting tomorrow", "the meeting tomorrow"),
+])
+def test_classifier_reminder_verdict_gets_a_message(text, message):
+    engine = GrammarEngine(path=GRAMMAR_PATH, classifier=FixedClassifier("schedule", "add_reminder"))
+    assert engine.parse(text).slots["message"] == message
+import sys,time; sys.path.insert(0,'.')
+from routes.voice_router import parse_voice_command
+from modules.simple_parser import parse_command
+for t in ["could you fire up chrome","how much ram is my computer using right now","put eggs on my shopping list","wake me at seven","what's up","tell me about cats","open chrome","hello there"]:
+    r=parse_voice_command(t); print(t,'|',r.intent,r.action,r.confidence,r.parameters,'|',parse_command(t))
+
+
+@pytest.mark.parametrize("text", ["start over", "open the window"])
+def test_classifier_open_app_verdict_without_an_app_falls_back(text):
+    engine = GrammarEngine(path=GRAMMAR_PATH, classifier=FixedClassifier("system", "open_app", 0.81))
+    result = engine.parse(text)
+    assert (result.source, result.action) == ("fallback", "process_chat")
+
+
+def test_classifier_open_app_verdict_keeps_a_known_app():
+    engine = GrammarEngine(path=GRAMMAR_PATH, classifier=FixedClassifier("system", "open_app"))
+    assert engine.parse("fire up spotify").slots["app_name"] == "spotify"
@@ -0,0 +1,33 @@
+# backend/tests/test_intent_classifier.py
+import threading
+
+from modules.intent_classifier import HashedFeaturizer
+
+
+def test_featurizer_cache_is_safe_to_share_between_threads():
+    texts = [f"add task number {i} to the list" for i in range(300)]
+    expected = [HashedFeaturizer().indices(text)[0].tolist() for text in texts]
+    shared = HashedFeaturizer(cache_size=20)  # small enough to be evicting all the time
+    errors = []
+
+    def featurize():
+        try:
+            for _ in range(5):
+                for text, indices in zip(texts, expected):
+                    assert shared.indices(text)[0].tolist() == indices
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=featurize) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_featurizer_hashing_is_stable():
+    indices, weight = HashedFeaturizer(dim=1 << 14).indices("open chrome")
+    again, _ = HashedFeaturizer(dim=1 << 14, cache_size=1).indices("Open Chrome")
+    assert indices.tolist() == again.tolist()
+    assert weight == 1 / len(indices) ** 0.5
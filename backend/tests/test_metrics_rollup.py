@@ -0,0 +1,44 @@
+# backend/tests/test_metrics_rollup.py
+import pytest
+
+from modules.metrics_rollup import MetricsRollup
+
+
+@pytest.fixture
+def rollup(tmp_path):
+    rollup = MetricsRollup(directory=str(tmp_path), resolutions=[(1, 600), (60, 100)],
+                           metrics=["cpu_percent", "disk_usage"])
+    rollup.open()
+    yield rollup
+    rollup.close()
+
+
+def test_average_counts_only_snapshots_that_have_the_metric(rollup):
+    rollup.add({"timestamp": 1000.1, "cpu_percent": 10.0, "disk_usage": 50.0})
+    rollup.add({"timestamp": 1000.5, "cpu_percent": 30.0})
+    sample, = rollup.query(1, now=1000.9)["samples"]
+    assert sample["count"] == 2
+    assert sample["cpu_percent"]["avg"] == 20.0
+    assert sample["disk_usage"] == {"min": 50.0, "max": 50.0, "avg": 50.0}
+
+
+def test_points_caps_the_number_of_samples(rollup):
+    for second in range(300):
+        rollup.add({"timestamp": 1000 + second, "cpu_percent": float(second % 10)})
+    result = rollup.query(300, points=30, step=1, now=1299.5)
+    assert result["resolution"] == 1
+    assert len(result["samples"]) <= 30
+    assert result["step"] == 11  # the window's 301 one-second buckets (both ends included)
+    cpu = [sample["cpu_percent"] for sample in result["samples"]]
+    counts = [sample["count"] for sample in result["samples"]]
+    assert sum(counts) == 300
+    assert min(c["min"] for c in cpu) == 0.0 and max(c["max"] for c in cpu) == 9.0
+    assert sum(c["avg"] * n for c, n in zip(cpu, counts)) == pytest.approx(4.5 * 300, abs=1)  # avgs are rounded
+
+
+def test_points_is_left_alone_when_the_buckets_fit(rollup):
+    for second in range(20):
+        rollup.add({"timestamp": 1000 + second, "cpu_percent": 1.0})
+    result = rollup.query(20, points=300, now=1019.5)
+    assert result["step"] == 1
+    assert len(result["samples"]) == 20
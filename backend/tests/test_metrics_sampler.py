@@ -0,0 +1,39 @@
+# backend/tests/test_metrics_sampler.py
+import asyncio
+
+from modules.metrics_sampler import StreamSubscription
+
+
+def sent(min_interval, timestamps):
+    """Timestamps of the snapshots a subscriber passes on, taking each one as it arrives"""
+    loop = asyncio.new_event_loop()
+    try:
+        subscription = StreamSubscription(loop, min_interval)
+        delivered = []
+        for timestamp in timestamps:
+            subscription.offer({"timestamp": timestamp, "cpu": 1.0})
+            if not subscription.queue.empty():
+                delivered.append(subscription.queue.get_nowait()["timestamp"])
+        return delivered
+    finally:
+        loop.close()
+
+
+def test_jittered_ticks_are_all_sent_at_the_sampling_interval():
+    ticks = [1000.0 + i + (0.01 if i % 2 else -0.01) for i in range(10)]
+    assert sent(1.0, ticks) == ticks
+
+
+def test_rate_limit_still_thins_the_stream():
+    ticks = [1000.0 + i + (0.01 if i % 2 else -0.01) for i in range(10)]
+    assert sent(2.0, ticks) == ticks[::2]
+
+
+def test_fields_keep_the_timestamp():
+    loop = asyncio.new_event_loop()
+    try:
+        subscription = StreamSubscription(loop, fields=["memory"])
+        subscription.offer({"timestamp": 1.0, "cpu": 1.0, "memory": 2.0})
+        assert subscription.queue.get_nowait() == {"timestamp": 1.0, "memory": 2.0}
+    finally:
+        loop.close()
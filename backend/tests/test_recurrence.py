@@ -0,0 +1,77 @@
+# backend/tests/test_recurrence.py
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from modules.recurrence import expand, is_occurrence, next_occurrence, occurrence_key
+from modules.reminder_engine import ReminderEngine
+
+FIRST = datetime(2026, 10, 19, 9, 0)
+
+
+def daily(first=FIRST, **rule):
+    return {"id": "r1", "message": "stretch", "time": first.strftime("%Y-%m-%d %H:%M:%S"),
+            "recurrence": {"freq": "daily", **rule}}
+
+
+def test_occurrence_moved_onto_the_next_one_is_not_dropped():
+    reminder = daily()
+    tuesday = FIRST + timedelta(days=1)
+    # Monday's occurrence moved to exactly Tuesday's time
+    reminder["exceptions"] = {occurrence_key(FIRST): {"time": tuesday.strftime("%Y-%m-%d %H:%M:%S")}}
+
+    due, key = next_occurrence(reminder, FIRST.timestamp())
+    fired = [key]
+    for _ in range(2):
+        due, key = next_occurrence(reminder, due, key)
+        fired.append(key)
+    assert sorted(fired[:2]) == [occurrence_key(FIRST), occurrence_key(tuesday)]
+    assert fired[2] == occurrence_key(FIRST + timedelta(days=2))
+
+
+def test_occurrence_moved_past_the_next_one_is_not_dropped():
+    reminder = daily()
+    moved_to = FIRST + timedelta(days=1, hours=2)
+    reminder["exceptions"] = {occurrence_key(FIRST): {"time": moved_to.strftime("%Y-%m-%d %H:%M:%S")}}
+
+    due, key = next_occurrence(reminder, FIRST.timestamp())
+    keys = [key]
+    for _ in range(2):
+        due, key = next_occurrence(reminder, due, key)
+        keys.append(key)
+    assert keys == [occurrence_key(FIRST + timedelta(days=1)), occurrence_key(FIRST),
+                    occurrence_key(FIRST + timedelta(days=2))]
+
+
+def test_timezone_aware_until_is_compared_in_local_time():
+    until = (FIRST + timedelta(days=2, hours=1)).astimezone(timezone.utc).isoformat()
+    reminder = daily(until=until)
+    keys = [key for _, key in expand(reminder)]
+    assert keys == [occurrence_key(FIRST + timedelta(days=i)) for i in range(3)]
+
+
+def test_timezone_aware_occurrence_key_is_recognised():
+    reminder = daily()
+    aware = (FIRST + timedelta(days=3)).astimezone(timezone.utc).isoformat()
+    assert is_occurrence(reminder, aware)
+    assert occurrence_key(datetime.fromisoformat(aware)) == occurrence_key(FIRST + timedelta(days=3))
+
+
+def test_engine_fires_both_occurrences_due_at_the_same_time():
+    first = datetime.now().replace(microsecond=0) - timedelta(seconds=30)
+    reminder = daily(first)
+    second = first + timedelta(days=1)
+    reminder["exceptions"] = {occurrence_key(second): {"time": first.strftime("%Y-%m-%d %H:%M:%S")}}
+
+    async def run():
+        engine = ReminderEngine()
+        fired = []
+        engine.add_callback(lambda event: fired.append(event["occurrence"]))
+        await engine.start([reminder])
+        deadline = time.monotonic() + 2
+        while len(fired) < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await engine.stop()
+        return fired
+
+    assert sorted(asyncio.run(run())) == sorted([occurrence_key(first), occurrence_key(second)])
@@ -0,0 +1,57 @@
+# backend/tests/test_voice_reminders.py
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from modules.actions import ActionResult
+from modules.reminder_time import MISSING_TIME_REPLY
+from modules.simple_parser import parse_command
+from routes import voice_router
+
+
+class RecordingRegistry:
+    """Stands in for the action registry and remembers what was called"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call(self, name, **params):
+        self.calls.append((name, params))
+        return ActionResult(200, {"success": True})
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = RecordingRegistry()
+    monkeypatch.setattr(voice_router, "action_registry", registry)
+    return registry
+
+
+def execute(text):
+    return asyncio.run(voice_router.execute_command(voice_router.parse_voice_command(text)))
+
+
+def test_spoken_time_is_used_for_the_reminder(registry):
+    result = execute("set a reminder for 5pm to stretch")
+    assert result.success
+    (name, params), = registry.calls
+    due = datetime.strptime(params["time"], "%Y-%m-%d %H:%M:%S")
+    assert name == "schedule.add" and params["message"] == "stretch"
+    assert (due.hour, due.minute) == (17, 0)
+    assert datetime.now() < due
+
+
+def test_reminder_without_a_time_asks_for_one(registry):
+    result = execute("remind me to stretch")
+    assert not result.success
+    assert result.tts_response == MISSING_TIME_REPLY
+    assert registry.calls == []
+
+
+def test_simple_parser_handles_reminders_like_the_router():
+    parsed = parse_command("remind me to call mom at 5:30 pm")
+    assert parsed["action"] == "schedule"
+    assert parsed["params"]["time"].endswith("17:30:00")
+    assert parse_command("remind me to stretch") == {
+        "action": "clarify", "params": {"intent": "schedule", "question": MISSING_TIME_REPLY}}
@@ -0,0 +1,115 @@
+# backend/tests/test_wake_word.py
+import wave
+
+import numpy as np
+import pytest
+
+from modules.wake_word import WakeWordDetector, mfcc, subsequence_dtw
+
+SAMPLE_RATE = 16000
+
+# The synthetic wake word: vowels given by (first, second formant in Hz, seconds), None for a hiss
+WAKE_WORD = [(700, 1200, 0.14), (300, 2300, 0.12), None, (500, 1500, 0.15), (400, 800, 0.12), (650, 1700, 0.16)]
+
+
+def vowel(rng, first, second, seconds, pitch):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(pitch * (1 + 0.03 * np.sin(2 * np.pi * 4 * t))) / SAMPLE_RATE
+    out = np.zeros_like(t)
+    for harmonic in range(1, int(4000 / pitch)):
+        f = harmonic * pitch
+        gain = 1 / (1 + ((f - first) / 80) ** 2) + 0.7 / (1 + ((f - second) / 120) ** 2) + 0.05
+        out += gain * np.sin(harmonic * phase)
+    return out * np.minimum(1, np.minimum(t, t[::-1]) / 0.02)
+
+
+def hiss(rng, seconds):
+    white = rng.normal(0, 1, int(seconds * SAMPLE_RATE))
+    spectrum = np.fft.rfft(white)
+    spectrum *= np.exp(-((np.fft.rfftfreq(len(white), 1 / SAMPLE_RATE) - 5000) / 1500) ** 2)
+    return np.fft.irfft(spectrum, len(white)) * 3
+
+
+def word(rng, sounds):
+    """One spoken word, a little faster or slower and higher or lower each time"""
+    pitch = rng.uniform(100, 220)
+    parts = []
+    for sound in sounds:
+        if sound is None:
+            parts.append(hiss(rng, 0.08 * rng.uniform(0.8, 1.25)))
+        else:
+            first, second, seconds = sound
+            parts.append(vowel(rng, first * rng.uniform(0.93, 1.07), second * rng.uniform(0.93, 1.07),
+                               seconds * rng.uniform(0.8, 1.25), pitch))
+    x = np.concatenate(parts)
+    return x / np.abs(x).max()
+
+
+def other_word(rng):
+    return [None if rng.random() < 0.15 else (rng.uniform(250, 850), rng.uniform(700, 2600), rng.uniform(0.08, 0.2))
+            for _ in range(rng.integers(3, 9))]
+
+
+def recording(rng, *words, noise=60):
+    gap = np.zeros(SAMPLE_RATE // 3)
+    speech = np.concatenate([part for w in words for part in (w, gap)])
+    x = np.concatenate([np.zeros(int(0.4 * SAMPLE_RATE)), speech * 8000, np.zeros(int(0.6 * SAMPLE_RATE))])
+    x += rng.normal(0, noise, len(x))
+    return np.clip(x, -32768, 32767).astype(np.int16)
+
+
+def save(path, samples):
+    with wave.open(str(path), "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(SAMPLE_RATE)
+        audio.writeframes(samples.astype("<i2").tobytes())
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(3)
+
+
+@pytest.fixture
+def detector(tmp_path, rng):
+    """A detector enrolled from four WAV recordings of the wake word"""
+    for i in range(4):
+        save(tmp_path / f"template-{i}.wav", recording(rng, word(rng, WAKE_WORD), noise=40))
+    detector = WakeWordDetector(directory=str(tmp_path))
+    assert detector.info()["templates"] == 4
+    return detector
+
+
+def test_subsequence_dtw_finds_the_template_inside_longer_audio(rng):
+    template = mfcc(recording(rng, word(rng, WAKE_WORD)), SAMPLE_RATE, trim=True)
+    lead = word(rng, other_word(rng))
+    samples = recording(rng, lead, word(rng, WAKE_WORD), word(rng, other_word(rng)))
+    distance, end = subsequence_dtw(template, mfcc(samples, SAMPLE_RATE))
+    wake_end = 0.4 + len(lead) / SAMPLE_RATE + 1 / 3 + sum(s[2] if s else 0.08 for s in WAKE_WORD)
+    assert distance < subsequence_dtw(template, mfcc(recording(rng, lead), SAMPLE_RATE))[0]
+    assert abs(end * 0.01 - wake_end) < 0.3
+
+
+def test_subsequence_dtw_of_nothing_is_no_match():
+    assert subsequence_dtw(np.zeros((0, 12)), np.ones((5, 12)))[0] == float("inf")
+
+
+@pytest.mark.parametrize("noise", [30, 150])
+def test_wake_word_is_detected_alone_and_before_a_command(detector, rng, noise):
+    alone = recording(rng, word(rng, WAKE_WORD), noise=noise)
+    wake = word(rng, WAKE_WORD)
+    with_command = recording(rng, wake, word(rng, other_word(rng)), noise=noise)
+    assert detector.detect(alone, SAMPLE_RATE) is not None
+    hit = detector.detect(with_command, SAMPLE_RATE)
+    assert hit is not None
+    # The command after the wake word is left for recognition
+    assert hit.end < len(with_command) - SAMPLE_RATE // 4
+
+
+@pytest.mark.parametrize("noise", [30, 150])
+def test_other_speech_is_rejected(detector, rng, noise):
+    for _ in range(5):
+        samples = recording(rng, *[word(rng, other_word(rng)) for _ in range(3)], noise=noise)
+        assert detector.detect(samples, SAMPLE_RATE) is None
+    assert detector.info()["hits"] == 0